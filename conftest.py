@@ -0,0 +1,19 @@
+# coding:utf-8
+"""
+测试共用的 fixture
+"""
+
+import pytest
+
+from script.utils import manifest, render, storage
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    """把仓库根目录、output/、产物清单与渲染缓存指向临时目录"""
+    monkeypatch.setattr(storage, 'ROOT_DIR', str(tmp_path))
+    monkeypatch.setattr(storage, 'OUTPUT_DIR', str(tmp_path / 'output'))
+    monkeypatch.setattr(manifest, 'ROOT_DIR', str(tmp_path))
+    monkeypatch.setattr(manifest, 'MANIFEST_FILE', str(tmp_path / 'output' / '.manifest.json'))
+    monkeypatch.setattr(render, '_cache', render.RenderCache(str(tmp_path / 'render')))
+    return tmp_path
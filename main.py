@@ -1,23 +1,40 @@
 import os
+import re
 import sys
+import argparse
 import importlib.util
 from datetime import datetime
 from dotenv import load_dotenv
 from script.utils.git_helper import git_add_commit_push
+from script.utils.deadline import Deadline, with_deadline
+from script.utils.http import close_session
+from script.utils.manifest import clear_manifest
+from script.utils.scheduler import Scheduler
+
+# 脚本未声明 SCHEDULE 时常驻模式使用的 cron 表达式
+DEFAULT_SCHEDULE = '0 10 * * *'
 
 # 加载 .env 文件中的环境变量
 load_dotenv()
 
-def load_and_execute_script(script_path):
+# 单次运行的总时间预算（秒）；常驻模式下每个任务单独计算（须在 load_dotenv 之后读取，.env 中的设置才生效）
+RUN_BUDGET_SECONDS = float(os.environ.get('RUN_BUDGET_SECONDS', '1800'))
+
+def load_script(script_path):
+    """加载脚本模块（常驻模式下只加载一次，模块级缓存与连接在多次执行间保留）"""
+    # 获取脚本文件名（不含路径和扩展名）
+    script_name = os.path.splitext(os.path.basename(script_path))[0]
+
+    # 加载脚本模块
+    spec = importlib.util.spec_from_file_location(script_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_and_execute_script(script_path, module=None):
     try:
-        # 获取脚本文件名（不含路径和扩展名）
-        script_name = os.path.splitext(os.path.basename(script_path))[0]
-        
-        # 加载脚本模块
-        spec = importlib.util.spec_from_file_location(script_name, script_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        
+        module = module or load_script(script_path)
+
         # 执行脚本的job函数
         if hasattr(module, 'job'):
             print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 执行脚本: {script_path}")
@@ -31,7 +48,100 @@ def load_and_execute_script(script_path):
         print(f"错误: 执行脚本 {script_path} 时发生异常: {str(e)}")
         return False
 
+def schedule_for(module, script_file):
+    """
+    获取脚本的 cron 表达式
+
+    优先读取环境变量 SCHEDULE_<脚本名>（如 SCHEDULE_AI_NEWS），其次是脚本的 SCHEDULE 属性
+    """
+    name = os.path.splitext(script_file)[0].split('.', 1)[-1]
+    env_key = 'SCHEDULE_' + re.sub(r'\W', '_', name).upper()
+    return os.environ.get(env_key) or getattr(module, 'SCHEDULE', DEFAULT_SCHEDULE)
+
+def run_daemon(script_dir, python_files):
+    """常驻模式：所有脚本只加载一次，按各自的 cron 表达式执行"""
+    scheduler = Scheduler()
+    for python_file in python_files:
+        script_path = os.path.join(script_dir, python_file)
+        try:
+            module = load_script(script_path)
+        except Exception as e:
+            print(f"错误: 加载脚本 {script_path} 时发生异常: {str(e)}")
+            continue
+        # 脚本可以通过 daemon_jobs() 注册多个任务（如每个数据源插件各自调度）
+        if hasattr(module, 'daemon_jobs'):
+            budget = getattr(module, 'BUDGET_SECONDS', None) or RUN_BUDGET_SECONDS
+            for name, cron, func in module.daemon_jobs():
+                scheduler.add(name, cron, with_deadline(func, budget, name))
+            continue
+        if not hasattr(module, 'job'):
+            print(f"警告: {script_path} 中没有找到job函数，跳过调度")
+            continue
+        budget = getattr(module, 'BUDGET_SECONDS', None) or RUN_BUDGET_SECONDS
+        scheduler.add(python_file, schedule_for(module, python_file),
+                      with_deadline(module.job, budget, python_file))
+
+    # 定期提交产物清单中变化的文件
+    if os.environ.get('GIT_PUBLISH') == '1':
+        scheduler.add('git-publish', os.environ.get('SCHEDULE_GIT_PUBLISH', '55 * * * *'), git_add_commit_push)
+
+    print(f"\n进入常驻模式，已注册 {len(scheduler.jobs)} 个任务:")
+    scheduler.install_signal_handlers()
+    try:
+        scheduler.run_forever()
+    finally:
+        close_session()
+
+def run_once(script_dir, python_files):
+    """
+    按顺序执行一次全部脚本，整次运行受 RUN_BUDGET_SECONDS 约束
+
+    每个脚本的截止时间不超过自身的 BUDGET_SECONDS，并为后续脚本声明的 RESERVE_SECONDS 预留时间；
+    预算耗尽后只执行声明了 RESERVE_SECONDS 的脚本（如推送）
+
+    Returns:
+        (成功数, 失败数)
+    """
+    modules = []
+    for python_file in python_files:
+        script_path = os.path.join(script_dir, python_file)
+        try:
+            modules.append((script_path, load_script(script_path)))
+        except Exception as e:
+            print(f"错误: 加载脚本 {script_path} 时发生异常: {str(e)}")
+            modules.append((script_path, None))
+
+    success_count = 0
+    failed_count = 0
+    with Deadline(RUN_BUDGET_SECONDS, 'run') as run:
+        for i, (script_path, module) in enumerate(modules):
+            if module is None:
+                failed_count += 1
+                continue
+            reserve = sum(getattr(m, 'RESERVE_SECONDS', 0) for _, m in modules[i + 1:] if m)
+            own_reserve = getattr(module, 'RESERVE_SECONDS', 0)
+            if run.remaining() - reserve <= 0 and not own_reserve:
+                print(f"\n⚠ 运行预算已用尽，跳过脚本: {script_path}")
+                failed_count += 1
+                continue
+            name = os.path.basename(script_path)
+            stage = run.child(name, getattr(module, 'BUDGET_SECONDS', None), reserve=reserve)
+            if own_reserve and stage.remaining() < own_reserve:
+                # 前面的脚本超时占用了预留时间，仍保证本脚本拿到自己的预留
+                stage = Deadline(own_reserve, name)
+            with stage:
+                if load_and_execute_script(script_path, module):
+                    success_count += 1
+                else:
+                    failed_count += 1
+    return success_count, failed_count
+
 def main():
+    parser = argparse.ArgumentParser(description='GitHub Schedule 任务入口')
+    parser.add_argument('--daemon', action='store_true',
+                        help='常驻运行，按各脚本的 cron 表达式调度（默认执行一次全部脚本后退出）')
+    args = parser.parse_args()
+
     # 获取script目录的绝对路径
     script_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'script')
     
@@ -50,19 +160,18 @@ def main():
     for i, file in enumerate(python_files, 1):
         print(f"{i}. {file}")
     
-    # 执行统计
-    success_count = 0
-    failed_count = 0
-    
-    # 按顺序执行每个脚本
-    for python_file in python_files:
-        script_path = os.path.join(script_dir, python_file)
-        if load_and_execute_script(script_path):
-            success_count += 1
-        else:
-            failed_count += 1
-    #submit to github
-    #git_add_commit_push()
+    # 清空上次运行遗留的产物清单
+    clear_manifest()
+
+    if args.daemon:
+        run_daemon(script_dir, python_files)
+        return
+
+    success_count, failed_count = run_once(script_dir, python_files)
+    # 只提交产物清单中内容发生变化的文件（GIT_PUBLISH=1 时启用）
+    if os.environ.get('GIT_PUBLISH') == '1':
+        git_add_commit_push()
+    close_session()
 
     # 输出执行统计结果
     print(f"\n执行统计:")
@@ -1,79 +1,55 @@
 # coding:utf-8
 
+import argparse
 import datetime
 import codecs
-import requests
 import os
+import sys
 import time
-from pyquery import PyQuery as pq
-import json
+
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.article_crawler import crawl_news
+from script.utils.deadline import current_deadline
+from script.utils.http import hedged_get
+from script.utils.manifest import record_artifact
+from script.utils.extraction import ExtractionError
+from script.utils.news_enrich import write_enriched
+from script.utils.news_parser import NEWS_URL, parse_news_from_file
+from script.utils.news_poll import decode_page, merge_day, poll_once
+from script.utils.storage import artifact_path
+from script.utils.watchlist import alert_today
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '*/30 * * * *'
+# 日内轮询的 cron 表达式（NEWS_POLL=1 时在常驻模式下启用）
+POLL_SCHEDULE = '*/10 * * * *'
+# 本脚本在整次运行预算中的上限（秒），包括新闻增强
+BUDGET_SECONDS = 300
+# 原文抓取阶段的预算（秒），超时后剩余条目沿用快讯摘要
+ARTICLE_BUDGET = float(os.environ.get('ARTICLE_BUDGET', '90'))
 
 def fetch_ai_news():
-    url = "https://ai-bot.cn/daily-ai-news/"
     try:
-        response = requests.get(url, timeout=10)
+        response = hedged_get(NEWS_URL, timeout=10)
         response.raise_for_status()
+        html = decode_page(response)
 
-        # 创建输出目录（按年份组织）
+        # 保存文件（按 年/月 分片存放）
         today = datetime.datetime.now().strftime('%Y-%m-%d')
-        year = datetime.datetime.now().strftime('%Y')
-        output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output', 'ai-news', year)
-        os.makedirs(output_dir, exist_ok=True)
-
-        # 保存文件
-        output_file = os.path.join(output_dir, f'{today}.html')
+        output_file = artifact_path('ai-news', today, '.html')
         with codecs.open(output_file, 'w', 'utf-8') as f:
-            f.write(response.text)
+            f.write(html)
+        record_artifact(output_file)
 
         return output_file
     except Exception as e:
         print(f"Failed to fetch AI news: {str(e)}")
         return None
 
-def parse_news_from_file(file_path):
-    try:
-        with codecs.open(file_path, 'r', 'utf-8') as f:
-            html_content = f.read()
-        
-        doc = pq(html_content)
-        # 获取第一个news-list区块
-        first_news_list = doc('.news-list').eq(0)
-        
-        # 获取日期（仅获取直接子元素）
-        date_text = first_news_list.children('.news-date').text()
-        date_parts = date_text.split('·')
-        
-        news = {
-            'date': datetime.datetime.now().strftime('%Y-%m-%d'),
-            'weekday': date_parts[1] if len(date_parts) > 1 else '',
-            'items': []
-        }
-        
-        # 获取新闻条目（仅获取直接子元素）
-        for news_item in first_news_list.children('.news-item').items():
-            content = news_item.find('.news-content')
-            title = content.find('h2 a').text()
-            url = content.find('h2 a').attr('href')
-            
-            # 获取新闻内容和来源
-            p_text = content.find('p.text-muted').text()
-            source = content.find('.news-time').text().replace('来源：', '')
-            
-            # 移除来源信息，得到纯内容
-            main_content = p_text.replace(f'来源：{source}', '').strip()
-            
-            news['items'].append({
-                'title': title,
-                'url': url,
-                'content': main_content,
-                'source': source
-            })
-        
-        return news
-    except Exception as e:
-        print(f"Failed to parse news: {str(e)}")
-        return None
-
 def job():
     # 获取AI新闻并保存
     output_file = fetch_ai_news()
@@ -81,24 +57,82 @@ def job():
         return
     
     # 解析新闻内容
-    news = parse_news_from_file(output_file)
+    try:
+        news = parse_news_from_file(output_file, datetime.datetime.now().strftime('%Y-%m-%d'))
+    except ExtractionError as e:
+        # 校验失败时不写 JSON，后续的增强与推送阶段不会拿到空内容
+        print(f"错误: 新闻页面校验失败，跳过保存与推送 - {str(e)}")
+        return
+    except OSError as e:
+        print(f"Failed to parse news: {str(e)}")
+        return
     
     if news:
         print(f"Successfully parsed {len(news['items'])} news items")
-        
-        # 保存为JSON文件
-        json_file = os.path.join(
-            os.path.dirname(output_file),
-            f"{news['date']}.json"
-        )
-        
+
+        # 合并进当天 JSON（日内轮询已追加的条目保留），去重后保存
         try:
-            with codecs.open(json_file, 'w', 'utf-8') as f:
-                json.dump(news, f, ensure_ascii=False, indent=2)
-            print(f"News data saved to: {json_file}")
-            
+            news, new_items = merge_day(news)
+            print(f"News data saved to: {artifact_path('ai-news', news['date'], '.json', create=False)}"
+                  f" ({len(new_items)} new)")
         except Exception as e:
             print(f"Failed to save JSON file: {str(e)}")
+            return
+
+        # 关注列表命中的条目单独优先推送（已提醒过的不再重复）
+        try:
+            alert_today(news['date'])
+        except Exception as e:
+            print(f"Failed to send watchlist alerts: {str(e)}")
+
+        # 抓取原文正文（写入 .cache/articles/），供增强使用；最多占用 ARTICLE_BUDGET 秒
+        try:
+            with current_deadline().child('article-crawl', ARTICLE_BUDGET):
+                stats = crawl_news(news)
+            print(f"Articles: " + ', '.join(f"{count} {status}" for status, count in sorted(stats.items())))
+        except Exception as e:
+            print(f"Failed to crawl articles: {str(e)}")
+
+        # 增强：分类、标签与摘要，保存到 {date}-enriched.json
+        try:
+            enriched_file = write_enriched(news)
+            if enriched_file:
+                print(f"Enriched news saved to: {enriched_file}")
+        except Exception as e:
+            print(f"Failed to enrich news: {str(e)}")
+
+def poll_job():
+    """日内轮询：只追加并推送新发布的快讯"""
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
+    try:
+        new_items = poll_once(today)
+    except ExtractionError as e:
+        print(f"错误: 新闻页面校验失败，跳过本次轮询 - {str(e)}")
+        return
+    except Exception as e:
+        print(f"Failed to poll AI news: {str(e)}")
+        return
+    if new_items:
+        try:
+            alert_today(today)
+        except Exception as e:
+            print(f"Failed to send watchlist alerts: {str(e)}")
+
+def daemon_jobs():
+    """常驻模式：完整抓取按 SCHEDULE 运行；NEWS_POLL=1 时另按 POLL_SCHEDULE 轮询增量"""
+    jobs = [('1.ai-news.py', os.environ.get('SCHEDULE_AI_NEWS') or SCHEDULE, job)]
+    if os.environ.get('NEWS_POLL') == '1':
+        jobs.append(('ai-news-poll', os.environ.get('SCHEDULE_AI_NEWS_POLL') or POLL_SCHEDULE, poll_job))
+    return jobs
 
 if __name__ == '__main__':
-    job()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='抓取 AI 快讯')
+    parser.add_argument('--poll', action='store_true', help='持续轮询，只推送新发布的快讯')
+    parser.add_argument('--interval', type=int, default=600, help='轮询间隔（秒）')
+    args = parser.parse_args()
+    if args.poll:
+        while True:
+            poll_job()
+            time.sleep(args.interval)
+    else:
+        job()
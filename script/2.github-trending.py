@@ -2,12 +2,30 @@
 
 import datetime
 import codecs
-import requests
 import os
+import sys
 import time
-from pyquery import PyQuery as pq
+import json
 
-# git_helper import removed - unused
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.extraction import ExtractionError, validate_page
+from script.utils.github_meta import fetch_metadata, merge_metadata
+from script.utils.http import hedged_get
+from script.utils.manifest import record_artifact
+from script.utils.record_store import append_trending
+from script.utils.similar_repos import format_similar_section, similar_today
+from script.utils.storage import artifact_path
+from script.utils.trending_diff import diff_today, format_diff_section
+from script.utils.trending_records import TRENDING_PAGE_SCHEMA, parse_stars, repo_name
+from script.utils.trending_snapshots import append_snapshot, fastest_rising, format_rising_section
+from script.utils.watchlist import alert_today
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '0 * * * *'
 
 
 def createMarkdown(date, filename):
@@ -20,8 +38,8 @@ def checkPathExist(path):
         os.makedirs(path)
 
 
-def scrape_trending(filename):
-    """获取 GitHub Trending 总榜（15条）"""
+def scrape_trending(date):
+    """获取 GitHub Trending 总榜（15条）并校验，返回结构化行记录；页面未通过校验时抛出 ExtractionError"""
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.7; rv:11.0) Gecko/20100101 Firefox/11.0',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -29,52 +47,90 @@ def scrape_trending(filename):
         'Accept-Language': 'zh-CN,zh;q=0.8'
     }
     url = 'https://github.com/trending'
-    r = requests.get(url, headers=HEADERS, timeout=10)
+    r = hedged_get(url, headers=HEADERS, timeout=10)
     r.raise_for_status()
-    d = pq(r.content)
-    items = d('div.Box article.Box-row')
+    result = validate_page(TRENDING_PAGE_SCHEMA, r.content.decode('utf-8', errors='replace'), date)
 
+    rows = []
     # 只获取前15条
-    items = items[:15]
-
+    for idx, item in enumerate(result.items[:15], 1):
+        url = "https://github.com" + item['href']
+        rows.append({
+            'rank': idx,
+            'name': repo_name(url),
+            'url': url,
+            'title': item['title'],
+            'description': item['description'],
+            'language': item['language'] or "Unknown",
+            'stars': parse_stars(item['stars']),
+            'stars_text': item['stars'],
+            'stars_today': parse_stars(item['stars_today']),
+            'schema': result.tag,
+        })
+    return rows
+
+
+def write_trending_markdown(filename, rows):
+    """把热榜行记录追加到 markdown"""
     with codecs.open(filename, "a", "utf-8") as f:
         f.write('\n### 今日热榜 Top 15\n\n')
-        for idx, item in enumerate(items, 1):
-            i = pq(item)
-            title = i(".lh-condensed a").text()
-            description = i("p.col-9").text()
-            url = i(".lh-condensed a").attr("href")
-            url = "https://github.com" + url
-
-            # 获取编程语言标签
-            language_span = i("span[itemprop='programmingLanguage']")
-            language = language_span.text() if language_span else "Unknown"
-
-            # 获取星标数
-            stars_link = i("a[href*='/stargazers']")
-            stars = stars_link.text().strip() if stars_link else ""
-
-            f.write(u"{idx}. **[{title}]({url})**\n".format(idx=idx, title=title, url=url))
-            if description:
-                f.write(u"   > {description}\n".format(description=description))
-            f.write(u"   📦 {language} ⭐ {stars}\n\n".format(language=language, stars=stars))
+        for row in rows:
+            f.write(u"{idx}. **[{title}]({url})**\n".format(idx=row['rank'], title=row['title'], url=row['url']))
+            if row['description']:
+                f.write(u"   > {description}\n".format(description=row['description']))
+            f.write(u"   📦 {language} ⭐ {stars}\n\n".format(language=row['language'], stars=row['stars_text']))
 
 
 def job():
     """主任务函数 - 获取 GitHub Trending 总榜"""
     strdate = datetime.datetime.now().strftime('%Y-%m-%d')
-    stryear = datetime.datetime.now().strftime('%Y')
 
-    # 输出目录改为 output/github-trending/{YEAR}/
-    output_dir = os.path.join('output', 'github-trending', stryear)
-    checkPathExist(output_dir)
-    filename = os.path.join(output_dir, f'{strdate}.md')
+    # 先抓取并校验，失败时不覆盖已有文件，后续 AI 分析与推送不会拿到空榜单
+    try:
+        rows = scrape_trending(strdate)
+    except ExtractionError as e:
+        print(f"错误: GitHub Trending 页面校验失败，跳过保存 - {str(e)}")
+        return
+
+    # 输出路径: output/github-trending/{YEAR}/{MONTH}/{DATE}.md
+    filename = artifact_path('github-trending', strdate, '.md')
 
     # 创建文件标题
     createMarkdown(strdate, filename)
-
-    # 获取总榜数据
-    scrape_trending(filename)
+    write_trending_markdown(filename, rows)
+
+    # 追加快照并在日报中加入星标增速最快的仓库（常驻模式下每小时一次快照）
+    append_snapshot(rows)
+    rising_section = format_rising_section(fastest_rising())
+    # 与前几天的热榜对比：新上榜、跌出、名次变化、连续在榜天数（另存为 {date}-diff.json）
+    diff_section = format_diff_section(diff_today(strdate, rows))
+    if rising_section or diff_section:
+        with codecs.open(filename, 'a', 'utf-8') as f:
+            f.write(rising_section + diff_section)
+
+    # 批量补充 topics、许可证、最近推送等元数据（一次 GraphQL 请求，结果按仓库缓存）
+    merge_metadata(rows, fetch_metadata([row['name'] for row in rows]))
+
+    # 在往期热榜中检索相似项目（本地哈希向量索引，按天增量更新）
+    similar_section = format_similar_section(rows, similar_today(strdate, rows))
+    if similar_section:
+        with codecs.open(filename, 'a', 'utf-8') as f:
+            f.write(similar_section)
+    record_artifact(filename)
+
+    # 保存结构化行记录，供历史查询与分析使用
+    json_file = artifact_path('github-trending', strdate, '.json')
+    items = [{k: v for k, v in row.items() if k not in ('title', 'stars_text')} for row in rows]
+    with codecs.open(json_file, 'w', 'utf-8') as f:
+        json.dump({'date': strdate, 'items': items}, f, ensure_ascii=False, indent=2)
+    record_artifact(json_file)
+    append_trending(strdate, items)
+
+    # 关注列表命中的仓库单独优先推送（已提醒过的不再重复）
+    try:
+        alert_today(strdate)
+    except Exception as e:
+        print(f"⚠ 关注提醒失败: {str(e)}")
 
     print(f"✓ GitHub trending data saved to: {filename}")
 
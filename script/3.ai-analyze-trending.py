@@ -7,16 +7,34 @@ GitHub Trending AI 分析脚本
 import datetime
 import os
 import json
-import requests
+import sys
 import codecs
 
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.github_meta import format_metadata_section
+from script.utils.llm import chat_completion, is_configured
+from script.utils.manifest import record_artifact
+from script.utils.readme_digest import format_readme_section, readme_digests
+from script.utils.storage import artifact_path, find_artifact
+from script.utils.summarizer import compress_markdown
+from script.utils.trending_records import load_trending_rows
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '15 10 * * *'
+# 本脚本在整次运行预算中的上限（秒）；超时未完成时推送脚本会改用原始榜单
+BUDGET_SECONDS = 240
+# prompt 中单个仓库描述 / README 摘要段落的字符上限，超出时先做抽取式摘要
+PROMPT_SECTION_CHARS = 300
+
 
 def get_trending_markdown_path():
     """获取当天的 trending markdown 文件路径"""
     strdate = datetime.datetime.now().strftime('%Y-%m-%d')
-    stryear = datetime.datetime.now().strftime('%Y')
-    filename = f'output/github-trending/{stryear}/{strdate}.md'
-    return filename
+    return find_artifact('github-trending', strdate, '.md') or artifact_path('github-trending', strdate, '.md', create=False)
 
 
 def read_trending_data(filename):
@@ -34,14 +52,13 @@ def read_trending_data(filename):
 
 def call_ai_analysis(trending_content):
     """调用火山引擎（豆包）大模型 API 进行分析"""
-    api_key = os.environ.get('VOLCENGINE_API_KEY')
-    if not api_key:
+    if not is_configured():
         print("警告: 未设置 VOLCENGINE_API_KEY 环境变量，跳过 AI 分析")
         print("提示: 如需启用 AI 分析，请设置环境变量: export VOLCENGINE_API_KEY=your_key")
         return None
 
-    model = os.environ.get('VOLCENGINE_MODEL', 'ep-20250215154848-djsgr')
-    url = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+    # 逐个仓库压缩过长的描述与 README 段落，控制 prompt 长度
+    trending_content = compress_markdown(trending_content, max_chars=PROMPT_SECTION_CHARS)
 
     # 构建分析 prompt
     prompt = f"""请分析以下 GitHub Trending 数据，提供以下内容：
@@ -50,6 +67,8 @@ def call_ai_analysis(trending_content):
 2. **热门项目分析**: 选取 3-5 个最有趣或最受欢迎的项目，详细介绍它们的特点、价值和应用场景
 3. **技术趋势**: 从这些项目中分析出当前的技术趋势（如 AI、Web3、云原生等）
 4. **推荐关注**: 列出值得开发者关注和学习的项目
+5. **榜单变化**: 如果数据中有“榜单变化”，点评新上榜、排名明显上升和连续多天在榜的项目
+6. **似曾相识**: 如果数据中有“相似的往期热榜项目”，在介绍对应项目时指出它与哪些往期项目相似、有何不同
 
 请用中文回答，使用 markdown 格式，保持专业但易懂的语气。
 
@@ -58,64 +77,22 @@ GitHub Trending 数据:
 {trending_content}
 """
 
-    payload = {
-        "model": model,
-        "messages": [
-            {
-                "role": "system",
-                "content": "你是一位资深技术专家，长期关注开源生态与前沿工程实践。请对以下 GitHub 项目列表中的每一个项目，用一句简洁、准确、有洞察力的话进行解读，说明其核心价值、技术特点或潜在影响。"
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "max_tokens": 2000
-    }
-
-    headers = {
-        "Accept": "application/json",
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    messages = [
+        {
+            "role": "system",
+            "content": "你是一位资深技术专家，长期关注开源生态与前沿工程实践。请对以下 GitHub 项目列表中的每一个项目，用一句简洁、准确、有洞察力的话进行解读，说明其核心价值、技术特点或潜在影响。"
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
 
-    try:
-        print("正在调用 AI 分析...")
-        response = requests.post(url, headers=headers, json=payload, timeout=120)
-
-        if response.status_code == 200:
-            result = response.json()
-            if 'choices' in result and len(result['choices']) > 0:
-                analysis = result['choices'][0]['message']['content']
-                print("✓ AI 分析完成")
-                return analysis
-            else:
-                print("错误: AI 响应格式异常")
-                return None
-        elif response.status_code == 401:
-            print("错误: 认证失败: API Key 无效或已过期")
-            return None
-        elif response.status_code == 429:
-            print("错误: 请求频率超限，请稍后重试")
-            return None
-        else:
-            print(f"错误: API 调用失败 - HTTP {response.status_code}")
-            try:
-                error_detail = response.json()
-                print(f"错误详情: {error_detail}")
-            except:
-                print(f"响应内容: {response.text[:500]}")
-            return None
-
-    except requests.exceptions.Timeout:
-        print("错误: AI 请求超时")
-        return None
-    except requests.exceptions.ConnectionError:
-        print("错误: 网络连接错误")
-        return None
-    except Exception as e:
-        print(f"错误: AI 分析过程出错 - {str(e)}")
-        return None
+    print("正在调用 AI 分析...")
+    analysis = chat_completion(messages, max_tokens=2000, timeout=120)
+    if analysis:
+        print("✓ AI 分析完成")
+    return analysis
 
 
 def save_analysis(analysis_content, output_filename):
@@ -128,6 +105,7 @@ def save_analysis(analysis_content, output_filename):
             f.write(f"> 分析日期: {strdate}\n\n")
             f.write("---\n\n")
             f.write(analysis_content)
+        record_artifact(output_filename)
 
         print(f"✓ 分析结果已保存: {output_filename}")
         return True
@@ -149,23 +127,22 @@ def job():
     if not trending_content:
         return False
 
+    # 附上仓库元数据（topics、许可证、最近推送时间，由抓取脚本合并进结构化记录）与 README 摘要
+    strdate = datetime.datetime.now().strftime('%Y-%m-%d')
+    rows = load_trending_rows(strdate) or []
+    trending_content += format_metadata_section(rows)
+    trending_content += format_readme_section(rows, readme_digests([row['name'] for row in rows]))
+
     # 2. 调用 AI 分析
     analysis = call_ai_analysis(trending_content)
 
     if not analysis:
-        print("\nAI 分析未完成，跳过保存步骤")
+        print("\nAI 分析未完成，跳过保存步骤（推送将使用离线摘要）")
         return False
 
     # 3. 保存分析结果
-    strdate = datetime.datetime.now().strftime('%Y-%m-%d')
-    stryear = datetime.datetime.now().strftime('%Y')
-
-    # 确保输出目录存在
-    if not os.path.exists(stryear):
-        os.makedirs(stryear)
-
-    # 保存到 {YEAR}/{DATE}-analysis.md
-    analysis_file = f'output/github-trending/{stryear}/{strdate}-analysis.md'
+    # 保存到 output/github-trending/{YEAR}/{MONTH}/{DATE}-analysis.md
+    analysis_file = artifact_path('github-trending', strdate, '-analysis.md')
     success = save_analysis(analysis, analysis_file)
 
     if success:
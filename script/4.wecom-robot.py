@@ -2,175 +2,111 @@
 
 import datetime
 import codecs
-import requests
 import os
 import time
 from pyquery import PyQuery as pq
+import sys
 import json
 
-# git_helper import removed - unused
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 
+from script.utils.entity_link import link_today
+from script.utils.wecom import get_msgtypes, send_wecom_payload
+from script.utils.storage import artifact_path, find_artifact
+from script.utils.render import (payload_text, render_news, render_news_artifact,
+                                 render_trending_artifact, trending_source)
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '30 10 * * *'
+# 无论前面的脚本用掉多少时间，都为推送预留的预算（秒）
+RESERVE_SECONDS = 30
 
 
 def create_content_from_json(json_file):
     try:
         with codecs.open(json_file, 'r', 'utf-8') as f:
             news_data = json.loads(f.read())
-
-        # 构建markdown内容
-        content = f"""# AI快讯 ({news_data['date']} {news_data['weekday']})
-## 今日要闻
-"""
-        for item in news_data['items']:
-            content += f"""### {item['title']}
-> {item['content']}
-来源：{item['source']} [查看详情]({item['url']})
-
-"""
-        return content
+        return payload_text(render_news(news_data, 'markdown'))
     except Exception as e:
         print(f"创建消息内容失败: {str(e)}")
         return None
 
 def create_trending_content():
     """优先从AI分析文件创建内容，如果不存在则使用原始trending数据"""
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
     try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        year = datetime.datetime.now().strftime('%Y')
-
-        # 优先尝试AI分析文件
-        analysis_file = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'output',
-            'github-trending',
-            year,
-            f'{today}-analysis.md'
-        )
-
-        # 回退到原始trending文件
-        trending_file = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'output',
-            'github-trending',
-            year,
-            f'{today}.md'
-        )
-
-        content = None
-        source_type = ""
-
-        # 优先使用AI分析结果
-        if os.path.exists(analysis_file):
-            print(f"✓ 找到AI分析文件: {analysis_file}")
-            with codecs.open(analysis_file, 'r', 'utf-8') as f:
-                content = f.read()
-            source_type = "AI分析"
-        elif os.path.exists(trending_file):
-            print(f"⚠ 未找到AI分析文件，使用原始trending数据: {trending_file}")
-            with codecs.open(trending_file, 'r', 'utf-8') as f:
-                content = f.read()
-            source_type = "原始数据"
-        else:
-            print(f"✗ 未找到任何数据文件")
-            print(f"  - AI分析: {analysis_file}")
-            print(f"  - 原始数据: {trending_file}")
-            return None
-
-        # 单独发送，可以使用全部 4096 字节（留一些缓冲）
-        max_bytes = 3800  # 预留 296 字节给标题等
-        current_bytes = len(content.encode('utf-8'))
-
-        if current_bytes > max_bytes:
-            # 截断到接近 max_bytes，但保留完整字符
-            content_utf8 = content.encode('utf-8')
-            content = content_utf8[:max_bytes].decode('utf-8', errors='ignore')
-            content += "\n\n... (更多内容请查看仓库)"
-
-        print(f"GitHub trending 内容 ({source_type}): {current_bytes} 字节 (限制: {max_bytes})")
-
-        return content
+        payload = render_trending_artifact(today, 'markdown')
     except Exception as e:
         print(f"读取 GitHub trending 数据失败: {str(e)}")
         return None
+    return payload_text(payload) if payload else None
+
+def send_all(webhook_url, title, render, date):
+    """按配置的消息类型逐个渲染并发送（渲染结果按产物内容缓存，重发不会重新渲染）"""
+    sent = False
+    for msgtype in get_msgtypes():
+        try:
+            payload = render(date, msgtype)
+        except Exception as e:
+            print(f"✗ 渲染 {title}（{msgtype}）失败: {str(e)}")
+            continue
+        if payload is None:
+            return False
+        text = payload_text(payload)
+        size = f"{len(text.encode('utf-8'))} 字节" if text is not None else f"{len(payload['news']['articles'])} 条图文"
+        print(f"{title}（{msgtype}）: {size}")
+        if send_wecom_payload(webhook_url, payload):
+            print(f"✓ {title}（{msgtype}）已成功发送到企业微信")
+            sent = True
+    return sent
 
 def job():
     """发送两条独立的消息：AI News 和 GitHub Trending"""
     today = datetime.datetime.now().strftime('%Y-%m-%d')
-    year = datetime.datetime.now().strftime('%Y')
     webhook_url = os.environ.get('WECOM_WEBHOOK_URL')
 
     if not webhook_url:
         print("错误: 未设置环境变量 WECOM_WEBHOOK_URL")
         return
 
+    # 关联新闻与热榜仓库（保存为 {date}-links.json），两条消息互相标注
+    try:
+        links = link_today(today)
+        if links:
+            print(f"✓ 新闻与热榜关联 {len(links)} 条")
+    except Exception as e:
+        print(f"⚠ 新闻与热榜关联失败: {str(e)}")
+
     # ========== 第一条消息：AI News ==========
-    json_file = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)),
-        'output',
-        'ai-news',
-        year,
-        f'{today}.json'
-    )
-
-    if os.path.exists(json_file):
+    if find_artifact('ai-news', today, '.json'):
         print("\n" + "="*60)
         print("发送第一条消息: AI 快讯")
         print("="*60)
-
-        news_content = create_content_from_json(json_file)
-        if news_content:
-            if send_wecom_message(webhook_url, news_content):
-                print("✓ AI 快讯已成功发送到企业微信")
-        else:
-            print("✗ 创建 AI 快讯内容失败")
+        send_all(webhook_url, 'AI 快讯', render_news_artifact, today)
     else:
-        print(f"未找到今日的新闻数据: {json_file}")
+        print(f"未找到今日的新闻数据: {artifact_path('ai-news', today, '.json', create=False)}")
 
     # ========== 第二条消息：GitHub Trending ==========
     print("\n" + "="*60)
     print("发送第二条消息: GitHub Trending")
     print("="*60)
 
-    trending_content = create_trending_content()
-    if trending_content:
-        # 检查内容是否已包含标题（AI分析结果自带标题）
-        if not trending_content.startswith('#'):
-            # 原始trending数据，需要添加标题
-            full_trending_message = "# GitHub Trending 今日热榜\n\n" + trending_content
-        else:
-            # AI分析结果，已有标题，直接使用
-            full_trending_message = trending_content
-
-        if send_wecom_message(webhook_url, full_trending_message):
-            print("✓ GitHub Trending 已成功发送到企业微信")
+    source_type, document, _ = trending_source(today)
+    if document is not None:
+        print(f"✓ 使用{source_type}")
+        send_all(webhook_url, 'GitHub Trending', render_trending_artifact, today)
     else:
-        print("✗ 未找到 GitHub Trending 数据")
+        print(f"✗ 未找到 GitHub Trending 数据")
+        print(f"  - AI分析: {artifact_path('github-trending', today, '-analysis.md', create=False)}")
+        print(f"  - 原始数据: {artifact_path('github-trending', today, '.md', create=False)}")
 
     print("\n" + "="*60)
     print("消息发送完成")
     print("="*60)
 
-def send_wecom_message(webhook_url, content):
-    headers = {
-        'Content-Type': 'application/json'
-    }
-    data = {
-        'msgtype': 'markdown',
-        'markdown': {
-            'content': content
-        }
-    }
-    try:
-        response = requests.post(webhook_url, headers=headers, json=data, timeout=10)
-        response.raise_for_status()
-        result = response.json()
-        if result['errcode'] != 0:
-            print(f"发送消息失败: {result['errmsg']}")
-            return False
-        return True
-    except Exception as e:
-        print(f"发送消息时发生错误: {str(e)}")
-        return False
 def create_content():
     content = """# 项目日报通知
 ## 项目进展
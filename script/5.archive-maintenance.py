@@ -0,0 +1,34 @@
+# coding:utf-8
+"""
+归档维护脚本
+把错位的产物迁移到 output/{类别}/{年}/{月}/ 分片目录，并把过去月份打包成 zip 归档
+"""
+
+import datetime
+import os
+import sys
+
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.storage import compact_archives, relocate_misplaced
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '0 4 * * *'
+
+
+def job():
+    """主任务函数"""
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
+
+    moved = relocate_misplaced()
+    print(f"✓ 迁移错位文件: {moved} 个")
+
+    packed = compact_archives(today)
+    print(f"✓ 打包历史月份文件: {packed} 个")
+
+
+if __name__ == '__main__':
+    job()
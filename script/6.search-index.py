@@ -0,0 +1,37 @@
+# coding:utf-8
+"""
+全文检索索引脚本
+把最近几天及尚未索引过的 AI 新闻与 Trending 分析报告增量写入 SQLite FTS5 索引（首次运行时扫描全部归档）
+检索: python -m script.utils.search_index query "关键词"
+"""
+
+import datetime
+import os
+import sys
+
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.search_index import DB_FILE, update_index
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '45 * * * *'
+# 最近几天的产物可能被补跑或重写，每次都重新检查；更早的日期只补索引尚未索引过的
+RECENT_DAYS = 7
+
+
+def job():
+    """主任务函数"""
+    if not os.path.exists(DB_FILE):
+        print("未找到检索索引，从全部归档构建...")
+        count = update_index()
+    else:
+        since = (datetime.datetime.now() - datetime.timedelta(days=RECENT_DAYS)).strftime('%Y-%m-%d')
+        count = update_index(since=since)
+    print(f"✓ 检索索引已更新，新写入 {count} 个文档")
+
+
+if __name__ == '__main__':
+    job()
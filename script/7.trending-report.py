@@ -0,0 +1,35 @@
+# coding:utf-8
+"""
+Trending 周报/月报脚本
+基于历史热榜的列式统计，生成上一个完整周/月的语言占比、星标中位数与在榜时长报告
+输出: output/reports/{YEAR}/trending-{YEAR}-W{WEEK}.md、trending-{YEAR}-{MONTH}.md
+"""
+
+import datetime
+import os
+import sys
+
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.trending_analytics import write_report
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '20 4 * * *'
+
+
+def job():
+    """主任务函数：上一个完整周期的报告不存在时生成"""
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
+    for period in ('week', 'month'):
+        path = write_report(period, today)
+        if path:
+            print(f"✓ 已生成报告: {path}")
+        else:
+            print(f"报告已存在，跳过 ({period})")
+
+
+if __name__ == '__main__':
+    job()
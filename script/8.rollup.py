@@ -0,0 +1,44 @@
+# coding:utf-8
+"""
+周/月滚动聚合脚本
+每天把前一天的新闻与热榜折叠进周、月聚合；周期结束后基于聚合生成回顾并推送到企业微信
+输出: output/reports/{YEAR}/rollup-{周期}.json、digest-{周期}.md
+"""
+
+import datetime
+import os
+import sys
+
+# 保证单独运行脚本时也能导入 script.utils
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from script.utils.rollup import PERIODS, publish_digest, update_rollups
+
+# 常驻模式下的 cron 表达式（python main.py --daemon）
+SCHEDULE = '40 10 * * *'
+
+# 补齐最近几天漏掉的数据（例如某天任务失败）
+CATCH_UP_DAYS = 7
+
+
+def job():
+    """主任务函数"""
+    today = datetime.date.today()
+
+    # 只折叠已经结束的日期，当天的新闻在常驻模式下仍会更新
+    for offset in range(CATCH_UP_DAYS, 0, -1):
+        date = (today - datetime.timedelta(days=offset)).isoformat()
+        labels = update_rollups(date)
+        if labels:
+            print(f"✓ 已折叠 {date} 到: {', '.join(labels)}")
+
+    for period in PERIODS:
+        path = publish_digest(period, today.isoformat())
+        if path:
+            print(f"✓ 已生成回顾: {path}")
+
+
+if __name__ == '__main__':
+    job()
@@ -0,0 +1,48 @@
+# coding:utf-8
+"""AI 快讯批量分类/摘要的 Prompt 模板"""
+
+
+NEWS_CATEGORIES = ['大模型', '产品发布', '融资并购', '政策监管', '研究论文', '开源项目', '硬件算力', '行业应用', '其他']
+
+
+def get_news_enrich_prompt(items):
+    """
+    生成批量分类、打标签、摘要的 prompt
+
+    Args:
+        items: list[dict], 新闻条目，每条包含 id, title, content
+
+    Returns:
+        str: AI 分析的 prompt
+    """
+    news_text = ""
+    for item in items:
+        news_text += f"""
+[{item['id']}] {item.get('title', '')}
+   {(item.get('content') or '')[:500]}
+"""
+
+    return f"""你是一位 AI 行业编辑，请为以下 {len(items)} 条 AI 快讯分别完成分类、打标签和一句话摘要。
+
+可选分类：{'、'.join(NEWS_CATEGORIES)}
+
+新闻列表：
+{news_text}
+
+请严格按照以下 JSON 格式返回：
+{{
+    "items": [
+        {{
+            "id": 新闻编号（与上面方括号中的数字一致）,
+            "category": "分类（必须是可选分类之一）",
+            "tags": ["标签1", "标签2"],
+            "summary": "一句话摘要（30 字以内）"
+        }}
+    ]
+}}
+
+注意：
+1. 必须返回有效的 JSON 格式，不要包含其他文字
+2. 每条新闻都要返回，id 不能遗漏
+3. tags 为 1-3 个关键词（公司、产品、技术名）
+"""
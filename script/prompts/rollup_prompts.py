@@ -0,0 +1,28 @@
+# coding:utf-8
+"""周报/月报摘要的 Prompt 模板"""
+
+
+def get_rollup_digest_prompt(summary, period_name):
+    """
+    生成周期摘要的 prompt
+
+    Args:
+        summary: str, 周期聚合数据的精简文本（计数、热门仓库、反复出现的新闻话题）
+        period_name: str, '本周' 或 '本月'
+
+    Returns:
+        str: AI 分析的 prompt
+    """
+    return f"""你是一位关注 AI 行业与开源生态的技术编辑。
+
+以下是{period_name}每日 AI 快讯与 GitHub Trending 的汇总统计（已聚合，不含原文）：
+
+{summary}
+
+请基于这些统计写一段{period_name}回顾：
+1. 用 3-5 句话概括{period_name}的整体动向
+2. 点出 2-3 个持续升温的话题或技术方向，说明依据（出现天数、在榜天数、星标增长）
+3. 推荐 1-3 个值得持续关注的项目
+
+要求：使用中文 markdown，不要标题，不要编造统计中没有的数据，总字数控制在 400 字以内。
+"""
@@ -0,0 +1,40 @@
+# coding:utf-8
+"""arXiv AI 相关分类的最新论文（Atom API）"""
+
+import re
+
+from script.utils.sources import Source
+
+
+CATEGORIES = ('cs.AI', 'cs.CL', 'cs.LG')
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+class ArxivSource(Source):
+    SOURCE_ID = 'arxiv'
+    URLS = [f'https://export.arxiv.org/api/query?search_query=cat:{cat}'
+            f'&sortBy=submittedDate&sortOrder=descending&max_results=50' for cat in CATEGORIES]
+    FORMAT = 'xml'
+    EXTRACT = {
+        'items': 'entry',
+        'fields': {
+            'title': 'title',
+            'url': 'id',
+            'summary': 'summary',
+            'authors': {'css': 'author name', 'many': True},
+            'category': {'css': 'primary_category', 'attr': 'term'},
+            'published': 'published',
+        },
+    }
+    SCHEMA = {'title': str, 'url': str, 'summary': str, 'authors': list, 'category': str, 'published': str}
+    SCHEDULE = '0 */6 * * *'
+    # arXiv API 要求单连接、请求间隔不少于 3 秒
+    CONCURRENCY = 1
+    REQUEST_INTERVAL = 3
+    CACHE_TTL = 3600
+
+    def transform(self, item):
+        item['title'] = _SPACE_RE.sub(' ', item['title'])
+        item['summary'] = _SPACE_RE.sub(' ', item.get('summary') or '')[:500]
+        return item
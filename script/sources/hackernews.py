@@ -0,0 +1,32 @@
+# coding:utf-8
+"""Hacker News 首页（Algolia 搜索 API，一次请求返回全部首页条目）"""
+
+from script.utils.sources import Source
+
+
+class HackerNewsSource(Source):
+    SOURCE_ID = 'hackernews'
+    URLS = ['https://hn.algolia.com/api/v1/search?tags=front_page&hitsPerPage=50']
+    FORMAT = 'json'
+    EXTRACT = {
+        'items': 'hits',
+        'fields': {
+            'id': 'objectID',
+            'title': 'title',
+            'url': 'url',
+            'points': 'points',
+            'comments': 'num_comments',
+            'author': 'author',
+            'created_at': 'created_at',
+        },
+    }
+    SCHEMA = {'id': str, 'title': str, 'url': str, 'points': int, 'comments': int, 'author': str}
+    REQUIRED = ('id', 'title')
+    KEY = 'id'
+    SCHEDULE = '0 * * * *'
+
+    def transform(self, item):
+        # Ask HN 等站内帖子没有外链
+        item['discussion'] = f"https://news.ycombinator.com/item?id={item['id']}"
+        item['url'] = item.get('url') or item['discussion']
+        return item
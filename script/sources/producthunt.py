@@ -0,0 +1,30 @@
+# coding:utf-8
+"""Product Hunt 每日新品（Atom feed，无需 API token）"""
+
+from pyquery import PyQuery as pq
+
+from script.utils.sources import Source
+
+
+class ProductHuntSource(Source):
+    SOURCE_ID = 'producthunt'
+    URLS = ['https://www.producthunt.com/feed']
+    FORMAT = 'xml'
+    EXTRACT = {
+        'items': 'entry',
+        'fields': {
+            'title': 'title',
+            'url': {'css': 'link', 'attr': 'href'},
+            'content': 'content',
+            'author': 'author name',
+            'published': 'published',
+        },
+    }
+    SCHEMA = {'title': str, 'url': str, 'content': str, 'author': str, 'published': str}
+    SCHEDULE = '10 */3 * * *'
+
+    def transform(self, item):
+        # content 是转义后的 HTML 片段
+        if item.get('content'):
+            item['content'] = pq(f"<div>{item['content']}</div>").text()[:300]
+        return item
@@ -5,5 +5,6 @@ Script utilities package
 """
 
 from .git_helper import git_add_commit_push
+from .manifest import record_artifact
 
-__all__ = ['git_add_commit_push']
+__all__ = ['git_add_commit_push', 'record_artifact']
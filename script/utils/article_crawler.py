@@ -0,0 +1,409 @@
+# coding:utf-8
+
+"""
+新闻原文抓取
+沿着快讯条目的 url 抓取原文页面：有界线程池并发，按域名限制并发数与请求间隔并遵守 robots.txt；
+用 readability 风格的打分算法提取正文，结果按 URL 缓存（ETag / Last-Modified 条件请求），
+每篇正文抓完即写入 .cache/articles/ 下的独立文件，内存中只保留索引
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import lxml.html
+
+from .deadline import DeadlineExceeded, bind_context, stage_timeout
+from .http import get_session
+from .storage import CACHE_DIR
+
+
+ARTICLES_DIR = os.path.join(CACHE_DIR, 'articles')
+MAX_WORKERS = int(os.environ.get('ARTICLE_WORKERS', '8'))
+# 同一域名的并发请求数与两次请求的最小间隔（秒）
+PER_HOST = 2
+HOST_INTERVAL = 1.0
+# 缓存有效期（秒），过期后发条件请求
+ARTICLE_TTL = 24 * 3600
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MIN_PARAGRAPH = 25
+USER_AGENT = 'Mozilla/5.0 (compatible; github-schedule-crawler/1.0)'
+
+# ---------- 正文提取 ----------
+
+REMOVE_TAGS = ('script', 'style', 'noscript', 'iframe', 'form', 'nav', 'footer', 'header', 'aside', 'svg', 'button')
+POSITIVE_RE = re.compile(r'article|body|content|entry|main|page|post|text|blog|story|rich_media|detail', re.I)
+NEGATIVE_RE = re.compile(r'comment|meta|footer|footnote|sidebar|share|related|recommend|\bad\b|ads|promo|nav|menu|'
+                         r'banner|breadcrumb|copyright|qrcode|login', re.I)
+BLOCK_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'pre')
+PUNCTUATION_RE = re.compile(r'[,，。、；;]')
+
+
+def _class_weight(el):
+    weight = 0
+    for attr in (el.get('class'), el.get('id')):
+        if attr:
+            if NEGATIVE_RE.search(attr):
+                weight -= 25
+            if POSITIVE_RE.search(attr):
+                weight += 25
+    return weight
+
+
+def _text(el):
+    return ' '.join(el.text_content().split())
+
+
+def _link_density(el):
+    length = len(_text(el))
+    if not length:
+        return 1.0
+    return sum(len(_text(a)) for a in el.iter('a')) / length
+
+
+def _inside_block(el, root):
+    for ancestor in el.iterancestors():
+        if ancestor is root:
+            return False
+        if ancestor.tag in BLOCK_TAGS:
+            return True
+    return False
+
+
+def extract_article(html):
+    """
+    提取正文
+
+    对每个足够长的段落，按逗号数与长度给父节点加分、祖父节点加一半，
+    再按 class/id 权重与链接密度修正，取得分最高的节点中的段落作为正文
+
+    Returns:
+        dict: title, text（没有正文时 text 为空字符串）
+    """
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return {'title': '', 'text': ''}
+
+    title = ''
+    for selector in ('//meta[@property="og:title"]/@content', '//title/text()', '//h1//text()'):
+        found = doc.xpath(selector)
+        if found and str(found[0]).strip():
+            title = ' '.join(str(found[0]).split())
+            break
+    description = doc.xpath('//meta[@property="og:description" or @name="description"]/@content')
+
+    for el in list(doc.iter(*REMOVE_TAGS)):
+        el.drop_tree()
+    for el in list(doc.iter(lxml.etree.Comment)):
+        el.drop_tree()
+    # 明显是评论、推荐、分享区的容器整个去掉
+    for el in list(doc.iter('div', 'section', 'ul')):
+        if _class_weight(el) < 0:
+            el.drop_tree()
+
+    scores = {}
+    for el in doc.iter('p', 'pre', 'section', 'div', 'td'):
+        # div/section 只在直接包含文本（没有块级子元素）时视为段落
+        if el.tag in ('div', 'section', 'td') and any(child.tag in ('p', 'div', 'section', 'table', 'ul', 'ol')
+                                                      for child in el):
+            continue
+        text = _text(el)
+        if len(text) < MIN_PARAGRAPH:
+            continue
+        score = 1 + len(PUNCTUATION_RE.findall(text)) + min(len(text) // 100, 3)
+        parent = el.getparent()
+        if parent is None:
+            continue
+        for node, share in ((parent, 1.0), (parent.getparent(), 0.5)):
+            if node is None or not isinstance(node.tag, str):
+                continue
+            if node not in scores:
+                scores[node] = _class_weight(node)
+            scores[node] += score * share
+
+    if not scores:
+        return {'title': title, 'text': str(description[0]).strip() if description else ''}
+
+    best = max(scores, key=lambda node: scores[node] * (1 - _link_density(node)))
+    blocks = []
+    for el in best.iter(*BLOCK_TAGS):
+        # 嵌套的块（如 li 里的 p）只取外层一次
+        if _inside_block(el, best):
+            continue
+        text = _text(el)
+        if text and _link_density(el) < 0.5:
+            blocks.append(text)
+    if not blocks:
+        blocks = [_text(best)]
+    return {'title': title, 'text': '\n\n'.join(blocks)}
+
+
+# ---------- 礼貌抓取 ----------
+
+class HostLimiter:
+    """按域名限制并发数与请求间隔"""
+
+    def __init__(self, per_host=PER_HOST, interval=HOST_INTERVAL, clock=time.monotonic, sleep=time.sleep):
+        self.per_host = per_host
+        self.interval = interval
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = defaultdict(float)
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+    def acquire(self, host):
+        self._semaphore(host).acquire()
+        with self._lock:
+            # 预约下一个可用时间点，等待在锁外进行
+            start = max(self.clock(), self._next_slot[host])
+            self._next_slot[host] = start + self.interval
+        delay = start - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def release(self, host):
+        self._semaphore(host).release()
+
+
+def interleave_by_host(urls):
+    """按域名轮流排列，避免线程池被同一个域名的请求占满"""
+    queues = defaultdict(deque)
+    for url in urls:
+        queues[urlsplit(url).netloc].append(url)
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].popleft())
+            if not queues[host]:
+                del queues[host]
+    return ordered
+
+
+def _get(url, headers):
+    response = get_session().get(url, headers={'User-Agent': USER_AGENT, **headers},
+                                  timeout=stage_timeout(15, minimum=2), stream=True)
+    # 限制读取大小，避免超大页面占满内存
+    body = bytearray()
+    for chunk in response.iter_content(64 * 1024):
+        body += chunk
+        if len(body) > MAX_PAGE_BYTES:
+            break
+    response.close()
+    response._content = bytes(body)
+    if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+        response.encoding = response.apparent_encoding
+    return response
+
+
+# ---------- 缓存与调度 ----------
+
+def _key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+class ArticleCache:
+    """
+    原文缓存：index.json 保存 URL -> {etag, last_modified, fetched_at, title, chars}，
+    正文写在 {sha1[:2]}/{sha1}.txt
+    """
+
+    def __init__(self, directory=None, clock=time.time):
+        self.directory = directory or ARTICLES_DIR
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.clock = clock
+        self.index = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"警告: 原文索引损坏，重新开始: {e}")
+
+    def text_path(self, url):
+        key = _key(url)
+        return os.path.join(self.directory, key[:2], f'{key}.txt')
+
+    def entry(self, url):
+        return self.index.get(url)
+
+    def is_fresh(self, url, ttl=ARTICLE_TTL):
+        entry = self.index.get(url)
+        return entry is not None and self.clock() - entry['fetched_at'] < ttl
+
+    def store(self, url, article, response):
+        """正文直接写盘，索引只记录元数据"""
+        path = self.text_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(article['text'])
+        os.replace(tmp, path)
+        with self._lock:
+            self.index[url] = {'etag': response.headers.get('ETag'),
+                               'last_modified': response.headers.get('Last-Modified'),
+                               'fetched_at': self.clock(), 'title': article['title'], 'chars': len(article['text'])}
+
+    def touch(self, url):
+        with self._lock:
+            self.index[url]['fetched_at'] = self.clock()
+
+    def read(self, url):
+        # 只看正文文件：其他实例（如常驻模式下每次任务新建的爬虫）写入的原文也能读到
+        path = self.text_path(url)
+        if not url or not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self.index_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+
+
+class Crawler:
+    """
+    用法:
+        stats = Crawler().crawl([item['url'] for item in news['items']])
+        text = load_article(url)
+    """
+
+    def __init__(self, cache=None, fetch=_get, limiter=None, max_workers=MAX_WORKERS, respect_robots=True):
+        self.cache = cache or ArticleCache()
+        self.fetch = fetch
+        self.limiter = limiter or HostLimiter()
+        self.max_workers = max_workers
+        self.respect_robots = respect_robots
+        self._robots = {}
+        self._robots_lock = threading.Lock()
+
+    def allowed(self, url):
+        """robots.txt 是否允许抓取（获取失败时视为允许）"""
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        with self._robots_lock:
+            parser = self._robots.get(origin)
+        if parser is None:
+            parser = robotparser.RobotFileParser()
+            try:
+                response = self.fetch(origin + '/robots.txt', {})
+                parser.parse(response.text.splitlines() if response.status_code == 200 else [])
+            except Exception:
+                parser.parse([])
+            with self._robots_lock:
+                self._robots[origin] = parser
+        return parser.can_fetch(USER_AGENT, url)
+
+    def crawl_one(self, url):
+        """
+        抓取单篇原文
+
+        Returns:
+            str: 'cached' / 'not_modified' / 'fetched' / 'empty' / 'disallowed' / 'failed'
+        """
+        if self.cache.is_fresh(url):
+            return 'cached'
+        if not self.allowed(url):
+            return 'disallowed'
+
+        entry = self.cache.entry(url)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        host = urlsplit(url).netloc
+        self.limiter.acquire(host)
+        try:
+            response = self.fetch(url, headers)
+        except DeadlineExceeded:
+            return 'failed'
+        except Exception as e:
+            print(f"⚠ 抓取原文失败 {url}: {str(e)}")
+            return 'failed'
+        finally:
+            self.limiter.release(host)
+
+        if response.status_code == 304 and entry:
+            self.cache.touch(url)
+            return 'not_modified'
+        if response.status_code >= 400:
+            print(f"⚠ 抓取原文失败 {url}: HTTP {response.status_code}")
+            return 'failed'
+        article = extract_article(response.text)
+        self.cache.store(url, article, response)
+        return 'fetched' if article['text'] else 'empty'
+
+    def crawl(self, urls):
+        """
+        并发抓取一组 URL，正文逐篇写盘
+
+        Returns:
+            dict: 各状态的计数
+        """
+        urls = interleave_by_host(dict.fromkeys(u for u in urls if u and u.startswith('http')))
+        stats = defaultdict(int)
+        if not urls:
+            return dict(stats)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(urls))),
+                                thread_name_prefix='article') as pool:
+            for status in pool.map(bind_context(self.crawl_one), urls):
+                stats[status] += 1
+        self.cache.save()
+        return dict(stats)
+
+
+def crawl_news(news, crawler=None):
+    """抓取一天快讯（跳过重复条目）的原文，返回各状态计数"""
+    crawler = crawler or Crawler()
+    return crawler.crawl(item['url'] for item in news['items'] if not item.get('duplicate_of'))
+
+
+_default_cache = None
+
+
+def load_article(url, cache=None):
+    """读取已抓取的原文，没有时返回 None"""
+    global _default_cache
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = ArticleCache()
+        cache = _default_cache
+    return cache.read(url)
+
+
+def article_excerpt(url, limit=500, cache=None):
+    """原文开头（按段落截断到 limit 个字符），没有原文时返回 None"""
+    text = load_article(url, cache)
+    if not text:
+        return None
+    excerpt = []
+    used = 0
+    for paragraph in text.split('\n\n'):
+        if used and used + len(paragraph) > limit:
+            break
+        excerpt.append(paragraph[:limit - used])
+        used += len(excerpt[-1])
+    return '\n'.join(excerpt)
@@ -0,0 +1,115 @@
+# coding:utf-8
+
+"""
+运行时间预算
+Deadline 记录整次运行（或单个任务）的截止时间，通过 contextvars 在调用链中隐式传递；
+各阶段用 stage_timeout() 把固定超时收紧到剩余预算内，预算不足时直接走降级路径而不是超时等待
+"""
+
+import contextvars
+import functools
+import math
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """剩余预算不足以开始某个阶段"""
+
+
+class Deadline:
+    """
+    截止时间
+
+    用法:
+        with Deadline(600, 'run'):
+            ...
+            timeout = stage_timeout(10)  # 不超过 10 秒，也不超过剩余预算
+    """
+
+    def __init__(self, seconds=None, name='run', clock=time.monotonic, expires_at=None):
+        self.name = name
+        self.clock = clock
+        if expires_at is not None:
+            self.expires_at = expires_at
+        else:
+            self.expires_at = clock() + seconds if seconds is not None else math.inf
+        self._token = None
+
+    def remaining(self):
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, default, minimum=1.0):
+        """
+        本阶段可用的超时：不超过 default，也不超过剩余预算
+
+        Raises:
+            DeadlineExceeded: 剩余预算小于 minimum
+        """
+        remaining = self.remaining()
+        if remaining < minimum:
+            raise DeadlineExceeded(f"{self.name} 剩余预算 {remaining:.1f} 秒，不足 {minimum} 秒")
+        return min(default, remaining) if default is not None else remaining
+
+    def child(self, name, seconds=None, reserve=0.0):
+        """
+        子阶段的截止时间：不晚于父级，且为后续阶段预留 reserve 秒
+
+        Args:
+            seconds: 子阶段自身的预算上限，None 表示只受父级约束
+        """
+        expires_at = self.expires_at - reserve
+        if seconds is not None:
+            expires_at = min(expires_at, self.clock() + seconds)
+        return Deadline(name=name, clock=self.clock, expires_at=expires_at)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self._token = None
+        return False
+
+    def __repr__(self):
+        remaining = 'unlimited' if math.isinf(self.expires_at) else f"{self.remaining():.1f}s"
+        return f"<Deadline {self.name} {remaining}>"
+
+
+UNLIMITED = Deadline(name='unlimited')
+_current = contextvars.ContextVar('deadline', default=UNLIMITED)
+
+
+def current_deadline():
+    return _current.get()
+
+
+def stage_timeout(default, minimum=1.0):
+    """当前截止时间下的超时（见 Deadline.timeout）"""
+    return current_deadline().timeout(default, minimum)
+
+
+def bind_context(func):
+    """
+    绑定当前上下文（包括截止时间），用于提交到线程池的函数
+
+    ThreadPoolExecutor 不会自动传递 contextvars，工作线程中需要用它恢复调用方的截止时间
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def with_deadline(func, seconds, name=None):
+    """包装任务函数：每次执行都在独立的截止时间下运行（常驻模式使用）"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Deadline(seconds, name or getattr(func, '__name__', 'job')):
+            return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,169 @@
+# coding:utf-8
+
+"""
+新闻与热榜的实体关联
+用当天热榜仓库的全名、仓库名、别名与所有者建内存索引，编译成 Aho-Corasick 自动机后扫描新闻标题与内容；
+关联结果保存为 ai-news 的 {date}-links.json，两条推送消息据此互相标注，历史查询直接读取关联记录而不必重新扫描文本
+"""
+
+import json
+import re
+from urllib.parse import urlsplit
+
+from .manifest import record_artifact
+from .storage import artifact_path, list_dates, read_artifact
+from .trending_records import load_trending_rows
+from .watchlist import AhoCorasick
+
+
+# 太常见、不足以指代某个仓库的名字
+GENERIC_NAMES = {
+    'ai', 'llm', 'llms', 'gpt', 'app', 'api', 'apis', 'cli', 'sdk', 'web', 'core', 'docs', 'doc', 'server', 'client',
+    'agent', 'agents', 'chat', 'tools', 'tool', 'models', 'model', 'data', 'code', 'examples', 'awesome', 'skills',
+    'openai', 'google', 'microsoft', 'meta', 'github', 'apple', 'amazon', 'aws', 'home', 'main', 'test', 'demo',
+    'python', 'rust', 'go', 'java', 'react', 'vue', 'node', 'linux', 'windows', 'android', 'ios', 'desktop', 'mobile',
+    'plugin', 'plugins', 'config', 'template', 'templates', 'project', 'system', 'framework', 'library', 'lib',
+}
+MIN_ALIAS_LENGTH = 3
+# 关联类型的优先级：全名 > 仓库名/别名 > 所有者
+KIND_PRIORITY = {'repo': 0, 'name': 1, 'owner': 2}
+
+
+def repo_aliases(row):
+    """
+    一个热榜仓库的别名
+
+    Returns:
+        list[(别名, 类型)]: 类型为 repo（owner/repo）、name（仓库名、空格形式、主页域名）、owner
+    """
+    owner, _, repo = row['name'].partition('/')
+    aliases = [(row['name'], 'repo')]
+
+    def usable(alias):
+        return len(alias) >= MIN_ALIAS_LENGTH and alias.lower() not in GENERIC_NAMES
+
+    if usable(repo):
+        aliases.append((repo, 'name'))
+        spaced = re.sub(r'[-_]+', ' ', repo).strip()
+        if spaced != repo and usable(spaced):
+            aliases.append((spaced, 'name'))
+    homepage = urlsplit(row.get('homepage') or '').netloc.lower()
+    if homepage.startswith('www.'):
+        homepage = homepage[4:]
+    if homepage and not homepage.endswith(('github.io', 'github.com')):
+        aliases.append((homepage, 'name'))
+    if usable(owner) and owner.lower() != repo.lower():
+        aliases.append((owner, 'owner'))
+    return aliases
+
+
+class TrendingIndex:
+    """当天热榜的别名索引与编译好的匹配器"""
+
+    def __init__(self, rows):
+        self.rows = {row['name']: row for row in rows}
+        # 小写别名 -> [(仓库名, 类型)]
+        self.aliases = {}
+        for row in rows:
+            for alias, kind in repo_aliases(row):
+                targets = self.aliases.setdefault(alias.lower(), [])
+                if (row['name'], kind) not in targets:
+                    targets.append((row['name'], kind))
+        self.matcher = AhoCorasick(self.aliases)
+
+    def match(self, text):
+        """
+        Returns:
+            dict: 仓库名 -> (命中的别名, 类型)，同一仓库多次命中时保留优先级最高的类型
+        """
+        found = {}
+        for alias in self.matcher.search(text):
+            for repo, kind in self.aliases[alias.lower()]:
+                if repo not in found or KIND_PRIORITY[kind] < KIND_PRIORITY[found[repo][1]]:
+                    found[repo] = (alias, kind)
+        return found
+
+
+def link_news(news_items, rows):
+    """
+    把新闻与热榜仓库关联
+
+    Returns:
+        list[dict]: news_url, news_title, repo, repo_url, rank, matched, kind
+    """
+    index = TrendingIndex(rows)
+    links = []
+    for item in news_items:
+        if item.get('duplicate_of'):
+            continue
+        matched = index.match(f"{item.get('title', '')}\n{item.get('content', '')}")
+        for repo, (alias, kind) in sorted(matched.items(), key=lambda kv: KIND_PRIORITY[kv[1][1]]):
+            row = index.rows[repo]
+            links.append({'news_url': item['url'], 'news_title': item.get('title', ''), 'repo': repo,
+                          'repo_url': row.get('url', f'https://github.com/{repo}'), 'rank': row.get('rank'),
+                          'matched': alias, 'kind': kind})
+    return links
+
+
+def link_today(date):
+    """
+    关联当天的新闻与热榜并保存为 {date}-links.json
+
+    Returns:
+        list[dict]: 关联记录；任一数据缺失时返回 None
+    """
+    raw = read_artifact('ai-news', date, '.json')
+    rows = load_trending_rows(date)
+    if not raw or not rows:
+        return None
+    links = link_news(json.loads(raw).get('items', []), rows)
+    path = artifact_path('ai-news', date, '-links.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'links': links}, f, ensure_ascii=False, indent=2)
+    record_artifact(path)
+    return links
+
+
+def load_links(date):
+    raw = read_artifact('ai-news', date, '-links.json')
+    return json.loads(raw)['links'] if raw else []
+
+
+def repo_mentions(repo, start=None, end=None):
+    """历史上提到某个仓库的新闻（读取关联记录，不扫描文本）"""
+    mentions = []
+    for date in list_dates('ai-news', '-links.json', start, end):
+        mentions += [{'date': date, **link} for link in load_links(date) if link['repo'] == repo]
+    return mentions
+
+
+def news_annotations(links):
+    """新闻 URL -> 关联的热榜仓库列表（供新闻消息标注）"""
+    by_news = {}
+    for link in links:
+        by_news.setdefault(link['news_url'], []).append(link)
+    return by_news
+
+
+def format_news_related(links, channel='markdown'):
+    """新闻条目下的“关联热榜”行，没有关联时为空字符串"""
+    if not links:
+        return ''
+    if channel == 'text':
+        return '热榜: ' + '、'.join(f"{link['repo']} #{link['rank']}" for link in links) + '\n'
+    return '🔗 热榜: ' + '、'.join(f"[{link['repo']}]({link['repo_url']}) #{link['rank']}" for link in links) + '\n'
+
+
+def format_links_section(links, limit=5):
+    """热榜消息中的“新闻关联”小节（只列出按全名或仓库名关联的条目）"""
+    by_repo = {}
+    for link in links:
+        if link['kind'] != 'owner':
+            by_repo.setdefault(link['repo'], []).append(link)
+    if not by_repo:
+        return ''
+    lines = ['\n### 🔗 今日新闻提及\n']
+    for repo, repo_links in sorted(by_repo.items(), key=lambda kv: kv[1][0]['rank'] or 0)[:limit]:
+        titles = '、'.join(f"[{link['news_title']}]({link['news_url']})" for link in repo_links[:2])
+        lines.append(f"- **{repo}**（#{repo_links[0]['rank']}）: {titles}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,255 @@
+# coding:utf-8
+
+"""
+带版本的页面提取规则与校验
+每个页面类型声明一个 ExtractionSchema：按优先级排列的选择器集合、必填字段、最少条目数与字段校验；
+主选择器失效时依次尝试备用选择器，全部失败则抛出 ExtractionError，让后续的 AI 分析与推送阶段直接跳过。
+同时对页面结构计算指纹，与近几天的历史比对，提前发现站点改版
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+
+from lxml import html as lxml_html
+from pyquery import PyQuery as pq
+
+from .news_dedup import hamming, weighted_simhash
+from .storage import CACHE_DIR
+
+
+LAYOUT_HISTORY_FILE = os.path.join(CACHE_DIR, 'layout-fingerprints.json')
+LAYOUT_HISTORY_DAYS = 30
+# 与最近几天结构指纹的最小汉明距离超过该值视为改版（历史页面日常波动在 0-7 之间）
+DRIFT_THRESHOLD = 8
+DRIFT_BASELINE = 7
+
+
+class ExtractionError(ValueError):
+    """所有选择器集合都未通过校验"""
+
+    def __init__(self, schema, attempts):
+        self.schema = schema
+        self.attempts = attempts
+        details = '; '.join(f"{name}: {', '.join(errors)}" for name, errors in attempts)
+        super().__init__(f"{schema.name} v{schema.version} 提取失败（{details}）")
+
+
+# ---------- 字段校验 ----------
+
+def is_mojibake(text):
+    """判断文本是否为按 latin-1 误解码的 UTF-8（如 'æ\\x9d¥æº\\x90'）"""
+    if not text or text.isascii():
+        return False
+    try:
+        repaired = text.encode('latin-1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return False
+    return repaired != text
+
+
+def repair_mojibake(text):
+    """修复按 latin-1 误解码的 UTF-8 文本，无需修复时原样返回"""
+    return text.encode('latin-1').decode('utf-8') if is_mojibake(text) else text
+
+
+def check_url(value):
+    return None if value and value.startswith(('http://', 'https://', '/')) else '无效链接'
+
+
+def check_text(value):
+    return '乱码' if is_mojibake(value) else None
+
+
+@dataclass
+class SelectorSet:
+    """
+    一组选择器
+
+    Attributes:
+        name: 名称（用于日志）
+        items: 条目选择器
+        fields: {字段: CSS 选择器 或 (CSS 选择器, 属性名)}；选择器为空字符串表示条目本身
+        scope: 可选的区域选择器，只在第一个匹配的区域内查找条目
+        direct: 条目是否必须是区域的直接子元素
+    """
+    name: str
+    items: str
+    fields: dict
+    scope: str = None
+    direct: bool = False
+
+    def extract(self, doc):
+        root = doc(self.scope).eq(0) if self.scope else doc
+        nodes = root.children(self.items) if self.direct else root.find(self.items)
+        items = []
+        for node in nodes.items():
+            item = {}
+            for name, rule in self.fields.items():
+                css, attr = rule if isinstance(rule, tuple) else (rule, None)
+                target = node.find(css).eq(0) if css else node
+                value = target.attr(attr) if attr else target.text()
+                item[name] = (value or '').strip()
+            items.append(item)
+        return items
+
+
+@dataclass
+class ExtractionResult:
+    items: list
+    schema: str
+    version: int
+    selector_set: str
+    dropped: int = 0
+    warnings: list = field(default_factory=list)
+
+    @property
+    def used_fallback(self):
+        return bool(self.warnings)
+
+    @property
+    def tag(self):
+        """写入每条记录的规则标识，如 'ai-news@2'，便于日后判断记录由哪版规则解析"""
+        return f'{self.schema}@{self.version}'
+
+
+@dataclass
+class ExtractionSchema:
+    """
+    页面提取规则
+
+    Attributes:
+        name / version: 规则名与版本号（选择器或字段变化时递增）
+        selector_sets: 按优先级排列的 SelectorSet
+        required: 必填字段
+        min_items / max_items: 有效条目数的合理范围（超出上限通常说明选择器匹配到了整页历史内容）
+        checks: {字段: 校验函数}，校验函数返回错误描述或 None
+        max_invalid_ratio: 无效条目占比上限，超过视为选择器失效
+        postprocess: 单条记录的后处理函数
+    """
+    name: str
+    version: int
+    selector_sets: list
+    required: tuple = ()
+    min_items: int = 1
+    max_items: int = None
+    checks: dict = field(default_factory=dict)
+    max_invalid_ratio: float = 0.2
+    postprocess: object = None
+
+    def validate_item(self, item):
+        errors = [f"缺少 {name}" for name in self.required if not item.get(name)]
+        for name, check in self.checks.items():
+            if item.get(name):
+                error = check(item[name])
+                if error:
+                    errors.append(f"{name} {error}")
+        return errors
+
+    def _try(self, selector_set, doc):
+        raw = selector_set.extract(doc)
+        if self.postprocess:
+            raw = [self.postprocess(item) for item in raw]
+        valid, problems = [], []
+        for item in raw:
+            errors = self.validate_item(item)
+            if errors:
+                problems.extend(errors)
+            else:
+                valid.append(item)
+        errors = []
+        if len(valid) < self.min_items:
+            errors.append(f"有效条目 {len(valid)} 条，少于 {self.min_items}")
+        if self.max_items and len(valid) > self.max_items:
+            errors.append(f"有效条目 {len(valid)} 条，超过 {self.max_items}")
+        if raw and (len(raw) - len(valid)) / len(raw) > self.max_invalid_ratio:
+            errors.append(f"{len(raw) - len(valid)}/{len(raw)} 条无效（{'、'.join(sorted(set(problems))[:3])}）")
+        return valid, len(raw) - len(valid), errors
+
+    def extract(self, html):
+        """
+        依次尝试各选择器集合，返回第一个通过校验的结果
+
+        Raises:
+            ExtractionError: 全部选择器集合都未通过校验
+        """
+        doc = pq(html)
+        attempts = []
+        for selector_set in self.selector_sets:
+            items, dropped, errors = self._try(selector_set, doc)
+            if not errors:
+                warnings = [f"主选择器失效，使用备用选择器 {selector_set.name}"] if attempts else []
+                return ExtractionResult(items, self.name, self.version, selector_set.name, dropped, warnings)
+            attempts.append((selector_set.name, errors))
+        raise ExtractionError(self, attempts)
+
+
+# ---------- 结构指纹与改版检测 ----------
+
+def _signature(element):
+    classes = '.'.join(sorted((element.get('class') or '').split())[:2])
+    return f"{element.tag}.{classes}" if classes else element.tag
+
+
+def structural_fingerprint(html):
+    """页面结构指纹：对 “父标签.类 > 子标签.类” 特征集合计算 SimHash（与条目数量、文本内容无关）"""
+    root = lxml_html.fromstring(html)
+    features = set()
+    for element in root.iter():
+        parent = element.getparent()
+        if parent is None or not isinstance(element.tag, str):
+            continue
+        features.add(f"{_signature(parent)}>{_signature(element)}")
+    return weighted_simhash((feature, 1) for feature in features)
+
+
+def _load_history(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def check_drift(name, html, date, path=None):
+    """
+    比对当天页面结构与历史指纹，并把当天指纹记入历史
+
+    Returns:
+        dict: fingerprint, distance（与最近几天的最小距离，无历史时为 None）, drift(bool)
+    """
+    path = path or LAYOUT_HISTORY_FILE
+    fingerprint = structural_fingerprint(html)
+    history = _load_history(path)
+    entries = [e for e in history.get(name, []) if e['date'] != date]
+    baseline = [int(e['fp'], 16) for e in entries[-DRIFT_BASELINE:]]
+    distance = min(hamming(fingerprint, fp) for fp in baseline) if baseline else None
+
+    entries.append({'date': date, 'fp': format(fingerprint, '016x')})
+    history[name] = entries[-LAYOUT_HISTORY_DAYS:]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+
+    return {'fingerprint': format(fingerprint, '016x'), 'distance': distance,
+            'drift': distance is not None and distance > DRIFT_THRESHOLD}
+
+
+def validate_page(schema, html, date, history_path=None):
+    """
+    抓取后的统一检查：先做结构改版检测（只告警），再按规则提取与校验
+
+    Raises:
+        ExtractionError: 提取或校验失败
+    """
+    drift = check_drift(schema.name, html, date, history_path)
+    if drift['drift']:
+        print(f"⚠ {schema.name} 页面结构与近几天差异较大（距离 {drift['distance']}），站点可能已改版")
+    result = schema.extract(html)
+    for warning in result.warnings:
+        print(f"⚠ {schema.name}: {warning}")
+    if result.dropped:
+        print(f"⚠ {schema.name}: 丢弃 {result.dropped} 条未通过校验的条目")
+    return result
@@ -2,42 +2,143 @@
 
 """
 Git操作公共模块
-提供常用的Git操作函数
+根据产物清单只暂存真正变化的文件，一次提交后推送，遇到非快进冲突时自动变基重试
 """
 
 import os
+import subprocess
+import sys
+import time
 from datetime import datetime
 
+from .manifest import ROOT_DIR, clear_manifest, git_blob_hash, load_manifest
 
-def git_add_commit_push(date=None, filename=None):
+
+# 推送被拒绝时 git 输出中的关键字（非快进）
+NON_FAST_FORWARD_MARKERS = ('non-fast-forward', 'fetch first', '[rejected]', 'failed to push some refs')
+# 每次 ls-tree 传入的路径数上限
+LS_TREE_BATCH = 500
+
+
+def _git(*args, input_text=None):
+    """执行一条 git 命令，返回 CompletedProcess（不抛异常，由调用方检查返回码）"""
+    return subprocess.run(
+        ['git', *args],
+        cwd=ROOT_DIR,
+        input=input_text,
+        capture_output=True,
+        text=True,
+    )
+
+
+def head_blob_hashes(paths):
+    """分批 ls-tree 取出 HEAD 中各路径的 blob 哈希（每批路径数有限，不会超出命令行长度），不存在的路径不会出现在结果中"""
+    hashes = {}
+    for start in range(0, len(paths), LS_TREE_BATCH):
+        result = _git('ls-tree', '-z', 'HEAD', '--', *paths[start:start + LS_TREE_BATCH])
+        if result.returncode != 0:
+            # 空仓库等情况下没有 HEAD，全部视为新增
+            return {}
+        for entry in result.stdout.split('\0'):
+            if not entry:
+                continue
+            meta, path = entry.split('\t', 1)
+            hashes[path] = meta.split()[2]
+    return hashes
+
+
+def changed_artifacts(artifacts):
+    """
+    过滤出与 HEAD 内容不同的产物
+
+    Args:
+        artifacts: {相对路径: blob 哈希}，哈希为 None 表示该文件已被删除
+
+    Returns:
+        list[str]: 需要暂存的相对路径（已按路径排序）
+    """
+    head = head_blob_hashes(sorted(artifacts))
+    changed = []
+    for path, sha in artifacts.items():
+        exists = os.path.exists(os.path.join(ROOT_DIR, path))
+        if exists and sha is not None and head.get(path) != sha:
+            changed.append(path)
+        elif not exists and path in head:
+            # 删除或迁移走的已跟踪文件，git add 会暂存删除
+            changed.append(path)
+    return sorted(changed)
+
+
+def push_with_retry(branch, max_retries=3, backoff=2.0):
+    """推送到远端，非快进时先变基再重试"""
+    for attempt in range(1, max_retries + 1):
+        result = _git('push', 'origin', f'HEAD:{branch}')
+        if result.returncode == 0:
+            return True
+
+        output = result.stdout + result.stderr
+        if not any(marker in output for marker in NON_FAST_FORWARD_MARKERS):
+            print(f"Git push failed: {output.strip()}")
+            return False
+
+        print(f"Push rejected (non-fast-forward), rebasing and retrying ({attempt}/{max_retries})")
+        # 未登记在清单中的已跟踪文件（如常驻模式两次运行之间写入的产物）可能有改动，变基前后自动暂存与恢复
+        rebase = _git('pull', '--rebase', '--autostash', 'origin', branch)
+        if rebase.returncode != 0:
+            print(f"Git rebase failed: {(rebase.stdout + rebase.stderr).strip()}")
+            _git('rebase', '--abort')
+            return False
+        time.sleep(backoff * attempt)
+
+    print(f"Git push failed after {max_retries} attempts")
+    return False
+
+
+def git_add_commit_push(date=None, filename=None, branch=None):
     """
-    执行git add、commit和push操作
+    暂存变化的产物、提交并推送
 
     Args:
         date: 提交日期，如果为None则使用当前日期
-        filename: 要添加的文件名，如果为None则添加所有output和script目录的文件
+        filename: 要提交的文件名，如果为None则使用产物清单中记录的文件
+        branch: 推送的目标分支，默认读取 GIT_PUBLISH_BRANCH 环境变量（缺省 main）
     """
     try:
         if filename:
-            # 添加指定文件
-            cmd_git_add = f'git add {filename}'
-            os.system(cmd_git_add)
+            artifacts = {os.path.relpath(os.path.abspath(filename), ROOT_DIR).replace(os.sep, '/'):
+                         git_blob_hash(filename)}
         else:
-            # 添加output和script目录下所有文件
-            cmd_git_add_output = 'git add output/*'
-            cmd_git_add_script = 'git add script/*'
-            os.system(cmd_git_add_output)
-            os.system(cmd_git_add_script)
+            artifacts = load_manifest()
+
+        paths = changed_artifacts(artifacts)
+        if not paths:
+            print("No changed artifacts to commit")
+            clear_manifest()
+            return True
+
+        # 一次调用暂存所有变化的文件，路径通过标准输入传入，不受命令行长度限制
+        add = _git('add', '--pathspec-from-file=-', '--pathspec-file-nul',
+                   input_text='\0'.join(paths))
+        if add.returncode != 0:
+            print(f"Git add failed: {add.stderr.strip()}")
+            return False
 
-        # 提交并推送
         commit_date = date or datetime.now().strftime('%Y-%m-%d')
-        cmd_git_commit = f'git commit -m "feat: update data {commit_date}"'
-        cmd_git_push = 'git push -u origin main'
+        commit = _git('commit', '-m', f'feat: update data {commit_date}')
+        if commit.returncode != 0:
+            print(f"Git commit failed: {(commit.stdout + commit.stderr).strip()}")
+            return False
 
-        os.system(cmd_git_commit)
-        os.system(cmd_git_push)
-        print(f"Files committed to Git repository")
+        if not push_with_retry(branch or os.environ.get('GIT_PUBLISH_BRANCH', 'main')):
+            return False
+
+        clear_manifest()
+        print(f"Committed {len(paths)} changed file(s) to Git repository")
         return True
     except Exception as e:
         print(f"Git operation failed: {str(e)}")
         return False
+
+
+if __name__ == '__main__':
+    sys.exit(0 if git_add_commit_push() else 1)
@@ -0,0 +1,270 @@
+# coding:utf-8
+
+"""
+GitHub 仓库元数据
+用一次 GraphQL 请求（每个仓库一个别名）批量获取热榜仓库的 topics、许可证、最近推送时间等信息；
+结果按仓库缓存在 .cache/github-meta.json，过期后先用轻量查询比较 updatedAt，
+未变化的只刷新星标数，变化的才重新拉取完整字段
+"""
+
+import json
+import os
+import threading
+import time
+
+from .deadline import DeadlineExceeded, stage_timeout
+from .http import get_session
+from .storage import CACHE_DIR
+
+
+GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', 'https://api.github.com/graphql')
+META_CACHE_FILE = os.path.join(CACHE_DIR, 'github-meta.json')
+# 缓存有效期（秒），过期后重新校验
+META_TTL = float(os.environ.get('GITHUB_META_TTL', str(24 * 3600)))
+# 单次查询的仓库数上限（GitHub 对单次查询的节点数有限制）
+BATCH_SIZE = 50
+MAX_TOPICS = 8
+
+FULL_FRAGMENT = """fragment Full on Repository {
+  nameWithOwner description homepageUrl isArchived isFork
+  stargazerCount forkCount createdAt pushedAt updatedAt
+  primaryLanguage { name }
+  licenseInfo { spdxId name }
+  repositoryTopics(first: %d) { nodes { topic { name } } }
+}""" % MAX_TOPICS
+
+LIGHT_FRAGMENT = """fragment Light on Repository {
+  nameWithOwner stargazerCount forkCount pushedAt updatedAt
+}"""
+
+# 合并进热榜行记录的字段
+META_FIELDS = ('topics', 'license', 'pushed_at', 'created_at', 'forks', 'homepage', 'archived')
+
+
+def get_token():
+    return os.environ.get('GITHUB_TOKEN')
+
+
+def is_configured():
+    return bool(get_token())
+
+
+def build_query(full, light=()):
+    """
+    生成批量查询
+
+    Args:
+        full: 需要完整字段的仓库名列表（'owner/repo'）
+        light: 只需校验 updatedAt 的仓库名列表
+
+    Returns:
+        (query, variables, aliases): aliases 为 别名 -> 仓库名
+    """
+    params, selections, variables, aliases = [], [], {}, {}
+    for fragment, names in (('Full', full), ('Light', light)):
+        for name in names:
+            i = len(aliases)
+            owner, repo = name.split('/', 1)
+            params.append(f'$o{i}: String!, $n{i}: String!')
+            selections.append(f'  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...{fragment} }}')
+            variables[f'o{i}'], variables[f'n{i}'] = owner, repo
+            aliases[f'r{i}'] = name
+
+    fragments = [FULL_FRAGMENT] if full else []
+    if light:
+        fragments.append(LIGHT_FRAGMENT)
+    query = (f"query({', '.join(params)}) {{\n" + '\n'.join(selections) +
+             "\n  rateLimit { cost remaining }\n}\n" + '\n'.join(fragments))
+    return query, variables, aliases
+
+
+def normalize(node):
+    """GraphQL 节点 -> 缓存中的元数据"""
+    topics = ((node.get('repositoryTopics') or {}).get('nodes') or [])
+    license_info = node.get('licenseInfo') or {}
+    return {
+        'description': node.get('description') or '',
+        'language': (node.get('primaryLanguage') or {}).get('name'),
+        'stars': node.get('stargazerCount'),
+        'forks': node.get('forkCount'),
+        'topics': [t['topic']['name'] for t in topics if t.get('topic')],
+        # NOASSERTION 表示 GitHub 无法识别许可证
+        'license': license_info.get('spdxId') if license_info.get('spdxId') not in (None, 'NOASSERTION')
+        else license_info.get('name'),
+        'homepage': node.get('homepageUrl') or '',
+        'archived': bool(node.get('isArchived')),
+        'fork': bool(node.get('isFork')),
+        'created_at': node.get('createdAt'),
+        'pushed_at': node.get('pushedAt'),
+        'updated_at': node.get('updatedAt'),
+    }
+
+
+class MetadataCache:
+    """仓库名 -> {'fetched_at': 时间戳, 'meta': 元数据或 None（仓库不存在）}"""
+
+    def __init__(self, path=None, ttl=None, clock=time.time):
+        self.path = path or META_CACHE_FILE
+        self.ttl = META_TTL if ttl is None else ttl
+        self.clock = clock
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"警告: 元数据缓存损坏，重新开始: {e}")
+
+    def get(self, name):
+        return self.entries.get(name)
+
+    def is_fresh(self, name):
+        entry = self.entries.get(name)
+        return entry is not None and self.clock() - entry['fetched_at'] < self.ttl
+
+    def put(self, name, meta):
+        with self._lock:
+            self.entries[name] = {'fetched_at': self.clock(), 'meta': meta}
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+
+def run_query(query, variables, url=None, token=None, timeout=20):
+    """
+    执行 GraphQL 查询
+
+    Returns:
+        dict: data 字段（单个仓库不存在时对应别名为 None）
+
+    Raises:
+        RuntimeError: 请求失败或整体查询出错
+    """
+    headers = {'Authorization': f"bearer {token or get_token()}", 'Content-Type': 'application/json'}
+    response = get_session().post(url or GRAPHQL_URL, headers=headers, json={'query': query, 'variables': variables},
+                                  timeout=stage_timeout(timeout, minimum=2))
+    response.raise_for_status()
+    body = response.json()
+    data = body.get('data')
+    if data is None:
+        raise RuntimeError(f"GraphQL 查询失败: {body.get('errors')}")
+    # NOT_FOUND 之类的错误只影响单个别名，其余结果照常使用
+    for error in body.get('errors') or []:
+        if error.get('type') != 'NOT_FOUND':
+            print(f"⚠ GraphQL 部分错误: {error.get('message')}")
+    return data
+
+
+def _fetch(cache, full, light, query_fn):
+    """执行一轮查询，返回 updatedAt 发生变化、需要重新拉取完整字段的仓库"""
+    query, variables, aliases = build_query(full, light)
+    data = query_fn(query, variables)
+    rate = data.get('rateLimit') or {}
+    if rate:
+        print(f"GitHub GraphQL: {len(aliases)} 个仓库，消耗 {rate.get('cost')}，剩余 {rate.get('remaining')}")
+
+    changed = []
+    light = set(light)
+    for alias, name in aliases.items():
+        node = data.get(alias)
+        if node is None:
+            cache.put(name, None)
+        elif name not in light:
+            cache.put(name, normalize(node))
+        else:
+            cached = (cache.get(name) or {}).get('meta')
+            if cached is None or cached.get('updated_at') != node.get('updatedAt'):
+                changed.append(name)
+            else:
+                # 元数据未变化：保留 topics/许可证等字段，只刷新计数
+                cache.put(name, {**cached, 'stars': node.get('stargazerCount'), 'forks': node.get('forkCount'),
+                                 'pushed_at': node.get('pushedAt')})
+    return changed
+
+
+def fetch_metadata(names, cache=None, query_fn=None):
+    """
+    获取一组仓库的元数据（优先使用缓存）
+
+    Args:
+        names: 仓库名列表（'owner/repo'）
+        cache: MetadataCache，默认 .cache/github-meta.json
+        query_fn: (query, variables) -> data，默认请求 GITHUB_GRAPHQL_URL
+
+    Returns:
+        dict: 仓库名 -> 元数据；请求失败时退回过期缓存，仍没有的仓库不出现在结果中
+    """
+    cache = cache or MetadataCache()
+    query_fn = query_fn or run_query
+    names = list(dict.fromkeys(n for n in names if n.count('/') == 1))
+
+    missing = [n for n in names if cache.get(n) is None]
+    stale = [n for n in names if cache.get(n) is not None and not cache.is_fresh(n)]
+    if missing or stale:
+        if query_fn is run_query and not is_configured():
+            print("⚠ 未设置 GITHUB_TOKEN，跳过仓库元数据获取")
+        else:
+            try:
+                # 缺失的拉完整字段、过期的做轻量校验，合并在同一批请求里
+                pending = [(n, True) for n in missing] + [(n, False) for n in stale]
+                changed = []
+                for start in range(0, len(pending), BATCH_SIZE):
+                    batch = pending[start:start + BATCH_SIZE]
+                    changed += _fetch(cache, [n for n, full in batch if full], [n for n, full in batch if not full],
+                                      query_fn)
+                for start in range(0, len(changed), BATCH_SIZE):
+                    _fetch(cache, changed[start:start + BATCH_SIZE], (), query_fn)
+                cache.save()
+            except DeadlineExceeded as e:
+                print(f"⚠ 获取仓库元数据超时，使用缓存: {str(e)}")
+            except Exception as e:
+                print(f"⚠ 获取仓库元数据失败，使用缓存: {str(e)}")
+
+    result = {}
+    for name in names:
+        entry = cache.get(name)
+        if entry and entry['meta'] is not None:
+            result[name] = entry['meta']
+    return result
+
+
+def merge_metadata(rows, metadata):
+    """把元数据字段合并进热榜行记录（原地修改并返回 rows）"""
+    for row in rows:
+        meta = metadata.get(row['name'])
+        if not meta:
+            continue
+        for field in META_FIELDS:
+            row[field] = meta.get(field)
+        if not row.get('description') and meta.get('description'):
+            row['description'] = meta['description']
+    return rows
+
+
+def format_metadata_section(rows):
+    """生成 AI 分析 prompt 中的“仓库元数据”小节，没有元数据时返回空字符串"""
+    lines = []
+    for row in rows:
+        if 'topics' not in row:
+            continue
+        parts = []
+        if row.get('topics'):
+            parts.append(f"topics: {', '.join(row['topics'])}")
+        if row.get('license'):
+            parts.append(f"许可证: {row['license']}")
+        if row.get('created_at'):
+            parts.append(f"创建: {row['created_at'][:10]}")
+        if row.get('pushed_at'):
+            parts.append(f"最近推送: {row['pushed_at'][:10]}")
+        if row.get('archived'):
+            parts.append('已归档')
+        lines.append(f"- {row['name']}: {'；'.join(parts) or '无'}")
+    if not lines:
+        return ''
+    return '\n### 仓库元数据\n\n' + '\n'.join(lines) + '\n'
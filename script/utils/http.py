@@ -0,0 +1,171 @@
+# coding:utf-8
+
+"""
+共享 HTTP 会话
+所有脚本复用同一个 requests.Session（连接池保持长连接），常驻模式下跨任务复用已建立的连接；
+幂等的 GET 请求可以走 hedged_get：超过该主机历史 p95 延迟仍未返回时再发一个相同请求，取先成功的结果
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .deadline import current_deadline, stage_timeout
+from .storage import CACHE_DIR
+
+
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+LATENCY_FILE = os.path.join(CACHE_DIR, 'http-latency.json')
+LATENCY_SAMPLES = 100
+# 样本不足时的对冲等待时间（秒）
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 2.0
+HEDGE_MIN_DELAY = 0.2
+
+_session = None
+_hedge_pool = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """获取进程内共享的 Session（首次调用时创建）"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+class LatencyTracker:
+    """按主机记录最近的请求耗时，持久化到 .cache 以便单次运行模式也能积累样本"""
+
+    def __init__(self, path=None):
+        self.path = path or LATENCY_FILE
+        self._samples = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._samples is not None:
+            return
+        self._samples = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for host, values in json.load(f).items():
+                        self._samples[host] = deque(values, maxlen=LATENCY_SAMPLES)
+            except (OSError, ValueError):
+                pass
+
+    def record(self, host, seconds):
+        with self._lock:
+            self._ensure_loaded()
+            self._samples.setdefault(host, deque(maxlen=LATENCY_SAMPLES)).append(round(seconds, 3))
+
+    def percentile(self, host, q=0.95):
+        """该主机的耗时分位数，样本不足时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            values = sorted(self._samples.get(host, ()))
+        if len(values) < HEDGE_MIN_SAMPLES:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def save(self):
+        with self._lock:
+            if not self._samples:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({host: list(values) for host, values in self._samples.items()}, f)
+
+
+latency = LatencyTracker()
+
+
+def _get_hedge_pool():
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=POOL_MAXSIZE, thread_name_prefix='http-hedge')
+    return _hedge_pool
+
+
+def _close_loser(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged_get(url, timeout=10, hedge_after=None, **kwargs):
+    """
+    幂等 GET 的对冲请求
+
+    Args:
+        timeout: 单次请求超时上限（会被收紧到当前截止时间的剩余预算内）
+        hedge_after: 发出第二个请求前的等待时间，默认取该主机历史耗时的 p95
+
+    Raises:
+        DeadlineExceeded: 剩余预算不足
+        requests.RequestException: 请求都失败时抛出最后一个异常
+    """
+    host = urlsplit(url).netloc
+    timeout = stage_timeout(timeout)
+    delay = hedge_after if hedge_after is not None else (latency.percentile(host) or HEDGE_DEFAULT_DELAY)
+    delay = max(delay, HEDGE_MIN_DELAY)
+
+    def attempt():
+        started = time.monotonic()
+        response = get_session().get(url, timeout=timeout, **kwargs)
+        latency.record(host, time.monotonic() - started)
+        return response
+
+    pool = _get_hedge_pool()
+    first = pool.submit(attempt)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+
+    # 剩余时间不够再等一个完整请求时不发对冲请求
+    if current_deadline().remaining() <= delay or delay >= timeout:
+        return first.result()
+
+    pending = {first, pool.submit(attempt)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except Exception as e:
+                error = e
+                continue
+            for loser in pending:
+                loser.add_done_callback(_close_loser)
+            return response
+    raise error
+
+
+def close_session():
+    """关闭共享 Session 并保存延迟样本（进程退出前调用）"""
+    global _session
+    latency.save()
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
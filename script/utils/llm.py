@@ -0,0 +1,110 @@
+# coding:utf-8
+
+"""
+大模型调用
+封装火山引擎（豆包）chat completions 接口，统一鉴权、超时与错误处理；未配置 API Key 时返回 None
+"""
+
+import json
+import os
+
+import requests
+
+from .deadline import DeadlineExceeded, stage_timeout
+from .http import get_session
+
+
+API_URL = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+DEFAULT_MODEL = 'ep-20250215154848-djsgr'
+# 剩余预算少于该值时不再发起调用（模型生成通常需要十几秒以上）
+MIN_SECONDS = 15
+
+
+def is_configured():
+    return bool(os.environ.get('VOLCENGINE_API_KEY'))
+
+
+def chat_completion(messages, max_tokens=2000, timeout=120):
+    """
+    调用 chat completions 接口
+
+    Args:
+        messages: [{'role': ..., 'content': ...}]
+        max_tokens: 最大输出 token 数
+        timeout: 请求超时上限（秒），会被收紧到当前截止时间的剩余预算内
+
+    Returns:
+        str: 模型回复内容，失败或未配置时返回 None
+    """
+    api_key = os.environ.get('VOLCENGINE_API_KEY')
+    if not api_key:
+        print("警告: 未设置 VOLCENGINE_API_KEY 环境变量，跳过 AI 调用")
+        print("提示: 如需启用 AI 分析，请设置环境变量: export VOLCENGINE_API_KEY=your_key")
+        return None
+
+    try:
+        timeout = stage_timeout(timeout, minimum=MIN_SECONDS)
+    except DeadlineExceeded as e:
+        print(f"警告: 剩余时间不足，跳过 AI 调用 - {str(e)}")
+        return None
+
+    payload = {
+        "model": os.environ.get('VOLCENGINE_MODEL', DEFAULT_MODEL),
+        "messages": messages,
+        "max_tokens": max_tokens,
+    }
+    headers = {
+        "Accept": "application/json",
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+    try:
+        response = get_session().post(API_URL, headers=headers, json=payload, timeout=timeout)
+
+        if response.status_code == 200:
+            result = response.json()
+            if 'choices' in result and len(result['choices']) > 0:
+                return result['choices'][0]['message']['content']
+            print("错误: AI 响应格式异常")
+            return None
+        elif response.status_code == 401:
+            print("错误: 认证失败: API Key 无效或已过期")
+            return None
+        elif response.status_code == 429:
+            print("错误: 请求频率超限，请稍后重试")
+            return None
+        else:
+            print(f"错误: API 调用失败 - HTTP {response.status_code}")
+            try:
+                print(f"错误详情: {response.json()}")
+            except ValueError:
+                print(f"响应内容: {response.text[:500]}")
+            return None
+
+    except requests.exceptions.Timeout:
+        print("错误: AI 请求超时")
+        return None
+    except requests.exceptions.ConnectionError:
+        print("错误: 网络连接错误")
+        return None
+    except Exception as e:
+        print(f"错误: AI 调用过程出错 - {str(e)}")
+        return None
+
+
+def parse_json_reply(text):
+    """解析模型返回的 JSON（兼容 ```json 代码块包裹），失败返回 None"""
+    if not text:
+        return None
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        text = text.rsplit('```', 1)[0]
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
@@ -0,0 +1,417 @@
+# coding:utf-8
+
+"""
+专业目录批量生成
+读取专业目录（CSV / JSON / JSON Lines，字段 major_id, major_name, subject_name, category_name），
+在有界线程池中并发调用大模型生成专业介绍与问答，按每分钟请求数限流以匹配服务商配额；
+问答回复中的 INSERT 语句只按字面量解析成行，用 executemany 批量写入 SQLite，从不执行模型生成的 SQL。
+每项任务的完成状态与结果在同一事务中提交，中断后再次运行只处理未完成的任务
+
+用法:
+    python -m script.utils.major_catalog majors.csv [--db output/majors/majors.sqlite] [--workers 8] [--rpm 60]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from ..prompts.major_prompts import get_major_intro_prompt, get_major_qa_prompt
+from .article_crawler import HostLimiter
+from .deadline import bind_context
+from .llm import chat_completion, is_configured
+from .storage import OUTPUT_DIR
+
+
+DEFAULT_DB = os.path.join(OUTPUT_DIR, 'majors', 'majors.sqlite')
+TASKS = ('intro', 'qa')
+MAX_WORKERS = int(os.environ.get('MAJOR_WORKERS', '8'))
+# 每分钟最多发起的模型请求数（按服务商配额调整）
+REQUESTS_PER_MINUTE = float(os.environ.get('MAJOR_RPM', '60'))
+# 单次运行内每项任务的尝试次数，以及跨运行累计失败多少次后不再自动重试
+RETRIES = 2
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 5.0
+# 每完成多少项任务提交一次事务
+COMMIT_EVERY = 50
+# 连续多少项任务拿不到模型回复（鉴权失败、限流、超时）时停止提交新任务
+MAX_UNAVAILABLE = 20
+
+QA_COLUMNS = ('major_id', 'question', 'answer')
+# 限流器只有一个“主机”：模型服务
+LIMIT_KEY = 'llm'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS majors (
+    major_id TEXT PRIMARY KEY,
+    major_name TEXT NOT NULL,
+    subject_name TEXT,
+    category_name TEXT
+);
+CREATE TABLE IF NOT EXISTS major_intro (
+    major_id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    generated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS major_qa (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    major_id TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS major_qa_major ON major_qa (major_id);
+CREATE TABLE IF NOT EXISTS progress (
+    major_id TEXT NOT NULL,
+    task TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (major_id, task)
+);
+"""
+
+INSERT_RE = re.compile(r'INSERT\s+INTO\s+[`"]?(\w+)[`"]?\s*\(([^)]*)\)\s*VALUES\s*', re.IGNORECASE)
+NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def load_catalog(path):
+    """
+    读取专业目录
+
+    Returns:
+        list[dict]: major_id, major_name, subject_name, category_name（按 major_id 去重，保持原顺序）
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        if path.endswith('.csv'):
+            records = list(csv.DictReader(f))
+        elif path.endswith('.jsonl'):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)
+
+    majors = {}
+    for record in records:
+        major_id = str(record.get('major_id') or '').strip()
+        major_name = str(record.get('major_name') or '').strip()
+        if not major_id or not major_name:
+            print(f"警告: 跳过缺少 major_id / major_name 的记录: {record}")
+            continue
+        majors.setdefault(major_id, {
+            'major_id': major_id,
+            'major_name': major_name,
+            'subject_name': str(record.get('subject_name') or '').strip(),
+            'category_name': str(record.get('category_name') or '').strip(),
+        })
+    return list(majors.values())
+
+
+def _parse_literal_tuple(text, pos):
+    """
+    从 pos 处的 '(' 开始解析一组 SQL 字面量（字符串、数字、NULL）
+
+    Returns:
+        (values, 结束位置)；不是合法的字面量元组时抛出 ValueError
+    """
+    if pos >= len(text) or text[pos] != '(':
+        raise ValueError('缺少 (')
+    pos += 1
+    values = []
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if text.startswith("'", pos):
+            chunks = []
+            pos += 1
+            while True:
+                end = text.find("'", pos)
+                if end < 0:
+                    raise ValueError('字符串未闭合')
+                chunks.append(text[pos:end])
+                if text.startswith("''", end):
+                    chunks.append("'")
+                    pos = end + 2
+                else:
+                    pos = end + 1
+                    break
+            values.append(''.join(chunks))
+        elif text[pos:pos + 4].upper() == 'NULL':
+            values.append(None)
+            pos += 4
+        else:
+            match = NUMBER_RE.match(text, pos)
+            if not match:
+                raise ValueError(f'无法识别的字面量: {text[pos:pos + 20]!r}')
+            values.append(match.group())
+            pos = match.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if text.startswith(',', pos):
+            pos += 1
+        elif text.startswith(')', pos):
+            return values, pos + 1
+        else:
+            raise ValueError('缺少 , 或 )')
+
+
+def parse_qa_rows(text, major_id):
+    """
+    把模型返回的 INSERT INTO major_qa 语句解析成 (major_id, question, answer) 行
+
+    只接受 major_qa 表、列为 QA_COLUMNS 子集且值全是字面量的语句，其余内容一律忽略；
+    major_id 以目录中的为准，不信任模型输出；同一问题只保留第一条
+
+    Returns:
+        list[tuple]
+    """
+    rows = []
+    seen = set()
+    for match in INSERT_RE.finditer(text or ''):
+        columns = [c.strip().strip('`"').lower() for c in match.group(2).split(',')]
+        if match.group(1).lower() != 'major_qa' or not set(columns) <= set(QA_COLUMNS) \
+                or 'question' not in columns or 'answer' not in columns:
+            continue
+        pos = match.end()
+        while True:
+            try:
+                values, pos = _parse_literal_tuple(text, pos)
+            except ValueError:
+                break
+            if len(values) == len(columns):
+                record = dict(zip(columns, values))
+                question = (record['question'] or '').strip()
+                answer = (record['answer'] or '').strip()
+                if question and answer and question not in seen:
+                    seen.add(question)
+                    rows.append((major_id, question, answer))
+            # 一条 INSERT 可能带多组 VALUES
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if not text.startswith(',', pos):
+                break
+            pos += 1
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+    return rows
+
+
+def clean_intro(text):
+    """去掉代码块包裹与首尾空白，空回复返回 None"""
+    text = (text or '').strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        text = text.rsplit('```', 1)[0].strip()
+    return text or None
+
+
+class CatalogStore:
+    """SQLite 结果库，同时保存每项任务的进度（断点续跑）"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_DB
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def add_majors(self, majors):
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO majors (major_id, major_name, subject_name, category_name) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(major_id) DO UPDATE SET major_name = excluded.major_name, '
+                'subject_name = excluded.subject_name, category_name = excluded.category_name',
+                [(m['major_id'], m['major_name'], m['subject_name'], m['category_name']) for m in majors])
+
+    def pending(self, majors, tasks=TASKS, max_attempts=MAX_ATTEMPTS):
+        """尚未完成、且累计失败次数未达上限的 (专业, 任务)"""
+        state = {(major_id, task): (status, attempts) for major_id, task, status, attempts
+                 in self.conn.execute('SELECT major_id, task, status, attempts FROM progress')}
+        jobs = []
+        for major in majors:
+            for task in tasks:
+                status, attempts = state.get((major['major_id'], task), (None, 0))
+                if status != 'done' and attempts < max_attempts:
+                    jobs.append((major, task))
+        return jobs
+
+    def commit(self, results):
+        """在一个事务中批量写入一组任务结果及其进度"""
+        # 模型不可用（没有拿到任何回复）的任务不记进度，不计入失败次数
+        results = [r for r in results if not r.get('unavailable')]
+        if not results:
+            return
+        now = datetime.now().isoformat(timespec='seconds')
+        intros = [(r['major_id'], r['intro'], now) for r in results if r.get('intro')]
+        qa_results = [r for r in results if r.get('qa')]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO major_intro (major_id, content, generated_at) VALUES (?, ?, ?)', intros)
+            # 重新生成的问答整体替换旧的
+            self.conn.executemany('DELETE FROM major_qa WHERE major_id = ?', [(r['major_id'],) for r in qa_results])
+            self.conn.executemany('INSERT INTO major_qa (major_id, question, answer) VALUES (?, ?, ?)',
+                                  [row for r in qa_results for row in r['qa']])
+            self.conn.executemany(
+                'INSERT INTO progress (major_id, task, status, attempts, error, updated_at) VALUES (?, ?, ?, 1, ?, ?) '
+                'ON CONFLICT(major_id, task) DO UPDATE SET status = excluded.status, '
+                'attempts = progress.attempts + 1, error = excluded.error, updated_at = excluded.updated_at',
+                [(r['major_id'], r['task'], 'failed' if r.get('error') else 'done', r.get('error'), now)
+                 for r in results])
+
+    def counts(self):
+        return {task: dict(self.conn.execute('SELECT status, COUNT(*) FROM progress WHERE task = ? GROUP BY status',
+                                             (task,)).fetchall()) for task in TASKS}
+
+
+def generate(major, task, complete=chat_completion, limiter=None, retries=RETRIES, sleep=time.sleep):
+    """
+    工作线程：为一个专业执行一项生成任务（限流 + 失败退避重试）
+
+    Returns:
+        dict: major_id, task，以及 intro（str）/ qa（行列表）或 error；
+              所有尝试都没有拿到模型回复时带 unavailable=True（不计入失败次数）
+    """
+    prompt = get_major_intro_prompt(major) if task == 'intro' else get_major_qa_prompt(major)
+    messages = [{'role': 'user', 'content': prompt}]
+    error = '模型无返回'
+    replied = False
+    for attempt in range(retries):
+        if attempt:
+            sleep(BACKOFF_SECONDS * 2 ** (attempt - 1))
+        if limiter:
+            limiter.acquire(LIMIT_KEY)
+        try:
+            reply = complete(messages, max_tokens=2000 if task == 'qa' else 800)
+        except Exception as e:
+            reply, error = None, str(e)
+        finally:
+            if limiter:
+                limiter.release(LIMIT_KEY)
+        if reply is None:
+            continue
+        replied = True
+        if task == 'intro':
+            intro = clean_intro(reply)
+            if intro:
+                return {'major_id': major['major_id'], 'task': task, 'intro': intro}
+            error = '介绍为空'
+        else:
+            rows = parse_qa_rows(reply, major['major_id'])
+            if rows:
+                return {'major_id': major['major_id'], 'task': task, 'qa': rows}
+            error = '未解析到问答'
+    result = {'major_id': major['major_id'], 'task': task, 'error': error}
+    if not replied:
+        result['unavailable'] = True
+    return result
+
+
+def run(majors, store, workers=MAX_WORKERS, rpm=REQUESTS_PER_MINUTE, tasks=TASKS, complete=chat_completion,
+        max_attempts=MAX_ATTEMPTS, commit_every=COMMIT_EVERY, limiter=None, progress=True):
+    """
+    批量生成
+
+    同时在途的任务不超过 workers 的两倍，完成的结果攒够 commit_every 项提交一次；
+    中断（Ctrl+C）时已完成的结果仍会提交。拿不到模型回复的任务不计入失败次数，
+    连续 MAX_UNAVAILABLE 项如此时停止提交新任务
+
+    Returns:
+        dict: 统计信息 total, skipped, done, failed, unavailable, seconds
+    """
+    if complete is chat_completion and not is_configured():
+        raise RuntimeError('未设置 VOLCENGINE_API_KEY，无法调用模型')
+    store.add_majors(majors)
+    jobs = store.pending(majors, tasks, max_attempts)
+    total = len(majors) * len(tasks)
+    stats = {'total': total, 'skipped': total - len(jobs), 'done': 0, 'failed': 0, 'unavailable': 0,
+             'seconds': 0.0}
+    if not jobs:
+        return stats
+
+    limiter = limiter or HostLimiter(per_host=workers, interval=60.0 / rpm if rpm else 0.0)
+    worker = bind_context(generate)
+    started = time.monotonic()
+    queue = iter(jobs)
+    in_flight = set()
+    buffer = []
+    streak = 0
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def fill():
+        while len(in_flight) < workers * 2 and streak < MAX_UNAVAILABLE:
+            job = next(queue, None)
+            if job is None:
+                return
+            in_flight.add(executor.submit(worker, *job, complete=complete, limiter=limiter))
+
+    try:
+        fill()
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                buffer.append(result)
+                if result.get('unavailable'):
+                    stats['unavailable'] += 1
+                    streak += 1
+                else:
+                    stats['failed' if result.get('error') else 'done'] += 1
+                    streak = 0
+            if len(buffer) >= commit_every:
+                store.commit(buffer)
+                buffer = []
+                if progress:
+                    count = stats['done'] + stats['failed'] + stats['unavailable']
+                    rate = count / (time.monotonic() - started)
+                    print(f"[{count}/{len(jobs)}] {rate * 60:.0f} 项/分钟，失败 {stats['failed']}，"
+                          f"预计剩余 {(len(jobs) - count) / rate:.0f} 秒", flush=True)
+            fill()
+        if streak >= MAX_UNAVAILABLE:
+            print(f"警告: 连续 {streak} 项任务未拿到模型回复，已停止提交，剩余任务下次运行继续", flush=True)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        store.commit(buffer)
+        stats['seconds'] = time.monotonic() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量生成专业介绍与问答')
+    parser.add_argument('catalog', help='专业目录文件（.csv / .json / .jsonl）')
+    parser.add_argument('--db', default=DEFAULT_DB, help='SQLite 结果库（同时保存进度）')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='并发请求数')
+    parser.add_argument('--rpm', type=float, default=REQUESTS_PER_MINUTE, help='每分钟最多请求数（0 表示不限）')
+    parser.add_argument('--tasks', nargs='+', choices=TASKS, default=list(TASKS), help='要执行的任务')
+    parser.add_argument('--retry-failed', action='store_true', help='忽略失败次数上限，重试所有失败的任务')
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if not is_configured():
+        print('错误: 未设置 VOLCENGINE_API_KEY，未提交任何任务')
+        return
+
+    majors = load_catalog(args.catalog)
+    store = CatalogStore(args.db)
+    try:
+        stats = run(majors, store, args.workers, args.rpm, tuple(args.tasks),
+                    max_attempts=float('inf') if args.retry_failed else MAX_ATTEMPTS)
+        print(f"✓ 生成完成: 共 {stats['total']} 项，跳过 {stats['skipped']}，成功 {stats['done']}，"
+              f"失败 {stats['failed']}，模型不可用 {stats['unavailable']}，耗时 {stats['seconds']:.1f} 秒")
+        print(f"进度: {json.dumps(store.counts(), ensure_ascii=False)}")
+        print(f"输出: {args.db}")
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# coding:utf-8
+
+"""
+产物清单模块
+记录本次运行写出的文件及其 git blob 哈希，发布时只提交内容真正变化的产物
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MANIFEST_FILE = os.path.join(ROOT_DIR, 'output', '.manifest.json')
+
+_lock = threading.Lock()
+# 当前线程的批量登记缓冲（见 batch()）
+_local = threading.local()
+
+
+def git_blob_hash(path):
+    """计算文件的 git blob 哈希（与 git hash-object 结果一致）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    header = f'blob {len(data)}\0'.encode('utf-8')
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def _relpath(path):
+    return os.path.relpath(os.path.abspath(path), ROOT_DIR).replace(os.sep, '/')
+
+
+def load_manifest():
+    """读取清单，返回 {相对路径: blob 哈希}，已删除的文件哈希为 None"""
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest):
+    os.makedirs(os.path.dirname(MANIFEST_FILE), exist_ok=True)
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def _record(entries):
+    """把 {相对路径: 哈希} 写入清单；处于批量登记中时只写入缓冲"""
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        pending.update(entries)
+        return
+    with _lock:
+        manifest = load_manifest()
+        manifest.update(entries)
+        _save_manifest(manifest)
+
+
+@contextmanager
+def batch():
+    """
+    批量登记：期间当前线程的 record_artifact / record_removal 只更新内存，退出时一次性写回清单
+    （迁移、打包成百上千个文件时避免每个文件都重写一遍清单）；可以嵌套，由最外层写回
+    """
+    if getattr(_local, 'pending', None) is not None:
+        yield
+        return
+    _local.pending = {}
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        if pending:
+            _record(pending)
+
+
+def record_artifact(path):
+    """
+    登记一个本次运行写出的产物
+
+    Args:
+        path: 产物文件路径（绝对路径或相对仓库根目录的路径）
+    """
+    if not os.path.exists(path):
+        return
+    _record({_relpath(path): git_blob_hash(path)})
+
+
+def record_removal(path):
+    """登记一个本次运行删除（或迁移走）的产物"""
+    _record({_relpath(path): None})
+
+
+def clear_manifest():
+    """清空清单（每次运行开始或发布成功后调用）"""
+    with _lock:
+        if os.path.exists(MANIFEST_FILE):
+            os.remove(MANIFEST_FILE)
@@ -0,0 +1,143 @@
+# coding:utf-8
+
+"""
+AI 快讯历史回填
+用进程池并行重新解析归档的快讯页面（包括已打包的月份），按块分发任务，
+结果以 JSON Lines 流式写出；中断后再次运行会跳过已用当前解析器版本成功解析的日期
+
+用法:
+    python -m script.utils.news_backfill [--workers 4] [--chunk-size 8] [--start 2025-01-01] [--end 2025-12-31]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import storage
+from .news_parser import PARSER_VERSION, parse_news_html
+from .storage import CACHE_DIR, list_dates, read_artifact
+
+
+DEFAULT_OUTPUT = os.path.join(CACHE_DIR, 'backfill', 'ai-news.jsonl')
+DEFAULT_CHUNK_SIZE = 8
+
+
+def parse_chunk(dates, output_dir):
+    """
+    工作进程：解析一块日期的页面
+
+    Returns:
+        list[dict]: 每个日期一条记录 {'date', 'parser_version', 'news' | 'error'}
+    """
+    storage.OUTPUT_DIR = output_dir
+    records = []
+    for date in dates:
+        record = {'date': date, 'parser_version': PARSER_VERSION}
+        try:
+            html = read_artifact('ai-news', date, '.html')
+            if html is None:
+                record['error'] = 'missing'
+            else:
+                record['news'] = parse_news_html(html, date)
+        except Exception as e:
+            record['error'] = str(e)
+        records.append(record)
+    return records
+
+
+def completed_dates(output):
+    """已用当前解析器版本成功解析的日期（用于断点续跑）"""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 上次中断时写了一半的行
+                continue
+            if record.get('parser_version') == PARSER_VERSION and 'news' in record:
+                done.add(record['date'])
+    return done
+
+
+def _truncate_partial_line(output):
+    """去掉上次中断时写了一半的末行，避免续写的记录与其拼在同一行"""
+    if not os.path.exists(output):
+        return
+    with open(output, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+def chunked(dates, size):
+    # 日期升序切块，同一块大多落在同一个月归档中
+    return [dates[i:i + size] for i in range(0, len(dates), size)]
+
+
+def backfill(start=None, end=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, output=None, restart=False,
+             progress=True):
+    """
+    并行回填
+
+    Returns:
+        dict: 统计信息 total, skipped, parsed, failed, seconds
+    """
+    output = output or DEFAULT_OUTPUT
+    dates = list_dates('ai-news', '.html', start, end)
+    if restart and os.path.exists(output):
+        os.remove(output)
+    done = completed_dates(output)
+    pending = [d for d in dates if d not in done]
+    stats = {'total': len(dates), 'skipped': len(dates) - len(pending), 'parsed': 0, 'failed': 0, 'seconds': 0.0}
+    if not pending:
+        return stats
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    _truncate_partial_line(output)
+    started = time.monotonic()
+    finished = 0
+    with open(output, 'a', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(parse_chunk, chunk, storage.OUTPUT_DIR) for chunk in chunked(pending, chunk_size)]
+        for future in as_completed(futures):
+            for record in future.result():
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                if 'news' in record:
+                    stats['parsed'] += 1
+                else:
+                    stats['failed'] += 1
+                finished += 1
+            out.flush()
+            if progress:
+                elapsed = time.monotonic() - started
+                rate = finished / elapsed if elapsed else 0.0
+                eta = (len(pending) - finished) / rate if rate else 0.0
+                print(f"[{finished}/{len(pending)}] {rate:.1f} 页/秒，预计剩余 {eta:.0f} 秒", flush=True)
+
+    stats['seconds'] = time.monotonic() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='并行重新解析历史 AI 快讯页面')
+    parser.add_argument('--start', help='起始日期 YYYY-MM-DD')
+    parser.add_argument('--end', help='结束日期 YYYY-MM-DD')
+    parser.add_argument('--workers', type=int, default=None, help='工作进程数（默认 CPU 核数）')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='每个任务块包含的页面数')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='JSON Lines 输出文件')
+    parser.add_argument('--restart', action='store_true', help='忽略已有结果，全部重新解析')
+    args = parser.parse_args(argv)
+
+    stats = backfill(args.start, args.end, args.workers, args.chunk_size, args.output, args.restart)
+    print(f"✓ 回填完成: 共 {stats['total']} 页，跳过 {stats['skipped']}，解析 {stats['parsed']}，"
+          f"失败 {stats['failed']}，耗时 {stats['seconds']:.1f} 秒")
+    print(f"输出: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
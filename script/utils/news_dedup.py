@@ -0,0 +1,212 @@
+# coding:utf-8
+
+"""
+AI 新闻去重模块
+对标题与内容计算 64 位 SimHash 指纹，当天内聚类近似重复条目并保留内容最完整的一条，
+再与磁盘上滚动保存的近几天指纹比对，标记跨天重复的报道
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import date as date_cls, timedelta
+
+from .storage import CACHE_DIR, read_artifact
+
+
+FINGERPRINT_FILE = os.path.join(CACHE_DIR, 'news-fingerprints.json')
+
+# 汉明距离不超过该值视为近似重复；段数大于阈值时按鸽巢原理分桶检索不会漏检
+MAX_DISTANCE = 5
+BANDS = 8
+BAND_BITS = 64 // BANDS
+WINDOW_DAYS = 7
+
+_NORMALIZE_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _shingles(text):
+    """规范化后取字符二元组，中英文通用"""
+    text = _NORMALIZE_RE.sub('', (text or '').lower())
+    if len(text) < 2:
+        return [text] if text else []
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+def weighted_simhash(features):
+    """对 (特征字符串, 权重) 序列计算 64 位 SimHash"""
+    weights = [0] * 64
+    for feature, weight in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += weight if (h >> bit) & 1 else -weight
+    fp = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            fp |= 1 << bit
+    return fp
+
+
+def simhash(title, content, title_weight=2):
+    """计算标题 + 内容的 64 位 SimHash（标题权重更高）"""
+    return weighted_simhash([(s, title_weight) for s in _shingles(title)] + [(s, 1) for s in _shingles(content)])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _bands(fp):
+    return [(i, (fp >> (i * BAND_BITS)) & ((1 << BAND_BITS) - 1)) for i in range(BANDS)]
+
+
+class FingerprintIndex:
+    """滚动指纹索引：[{date, fp, url, title}]，按分段哈希建桶做近邻检索"""
+
+    def __init__(self, entries=None):
+        self.entries = []
+        self.buckets = {}
+        for entry in entries or []:
+            self.add(entry)
+
+    def add(self, entry):
+        self.entries.append(entry)
+        fp = int(entry['fp'], 16)
+        for band in _bands(fp):
+            self.buckets.setdefault(band, []).append(entry)
+
+    def query(self, fp):
+        """返回距离最近的近似重复条目，没有则返回 None"""
+        best, best_distance = None, MAX_DISTANCE + 1
+        seen = set()
+        for band in _bands(fp):
+            for entry in self.buckets.get(band, ()):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                distance = hamming(fp, int(entry['fp'], 16))
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+        return best
+
+    def find_url(self, url):
+        for entry in self.entries:
+            if entry['url'] == url:
+                return entry
+        return None
+
+    @classmethod
+    def load(cls, today, path=None):
+        """读取滚动索引，缓存缺失时从最近几天的归档 JSON 重建"""
+        path = path or FINGERPRINT_FILE
+        start = (date_cls.fromisoformat(today) - timedelta(days=WINDOW_DAYS)).isoformat()
+        entries = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = None
+        if entries is None:
+            entries = _entries_from_archive(start, today)
+        # 只保留窗口内且早于今天的条目（重跑当天时不会和自己比对）
+        return cls([e for e in entries if start <= e['date'] < today])
+
+    def save(self, path=None):
+        path = path or FINGERPRINT_FILE
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+
+
+def _entries_from_archive(start, today):
+    entries = []
+    day = date_cls.fromisoformat(start)
+    end = date_cls.fromisoformat(today)
+    while day < end:
+        raw = read_artifact('ai-news', day.isoformat(), '.json')
+        if raw:
+            try:
+                items = json.loads(raw).get('items', [])
+            except ValueError:
+                items = []
+            for item in items:
+                if item.get('duplicate_of'):
+                    continue
+                fp = item.get('fingerprint') or format(simhash(item.get('title'), item.get('content')), '016x')
+                entries.append({'date': day.isoformat(), 'fp': fp, 'url': item.get('url', ''),
+                                'title': item.get('title', '')})
+        day += timedelta(days=1)
+    return entries
+
+
+def dedup_news(news, index=None):
+    """
+    对一天的新闻去重，原地给条目打标记
+
+    - 每条新增 fingerprint 字段
+    - 当天近似重复的条目标记 duplicate_of（指向保留条目的 url）
+    - 与前几天重复的条目标记 duplicate_of 与 first_seen（首次出现日期）
+
+    Args:
+        news: parse_news_from_file 返回的 dict
+        index: FingerprintIndex，默认从磁盘加载并在结束后保存
+
+    Returns:
+        dict: {'total', 'same_day', 'cross_day'} 统计
+    """
+    today = news['date']
+    persist = index is None
+    if index is None:
+        index = FingerprintIndex.load(today)
+
+    items = news['items']
+    fps = [simhash(item.get('title'), item.get('content')) for item in items]
+    for item, fp in zip(items, fps):
+        item['fingerprint'] = format(fp, '016x')
+        item.pop('duplicate_of', None)
+        item.pop('first_seen', None)
+
+    # 当天聚类（并查集），每簇保留内容最长的条目
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(items)):
+        for j in range(i):
+            if hamming(fps[i], fps[j]) <= MAX_DISTANCE or items[i].get('url') == items[j].get('url'):
+                parent[find(i)] = find(j)
+
+    clusters = {}
+    for i in range(len(items)):
+        clusters.setdefault(find(i), []).append(i)
+
+    same_day = cross_day = 0
+    for members in clusters.values():
+        canonical = max(members, key=lambda i: (len(items[i].get('content') or ''), -i))
+        for i in members:
+            if i != canonical:
+                items[i]['duplicate_of'] = items[canonical].get('url', '')
+                same_day += 1
+
+        item = items[canonical]
+        match = index.find_url(item.get('url')) or index.query(fps[canonical])
+        if match:
+            # 簇内其他成员已计入当天重复，这里只计保留的那一条
+            cross_day += 1
+            for i in members:
+                items[i]['duplicate_of'] = match['url']
+                items[i]['first_seen'] = match['date']
+        else:
+            index.add({'date': today, 'fp': item['fingerprint'], 'url': item.get('url', ''),
+                       'title': item.get('title', '')})
+
+    if persist:
+        index.save()
+
+    return {'total': len(items), 'same_day': same_day, 'cross_day': cross_day}
@@ -0,0 +1,198 @@
+# coding:utf-8
+
+"""
+AI 快讯增强
+把新闻条目按批拼进一个 prompt，在有界线程池中并发调用大模型完成分类、打标签与摘要；
+结果按 URL 缓存，重复出现的报道不再调用模型，整体受时间预算约束，超时的批次直接放弃
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ..prompts.news_prompts import NEWS_CATEGORIES, get_news_enrich_prompt
+from .article_crawler import load_article
+from .deadline import bind_context, current_deadline
+from .llm import chat_completion, is_configured, parse_json_reply
+from .manifest import record_artifact
+from .storage import CACHE_DIR, artifact_path
+from .summarizer import summarize
+
+
+MEMO_FILE = os.path.join(CACHE_DIR, 'news-enrich.json')
+MAX_MEMO_ENTRIES = 5000
+
+BATCH_SIZE = int(os.environ.get('NEWS_ENRICH_BATCH', '8'))
+MAX_WORKERS = int(os.environ.get('NEWS_ENRICH_WORKERS', '4'))
+# 整个增强阶段的时间预算（秒）
+TIME_BUDGET = float(os.environ.get('NEWS_ENRICH_BUDGET', '180'))
+
+ENRICH_FIELDS = ('category', 'tags', 'summary')
+# 原文送入模型前的抽取式压缩上限
+ARTICLE_SENTENCES = 5
+ARTICLE_CHARS = 500
+
+
+class EnrichMemo:
+    """URL -> 增强结果 的持久化缓存（按写入顺序淘汰最旧的条目）"""
+
+    def __init__(self, path=None):
+        self.path = path or MEMO_FILE
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"警告: 增强缓存损坏，重新开始: {e}")
+
+    def get(self, url):
+        return self.entries.get(url) if url else None
+
+    def put(self, url, result):
+        if not url:
+            return
+        with self._lock:
+            self.entries.pop(url, None)
+            self.entries[url] = result
+
+    def save(self):
+        with self._lock:
+            while len(self.entries) > MAX_MEMO_ENTRIES:
+                del self.entries[next(iter(self.entries))]
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+
+def _normalize(result):
+    """校验并规范化模型返回的单条结果，无效时返回 None"""
+    if not isinstance(result, dict):
+        return None
+    category = result.get('category')
+    if category not in NEWS_CATEGORIES:
+        category = '其他'
+    tags = result.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+    summary = str(result.get('summary') or '').strip()
+    return {'category': category, 'tags': [str(t).strip() for t in tags if str(t).strip()][:3], 'summary': summary}
+
+
+def enrich_batch(batch, completion=chat_completion):
+    """
+    增强一批新闻
+
+    Args:
+        batch: list[dict]，每条包含 id, title, content
+        completion: 调用模型的函数（便于测试替换）
+
+    Returns:
+        dict: id -> 增强结果
+    """
+    prompt = get_news_enrich_prompt(batch)
+    reply = completion([{'role': 'user', 'content': prompt}], max_tokens=200 * len(batch) + 200, timeout=60)
+    data = parse_json_reply(reply)
+    if not data:
+        return {}
+    ids = {item['id'] for item in batch}
+    results = {}
+    for entry in data.get('items') or []:
+        try:
+            item_id = int(entry.get('id'))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        normalized = _normalize(entry)
+        if item_id in ids and normalized:
+            results[item_id] = normalized
+    return results
+
+
+def enrich_news(news, memo=None, completion=chat_completion, batch_size=None, max_workers=None, budget=None):
+    """
+    为 news['items'] 中的条目补充 category / tags / summary（原地修改）
+
+    重复报道（duplicate_of）与缓存命中的条目不调用模型；超出时间预算的批次放弃，条目保持未增强
+
+    Returns:
+        dict: 统计信息 cached, enriched, failed, batches
+    """
+    memo = memo or EnrichMemo()
+    batch_size = batch_size or BATCH_SIZE
+    max_workers = max_workers or MAX_WORKERS
+    budget = min(TIME_BUDGET if budget is None else budget, current_deadline().remaining())
+    stats = {'cached': 0, 'enriched': 0, 'failed': 0, 'batches': 0}
+
+    pending = []
+    for i, item in enumerate(news['items']):
+        cached = memo.get(item.get('url'))
+        if cached:
+            item.update(cached)
+            stats['cached'] += 1
+        elif not item.get('duplicate_of'):
+            # 有原文时先在本地抽取关键句，压缩后代替快讯摘要送入模型
+            article = load_article(item.get('url'))
+            content = summarize(article, ARTICLE_SENTENCES, ARTICLE_CHARS) if article else item.get('content', '')
+            pending.append({'id': i, 'title': item.get('title', ''), 'content': content})
+
+    if pending:
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        stats['batches'] = len(batches)
+        deadline = time.monotonic() + budget
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='news-enrich')
+        try:
+            task = bind_context(enrich_batch)
+            futures = [executor.submit(task, batch, completion) for batch in batches]
+            done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            if not_done:
+                print(f"⚠ 增强超出时间预算，放弃 {len(not_done)} 个批次")
+            for future in done:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"错误: 增强批次失败 - {str(e)}")
+                    continue
+                for item_id, result in results.items():
+                    item = news['items'][item_id]
+                    item.update(result)
+                    memo.put(item.get('url'), result)
+                    stats['enriched'] += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        stats['failed'] = len(pending) - stats['enriched']
+
+    # 重复报道沿用首次出现条目（当天或缓存中前几天）的增强结果
+    by_url = {item.get('url'): item for item in news['items']}
+    for item in news['items']:
+        if 'category' in item or not item.get('duplicate_of'):
+            continue
+        original = by_url.get(item['duplicate_of'])
+        if original is None or 'category' not in original:
+            original = memo.get(item['duplicate_of'])
+        if original:
+            item.update({field: original[field] for field in ENRICH_FIELDS})
+
+    memo.save()
+    return stats
+
+
+def write_enriched(news):
+    """增强并保存到原始 JSON 旁的 {date}-enriched.json，未配置模型时跳过"""
+    if not is_configured():
+        print("未设置 VOLCENGINE_API_KEY，跳过新闻增强")
+        return None
+    enriched = {**news, 'items': [dict(item) for item in news['items']]}
+    stats = enrich_news(enriched)
+    print(f"News enrich: {stats['enriched']} enriched, {stats['cached']} cached, "
+          f"{stats['failed']} failed ({stats['batches']} batches)")
+
+    path = artifact_path('ai-news', news['date'], '-enriched.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(enriched, f, ensure_ascii=False, indent=2)
+    record_artifact(path)
+    return path
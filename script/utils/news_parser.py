@@ -0,0 +1,98 @@
+# coding:utf-8
+
+"""
+AI 快讯页面解析
+从 ai-bot.cn 每日快讯页面中提取当天的新闻条目；抓取脚本与历史回填共用
+"""
+
+import codecs
+
+from pyquery import PyQuery as pq
+
+from .extraction import (ExtractionSchema, SelectorSet, check_text, check_url, repair_mojibake,
+                         validate_page)
+
+
+NEWS_URL = 'https://ai-bot.cn/daily-ai-news/'
+
+# 解析逻辑变更时递增，回填据此判断历史结果是否需要重新解析
+PARSER_VERSION = 2
+
+_NEWS_FIELDS = {
+    'title': 'h2 a',
+    'url': ('h2 a', 'href'),
+    'content': 'p.text-muted',
+    'source': '.news-time',
+}
+
+
+def _clean_item(item):
+    """去掉来源前缀，并从正文中移除来源信息"""
+    item['source'] = item['source'].replace('来源：', '').strip()
+    item['content'] = item['content'].replace(f"来源：{item['source']}", '').strip()
+    return item
+
+
+NEWS_SCHEMA = ExtractionSchema(
+    name='ai-news',
+    version=2,
+    selector_sets=[
+        # 第一个 news-list 区块即当天的新闻
+        SelectorSet('news-list', items='.news-item', fields=_NEWS_FIELDS, scope='.news-list', direct=True),
+        SelectorSet('news-list-nested', items='.news-item', fields=_NEWS_FIELDS, scope='.news-list'),
+        SelectorSet('article', items='article', fields={
+            'title': 'h2 a, h3 a',
+            'url': ('h2 a, h3 a', 'href'),
+            'content': 'p',
+            'source': '.news-time, .source',
+        }),
+    ],
+    required=('title', 'url', 'content'),
+    min_items=1,
+    max_items=40,
+    checks={'url': check_url, 'title': check_text, 'content': check_text},
+    postprocess=_clean_item,
+)
+
+
+def parse_news_html(html_content, date, check_layout=False):
+    """
+    解析快讯页面
+
+    Args:
+        html_content: 页面 HTML（按 latin-1 误解码的页面会先修复）
+        date: 新闻日期 YYYY-MM-DD
+        check_layout: 是否同时做页面结构改版检测（抓取当天页面时开启，回填历史时关闭）
+
+    Returns:
+        dict: {'date', 'weekday', 'items': [{'title', 'url', 'content', 'source', 'schema'}]}
+
+    Raises:
+        ExtractionError: 所有选择器都未通过校验（页面改版或内容异常）
+    """
+    html_content = repair_mojibake(html_content)
+    if check_layout:
+        result = validate_page(NEWS_SCHEMA, html_content, date)
+    else:
+        result = NEWS_SCHEMA.extract(html_content)
+
+    date_text = pq(html_content)('.news-list').eq(0).children('.news-date').text()
+    date_parts = date_text.split('·')
+
+    return {
+        'date': date,
+        'weekday': date_parts[1] if len(date_parts) > 1 else '',
+        'items': [dict(item, schema=result.tag) for item in result.items],
+    }
+
+
+def parse_news_from_file(file_path, date):
+    """
+    读取并解析当天抓取的快讯页面
+
+    Raises:
+        ExtractionError: 页面未通过校验
+    """
+    with codecs.open(file_path, 'r', 'utf-8') as f:
+        html_content = f.read()
+    return parse_news_html(html_content, date, check_layout=True)
@@ -0,0 +1,195 @@
+# coding:utf-8
+
+"""
+AI 快讯日内轮询
+按间隔重新抓取快讯页面（ETag / Last-Modified 条件请求，页面未变化时不解析），
+只把当天 JSON 中还没有的条目追加进去并推送一条小的增量消息（日报任务已保存的条目不会再推送），
+推送失败的条目记在待推送列表中下次重试；当天完整的快讯日报仍由推送脚本基于追加后的 JSON 生成
+"""
+
+import codecs
+import json
+import os
+import threading
+from datetime import date as date_cls, datetime, timedelta
+
+from .manifest import record_artifact
+from .http import hedged_get
+from .news_dedup import dedup_news
+from .news_parser import NEWS_URL, parse_news_html
+from .record_store import append_news
+from .render import render_news_update
+from .storage import CACHE_DIR, artifact_path, read_artifact
+from .wecom import get_msgtypes, get_webhook_url, send_wecom_payload
+
+
+POLL_DIR = os.path.join(CACHE_DIR, 'news-poll')
+# 已见集合保留天数
+KEEP_DAYS = 7
+
+# 完整抓取与轮询都会改写当天 JSON，常驻模式下两者在不同线程运行
+_day_lock = threading.Lock()
+
+
+def decode_page(response):
+    """站点未声明 charset 时 requests 默认按 latin-1 解码，会把中文存成乱码"""
+    if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+        response.encoding = 'utf-8'
+    return response.text
+
+
+class PollState:
+    """某一天的轮询状态：条件请求校验值、已见 URL 集合与待推送 URL 列表（.cache/news-poll/{date}.json）"""
+
+    def __init__(self, date, directory=None):
+        self.date = date
+        self.directory = directory or POLL_DIR
+        self.path = os.path.join(self.directory, f'{date}.json')
+        self.etag = None
+        self.last_modified = None
+        self.seen = set()
+        self.unsent = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.etag = data.get('etag')
+                self.last_modified = data.get('last_modified')
+                self.seen = set(data.get('seen', []))
+                self.unsent = data.get('unsent', [])
+            except (OSError, ValueError) as e:
+                print(f"警告: 轮询状态损坏，重新开始: {e}")
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'etag': self.etag, 'last_modified': self.last_modified, 'seen': sorted(self.seen),
+                       'unsent': self.unsent}, f)
+        os.replace(tmp, self.path)
+        self._prune()
+
+    def _prune(self):
+        cutoff = (date_cls.fromisoformat(self.date) - timedelta(days=KEEP_DAYS)).isoformat()
+        for name in os.listdir(self.directory):
+            if name.endswith('.json') and name[:-5] < cutoff:
+                os.remove(os.path.join(self.directory, name))
+
+
+def merge_day(parsed):
+    """
+    把解析出的条目合并进当天 JSON（已有条目保持原顺序，新条目追加在末尾），
+    重新去重后保存并同步到记录存储
+
+    Returns:
+        (news, new_items): 合并后的当天数据与本次新增的条目
+    """
+    date = parsed['date']
+    with _day_lock:
+        raw = read_artifact('ai-news', date, '.json')
+        news = json.loads(raw) if raw else {'date': date, 'weekday': parsed.get('weekday', ''), 'items': []}
+        if not news.get('weekday'):
+            news['weekday'] = parsed.get('weekday', '')
+        known = {item['url'] for item in news['items']}
+        new_items = []
+        for item in parsed['items']:
+            if item['url'] not in known:
+                known.add(item['url'])
+                new_items.append(item)
+        news['items'].extend(new_items)
+
+        # 去重：当天近似重复与前几天已出现过的条目只打标记，推送时跳过
+        stats = dedup_news(news)
+        json_file = artifact_path('ai-news', date, '.json')
+        with codecs.open(json_file, 'w', 'utf-8') as f:
+            json.dump(news, f, ensure_ascii=False, indent=2)
+        record_artifact(json_file)
+        append_news(date, news['items'])
+    print(f"Dedup: {stats['same_day']} same-day duplicates, {stats['cross_day']} repeats from previous days")
+    return news, new_items
+
+
+def _fetch(state):
+    headers = {}
+    if state.etag:
+        headers['If-None-Match'] = state.etag
+    if state.last_modified:
+        headers['If-Modified-Since'] = state.last_modified
+    return hedged_get(NEWS_URL, headers=headers, timeout=10)
+
+
+def send_update(items, now=None, send=send_wecom_payload):
+    """推送增量消息，返回是否至少成功发送一种消息类型"""
+    webhook_url = get_webhook_url()
+    if not webhook_url:
+        print("⚠ 未设置 WECOM_WEBHOOK_URL，跳过增量推送")
+        return False
+    time_text = (now or datetime.now()).strftime('%H:%M')
+    sent = False
+    for msgtype in get_msgtypes():
+        payload = render_news_update(items, time_text, msgtype)
+        if payload is not None and send(webhook_url, payload):
+            sent = True
+    return sent
+
+
+def push_unsent(date, state, now=None, send=send_wecom_payload):
+    """
+    推送待推送列表中的条目（按当天 JSON 中的最新去重标记，重复报道不推送），成功后清空列表
+
+    Returns:
+        list[dict]: 成功推送的条目
+    """
+    raw = read_artifact('ai-news', date, '.json')
+    by_url = {item['url']: item for item in json.loads(raw)['items']} if raw else {}
+    items = [by_url[url] for url in state.unsent if url in by_url and not by_url[url].get('duplicate_of')]
+    if items and not send_update(items, now, send):
+        print(f"⚠ 增量推送失败，{len(items)} 条留待下次轮询重试")
+        return []
+    state.unsent = []
+    return items
+
+
+def poll_once(date, state=None, fetch=_fetch, send=send_wecom_payload, now=None):
+    """
+    轮询一次：追加新条目并推送（包括之前推送失败的条目）
+
+    Returns:
+        list[dict]: 本次新追加到当天 JSON 的条目（页面未变化或没有新条目时为空）
+    """
+    state = state or PollState(date)
+    response = fetch(state)
+    updates = []
+    if response.status_code == 304:
+        print("快讯页面未变化（304）")
+    else:
+        response.raise_for_status()
+        html = decode_page(response)
+        parsed = parse_news_html(html, date)
+        # 当天 JSON 中已有的条目（例如日报任务已保存的）也视为已见
+        raw = read_artifact('ai-news', date, '.json')
+        known = state.seen | ({item['url'] for item in json.loads(raw)['items']} if raw else set())
+        fresh = [item for item in parsed['items'] if item['url'] not in known]
+        if fresh:
+            output_file = artifact_path('ai-news', date, '.html')
+            with codecs.open(output_file, 'w', 'utf-8') as f:
+                f.write(html)
+            record_artifact(output_file)
+            # 以 merge_day 实际追加的条目为准（与日报任务并发时不会重复推送）
+            news, new_items = merge_day({**parsed, 'items': fresh})
+            by_url = {item['url']: item for item in news['items']}
+            updates = [by_url[item['url']] for item in new_items]
+            state.unsent.extend(item['url'] for item in updates if item['url'] not in state.unsent)
+            print(f"新增 {len(updates)} 条快讯")
+        else:
+            print("没有新的快讯")
+        state.seen.update(item['url'] for item in parsed['items'])
+        state.etag = response.headers.get('ETag')
+        state.last_modified = response.headers.get('Last-Modified')
+
+    if state.unsent:
+        pushed = push_unsent(date, state, now, send)
+        if pushed:
+            print(f"✓ 已推送 {len(pushed)} 条新增快讯")
+    state.save()
+    return updates
@@ -0,0 +1,287 @@
+# coding:utf-8
+
+"""
+README 摘要
+并发获取热榜仓库的 README（REST /repos/{owner}/{repo}/readme，带 ETag 条件请求），
+压缩成有 token 上限的摘要（标题、开头段落、安装命令）；
+摘要按 README 的 blob sha 内容寻址存放在 .cache/readme/，仓库连续多天在榜时只获取和摘要一次
+"""
+
+import base64
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .deadline import bind_context
+from .http import hedged_get
+from .storage import CACHE_DIR
+
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+README_DIR = os.path.join(CACHE_DIR, 'readme')
+INDEX_FILE = os.path.join(README_DIR, 'index.json')
+DIGEST_DIR = os.path.join(README_DIR, 'digests')
+# 摘要规则变化时递增，使旧摘要失效
+DIGEST_VERSION = 1
+
+MAX_TOKENS = int(os.environ.get('README_DIGEST_TOKENS', '200'))
+MAX_WORKERS = int(os.environ.get('README_WORKERS', '8'))
+# 在该时间（秒）内检查过的仓库直接使用已有摘要，不再发请求
+RECHECK_SECONDS = 12 * 3600
+INSTALL_LINES = 4
+
+INSTALL_RE = re.compile(r'\b(pip3? install|uv (?:pip|add|tool)|pipx install|npm (?:i|install)|npx |yarn add|pnpm (?:add|i)|'
+                        r'cargo (?:install|add)|go (?:install|get)|brew install|docker (?:run|pull)|'
+                        r'docker compose|curl .*\| *(?:ba)?sh|git clone)\b')
+INSTALL_HEADING_RE = re.compile(r'install|setup|getting started|quick ?start|usage|安装|快速开始|使用', re.I)
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+EMPHASIS_RE = re.compile(r'\*\*|__|`')
+CJK_RE = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数：中日韩字符各算 1 个，其余按 4 个字符 1 个"""
+    cjk = len(CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _clean_line(line):
+    line = IMAGE_RE.sub('', line)
+    line = LINK_RE.sub(r'\1', line)
+    line = HTML_TAG_RE.sub('', line)
+    line = EMPHASIS_RE.sub('', line)
+    return ' '.join(line.split())
+
+
+def _blocks(markdown):
+    """
+    把 README 拆成 (类型, 内容, 所属标题) 序列，类型为 heading / paragraph / code
+    图片徽章、HTML 标签与注释、表格行被去掉
+    """
+    markdown = HTML_COMMENT_RE.sub('', markdown)
+    heading, paragraph, code, in_code = '', [], [], False
+    for raw in markdown.splitlines():
+        if FENCE_RE.match(raw):
+            if in_code:
+                yield 'code', '\n'.join(code), heading
+                code = []
+            elif paragraph:
+                yield 'paragraph', ' '.join(paragraph), heading
+                paragraph = []
+            in_code = not in_code
+            continue
+        if in_code:
+            code.append(raw.rstrip())
+            continue
+        match = HEADING_RE.match(raw)
+        if match:
+            if paragraph:
+                yield 'paragraph', ' '.join(paragraph), heading
+                paragraph = []
+            heading = _clean_line(match.group(2))
+            if heading:
+                yield 'heading', heading, heading
+            continue
+        line = _clean_line(raw)
+        if not line or raw.lstrip().startswith('|'):
+            if paragraph:
+                yield 'paragraph', ' '.join(paragraph), heading
+                paragraph = []
+            continue
+        paragraph.append(line)
+    if paragraph:
+        yield 'paragraph', ' '.join(paragraph), heading
+
+
+def _install_snippet(code):
+    lines = [line.strip() for line in code.splitlines() if line.strip() and not line.strip().startswith('#')]
+    commands = [line.lstrip('$> ') for line in lines if INSTALL_RE.search(line)]
+    return '\n'.join(commands[:INSTALL_LINES])
+
+
+def make_digest(markdown, max_tokens=MAX_TOKENS):
+    """
+    README -> 摘要
+
+    依次放入：第一段介绍、安装命令、各级标题及其下第一段，直到 token 用完
+    """
+    blocks = list(_blocks(markdown))
+    intro = next((text for kind, text, _ in blocks if kind == 'paragraph' and len(text) > 20), '')
+    install = ''
+    for kind, text, heading in blocks:
+        if kind == 'code' and (INSTALL_RE.search(text) or INSTALL_HEADING_RE.search(heading)):
+            install = _install_snippet(text)
+            if install:
+                break
+
+    parts, used = [], 0
+
+    def add(text):
+        nonlocal used
+        cost = estimate_tokens(text)
+        if used + cost > max_tokens:
+            return False
+        parts.append(text)
+        used += cost
+        return True
+
+    if intro and not add(intro):
+        # 第一段就超出预算时按比例截断
+        ratio = max_tokens / max(estimate_tokens(intro), 1)
+        parts.append(intro[:int(len(intro) * ratio)].rstrip() + '…')
+        return '\n'.join(parts)
+    if install:
+        add('安装: ' + install.replace('\n', '; '))
+
+    seen_heading = None
+    for kind, text, heading in blocks:
+        if kind == 'heading':
+            seen_heading = text
+        elif kind == 'paragraph' and seen_heading is not None and text != intro:
+            if not add(f"[{seen_heading}] {text}"):
+                break
+            seen_heading = None
+    return '\n'.join(parts)
+
+
+class DigestStore:
+    """
+    README 摘要存储
+    index.json: 仓库名 -> {sha, etag, checked_at}；digests/{sha[:2]}/{sha}.json: 按内容寻址的摘要
+    """
+
+    def __init__(self, directory=None, clock=time.time):
+        self.directory = directory or README_DIR
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.clock = clock
+        self.index = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"警告: README 索引损坏，重新开始: {e}")
+
+    def _digest_path(self, sha):
+        return os.path.join(self.directory, 'digests', sha[:2], f'{sha}.json')
+
+    def load_digest(self, sha):
+        path = self._digest_path(sha)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record['digest'] if record.get('version') == DIGEST_VERSION else None
+
+    def save_digest(self, sha, digest):
+        path = self._digest_path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'sha': sha, 'version': DIGEST_VERSION, 'digest': digest}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def entry(self, name):
+        return self.index.get(name)
+
+    def update(self, name, sha, etag):
+        with self._lock:
+            self.index[name] = {'sha': sha, 'etag': etag, 'checked_at': self.clock()}
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self.index_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+
+
+def _get(url, headers):
+    return hedged_get(url, headers=headers, timeout=10)
+
+
+def readme_digest(name, store, fetch=_get, max_tokens=MAX_TOKENS):
+    """
+    获取单个仓库的 README 摘要
+
+    Returns:
+        str: 摘要；没有 README 或请求失败且无缓存时返回 None
+    """
+    entry = store.entry(name)
+    if entry and store.clock() - entry['checked_at'] < RECHECK_SECONDS:
+        if entry['sha'] is None:
+            return None
+        digest = store.load_digest(entry['sha'])
+        if digest is not None:
+            return digest
+
+    headers = {'Accept': 'application/vnd.github+json'}
+    token = os.environ.get('GITHUB_TOKEN')
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    cached = store.load_digest(entry['sha']) if entry and entry.get('sha') else None
+    if entry and entry.get('etag') and cached is not None:
+        headers['If-None-Match'] = entry['etag']
+
+    try:
+        response = fetch(f"{GITHUB_API_URL}/repos/{name}/readme", headers)
+        if response.status_code == 304 and cached is not None:
+            store.update(name, entry['sha'], entry['etag'])
+            return cached
+        if response.status_code == 404:
+            store.update(name, None, None)
+            return None
+        response.raise_for_status()
+        body = response.json()
+    except Exception as e:
+        print(f"⚠ 获取 README 失败 {name}: {str(e)}")
+        return cached
+
+    sha = body['sha']
+    etag = response.headers.get('ETag')
+    digest = store.load_digest(sha)
+    if digest is None:
+        # 内容寻址：其他仓库（如 fork）或前几天已摘要过的相同 README 直接复用
+        content = base64.b64decode(body.get('content') or '').decode('utf-8', errors='replace')
+        digest = make_digest(content, max_tokens)
+        store.save_digest(sha, digest)
+    store.update(name, sha, etag)
+    return digest
+
+
+def readme_digests(names, store=None, fetch=_get, max_workers=MAX_WORKERS):
+    """
+    并发获取一组仓库的 README 摘要
+
+    Returns:
+        dict: 仓库名 -> 摘要（没有摘要的仓库不出现）
+    """
+    store = store or DigestStore()
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names)))) as pool:
+        digests = list(pool.map(bind_context(lambda name: readme_digest(name, store, fetch)), names))
+    store.save()
+    return {name: digest for name, digest in zip(names, digests) if digest}
+
+
+def format_readme_section(rows, digests):
+    """生成 AI 分析 prompt 中的“README 摘要”小节"""
+    blocks = [f"#### {row['name']}\n{digests[row['name']]}" for row in rows if digests.get(row['name'])]
+    if not blocks:
+        return ''
+    return '\n### README 摘要\n\n' + '\n\n'.join(blocks) + '\n'
@@ -0,0 +1,333 @@
+# coding:utf-8
+
+"""
+定长记录存储
+每日新闻条目与热榜行以定长行写入 {name}.idx（日期 + 字段偏移/长度或整数值），
+字符串统一追加到 {name}.str 字符串表。读取时通过 mmap 按日期二分定位，
+迭代器直接返回字符串表中的 memoryview 切片，无需解析 JSON/markdown
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from datetime import date as date_cls
+
+from .storage import CACHE_DIR, list_dates, read_artifact
+from .trending_records import load_trending_rows
+
+
+MAGIC = b'GSREC001'
+# 头部: 魔数(8) + 行长度(uint32) + 模式校验和(uint32)
+HEADER = struct.Struct('<8sII')
+
+RECORDS_DIR = os.path.join(CACHE_DIR, 'records')
+
+NEWS_SCHEMA = (('title', 'str'), ('url', 'str'), ('content', 'str'), ('source', 'str'))
+TRENDING_SCHEMA = (('rank', 'int'), ('name', 'str'), ('url', 'str'), ('description', 'str'),
+                   ('language', 'str'), ('stars', 'int'))
+
+
+def _ordinal(date):
+    return date_cls.fromisoformat(date).toordinal()
+
+
+class RecordView:
+    """一条记录的只读视图，字符串字段按需解码"""
+
+    __slots__ = ('_store', '_offset', 'date')
+
+    def __init__(self, store, offset, date):
+        self._store = store
+        self._offset = offset
+        self.date = date
+
+    def raw(self, field):
+        """字符串字段返回字符串表中的 memoryview（零拷贝），整数字段返回 int"""
+        return self._store._field(self._offset, field)
+
+    def __getitem__(self, field):
+        value = self.raw(field)
+        return value if isinstance(value, int) else str(value, 'utf-8')
+
+    def to_dict(self):
+        return {name: self[name] for name, _ in self._store.schema}
+
+
+class RecordStore:
+    """
+    按日期追加的定长记录存储
+
+    Args:
+        name: 存储名称，对应 {directory}/{name}.idx 与 {name}.str
+        schema: ((字段名, 'str'|'int'), ...)
+        directory: 存放目录，默认 .cache/records
+    """
+
+    def __init__(self, name, schema, directory=None):
+        self.schema = tuple(schema)
+        directory = directory or RECORDS_DIR
+        self.idx_path = os.path.join(directory, f'{name}.idx')
+        self.str_path = os.path.join(directory, f'{name}.str')
+
+        fmt = '<I' + ''.join('QI' if kind == 'str' else 'q' for _, kind in self.schema)
+        self.row = struct.Struct(fmt)
+        self.checksum = zlib.crc32(repr(self.schema).encode('utf-8'))
+
+        # 字段名 -> (在解包元组中的位置, 类型)
+        self._slots = {}
+        pos = 1
+        for field, kind in self.schema:
+            self._slots[field] = (pos, kind)
+            pos += 2 if kind == 'str' else 1
+
+        self._idx = self._str = None
+        self._idx_file = self._str_file = None
+
+    # ---------- 写入 ----------
+
+    def _ensure_files(self):
+        os.makedirs(os.path.dirname(self.idx_path), exist_ok=True)
+        if not os.path.exists(self.idx_path) or os.path.getsize(self.idx_path) < HEADER.size:
+            with open(self.idx_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, self.row.size, self.checksum))
+            open(self.str_path, 'wb').close()
+        with open(self.idx_path, 'rb') as f:
+            magic, row_size, checksum = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or row_size != self.row.size or checksum != self.checksum:
+            raise ValueError(f"记录存储格式不匹配: {self.idx_path}，请重建")
+
+    def append_day(self, date, records):
+        """
+        追加一天的记录
+
+        日期必须不早于已有的最后一天；与最后一天相同时覆盖该天的数据
+
+        Args:
+            date: YYYY-MM-DD
+            records: list[dict]，缺失的字段按空字符串 / 0 写入
+        """
+        self.close()
+        self._ensure_files()
+        ordinal = _ordinal(date)
+
+        last = self._last_ordinal()
+        if last is not None and ordinal < last:
+            raise ValueError(f"只能按日期顺序追加: {date} 早于已有数据，请使用 rebuild")
+        if last == ordinal:
+            self._truncate_day(ordinal)
+
+        str_pos = os.path.getsize(self.str_path)
+        rows = bytearray()
+        strings = bytearray()
+        for record in records:
+            values = [ordinal]
+            for field, kind in self.schema:
+                value = record.get(field)
+                if kind == 'str':
+                    data = ('' if value is None else str(value)).encode('utf-8')
+                    values.extend((str_pos + len(strings), len(data)))
+                    strings += data
+                else:
+                    values.append(int(value or 0))
+            rows += self.row.pack(*values)
+
+        # 先写字符串表再写索引，中途失败时索引不会指向不存在的数据
+        with open(self.str_path, 'ab') as f:
+            f.write(strings)
+        with open(self.idx_path, 'ab') as f:
+            f.write(rows)
+
+    def _last_ordinal(self):
+        size = os.path.getsize(self.idx_path)
+        if size <= HEADER.size:
+            return None
+        with open(self.idx_path, 'rb') as f:
+            f.seek(size - self.row.size)
+            return self.row.unpack(f.read(self.row.size))[0]
+
+    def _truncate_day(self, ordinal):
+        """删除最后一天的所有行及其字符串"""
+        with open(self.idx_path, 'r+b') as f:
+            count = (os.path.getsize(self.idx_path) - HEADER.size) // self.row.size
+            cut = count
+            str_cut = None
+            while cut > 0:
+                f.seek(HEADER.size + (cut - 1) * self.row.size)
+                values = self.row.unpack(f.read(self.row.size))
+                if values[0] != ordinal:
+                    break
+                offsets = [values[pos] for pos, kind in self._slots.values() if kind == 'str']
+                if offsets:
+                    str_cut = min(offsets) if str_cut is None else min(str_cut, *offsets)
+                cut -= 1
+            f.truncate(HEADER.size + cut * self.row.size)
+        if str_cut is not None:
+            with open(self.str_path, 'r+b') as f:
+                f.truncate(str_cut)
+
+    def rebuild(self, days):
+        """从 (date, records) 序列重建整个存储（需按日期升序）"""
+        self.close()
+        for path in (self.idx_path, self.str_path):
+            if os.path.exists(path):
+                os.remove(path)
+        count = 0
+        for date, records in days:
+            self.append_day(date, records)
+            count += 1
+        return count
+
+    # ---------- 读取 ----------
+
+    def _open(self):
+        if self._idx is not None:
+            return True
+        if not os.path.exists(self.idx_path) or os.path.getsize(self.idx_path) <= HEADER.size:
+            return False
+        self._ensure_files()
+        self._idx_file = open(self.idx_path, 'rb')
+        self._idx = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._str_file = open(self.str_path, 'rb')
+        if os.path.getsize(self.str_path) > 0:
+            self._str = memoryview(mmap.mmap(self._str_file.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            self._str = memoryview(b'')
+        return True
+
+    def close(self):
+        if self._str is not None:
+            obj = self._str.obj
+            try:
+                self._str.release()
+                if isinstance(obj, mmap.mmap):
+                    obj.close()
+            except BufferError:
+                # 调用方仍持有 memoryview 切片，交给垃圾回收释放映射
+                pass
+        if self._idx is not None:
+            self._idx.close()
+        for f in (self._idx_file, self._str_file):
+            if f:
+                f.close()
+        self._idx = self._str = None
+        self._idx_file = self._str_file = None
+
+    def __len__(self):
+        if not self._open():
+            return 0
+        return (len(self._idx) - HEADER.size) // self.row.size
+
+    def _ordinal_at(self, i):
+        return struct.unpack_from('<I', self._idx, HEADER.size + i * self.row.size)[0]
+
+    def _bisect(self, ordinal):
+        """返回第一条日期 >= ordinal 的行号"""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ordinal_at(mid) < ordinal:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _field(self, offset, field):
+        pos, kind = self._slots[field]
+        values = self.row.unpack_from(self._idx, offset)
+        if kind == 'int':
+            return values[pos]
+        start, length = values[pos], values[pos + 1]
+        return self._str[start:start + length]
+
+    def iter_range(self, start=None, end=None):
+        """
+        迭代日期闭区间 [start, end] 内的记录
+
+        Yields:
+            RecordView: 记录视图，record['title'] 解码字符串，record.raw('title') 返回 memoryview
+        """
+        if not self._open():
+            return
+        total = len(self)
+        i = self._bisect(_ordinal(start)) if start else 0
+        end_ordinal = _ordinal(end) if end else None
+        while i < total:
+            ordinal = self._ordinal_at(i)
+            if end_ordinal is not None and ordinal > end_ordinal:
+                break
+            yield RecordView(self, HEADER.size + i * self.row.size, date_cls.fromordinal(ordinal).isoformat())
+            i += 1
+
+    def dates(self):
+        """已存储的日期列表"""
+        seen = []
+        if not self._open():
+            return seen
+        for i in range(len(self)):
+            ordinal = self._ordinal_at(i)
+            if not seen or seen[-1] != ordinal:
+                seen.append(ordinal)
+        return [date_cls.fromordinal(o).isoformat() for o in seen]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def news_store(directory=None):
+    return RecordStore('ai-news', NEWS_SCHEMA, directory)
+
+
+def trending_store(directory=None):
+    return RecordStore('github-trending', TRENDING_SCHEMA, directory)
+
+
+def _safe_append(store, date, records):
+    """日常任务中追加记录，失败只打印警告不影响主流程"""
+    try:
+        with store:
+            store.append_day(date, records)
+    except Exception as e:
+        print(f"⚠ 写入记录存储失败 ({store.idx_path}): {str(e)}")
+
+
+def append_news(date, items):
+    _safe_append(news_store(), date, items)
+
+
+def append_trending(date, rows):
+    _safe_append(trending_store(), date, rows)
+
+
+def rebuild_from_archive():
+    """从 output/ 归档重建新闻与热榜记录存储，返回 (新闻天数, 热榜天数)"""
+    def _news_days():
+        for date in list_dates('ai-news', '.json'):
+            raw = read_artifact('ai-news', date, '.json')
+            try:
+                yield date, json.loads(raw).get('items', [])
+            except ValueError:
+                print(f"⚠ 跳过无法解析的新闻文件: {date}")
+
+    def _trending_days():
+        dates = sorted(set(list_dates('github-trending', '.md')) | set(list_dates('github-trending', '.json')))
+        for date in dates:
+            rows = load_trending_rows(date)
+            if rows:
+                yield date, rows
+
+    with news_store() as news, trending_store() as trending:
+        return news.rebuild(_news_days()), trending.rebuild(_trending_days())
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['rebuild']:
+        news_days, trending_days = rebuild_from_archive()
+        print(f"✓ 重建完成: 新闻 {news_days} 天, 热榜 {trending_days} 天")
+    else:
+        print("用法: python -m script.utils.record_store rebuild")
@@ -0,0 +1,361 @@
+# coding:utf-8
+
+"""
+通知消息渲染
+模板在导入时编译成 (字面量, 取值函数, 格式) 序列，渲染时把片段追加到列表再一次性 join；
+同一份产物按渠道（企业微信 markdown / markdown_v2 / text / news 图文）分别渲染，
+结果按 “模板版本 + 渠道 + 产物内容哈希” 缓存，重发、预览和多渠道推送都不会重复渲染
+
+用法:
+    python -m script.utils.render ai-news 2026-02-16 --channel text
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import string
+import threading
+from collections import OrderedDict
+
+from .storage import CACHE_DIR, read_artifact
+from .entity_link import format_links_section, format_news_related, news_annotations
+from .summarizer import summarize_news, summarize_trending
+from .trending_diff import format_diff_section
+
+
+RENDER_CACHE_DIR = os.path.join(CACHE_DIR, 'render')
+# 模板或渲染逻辑变化时递增，使旧缓存失效
+RENDER_VERSION = 4
+
+CHANNELS = ('markdown', 'markdown_v2', 'text', 'news')
+# 企业微信各消息类型的内容上限（字节）
+MAX_BYTES = {'markdown': 4096, 'markdown_v2': 4096, 'text': 2048}
+# 留给截断提示的余量
+TRUNCATE_MARGIN = 296
+TRUNCATED_HINT = "\n\n... (更多内容请查看仓库)"
+MAX_ARTICLES = 8
+
+
+class Template:
+    """编译后的模板，占位符语法与 str.format 相同，支持点分路径（如 {item.title}）"""
+
+    def __init__(self, source):
+        self.source = source
+        self._parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            getter = self._compile_getter(field) if field is not None else None
+            self._parts.append((literal, getter, spec or '', conversion))
+
+    @staticmethod
+    def _compile_getter(field):
+        path = field.split('.')
+
+        def getter(context):
+            value = context
+            for key in path:
+                value = value.get(key, '') if isinstance(value, dict) else getattr(value, key, '')
+            return value
+        return getter
+
+    def render_into(self, out, context):
+        for literal, getter, spec, conversion in self._parts:
+            if literal:
+                out.append(literal)
+            if getter is not None:
+                value = getter(context)
+                if conversion == 'r':
+                    value = repr(value)
+                out.append(format(value, spec) if spec else str(value))
+
+    def render(self, context):
+        out = []
+        self.render_into(out, context)
+        return ''.join(out)
+
+
+def join_within(parts, max_bytes, hint=TRUNCATED_HINT):
+    """
+    按顺序拼接片段直到接近字节上限（线性时间），超出时在片段边界截断并追加提示
+
+    第一个片段本身超长时按字节截断（保留完整字符）
+    """
+    budget = max_bytes - TRUNCATE_MARGIN
+    out, used = [], 0
+    for i, part in enumerate(parts):
+        size = len(part.encode('utf-8'))
+        if used + size > budget:
+            if not out:
+                out.append(part.encode('utf-8')[:budget].decode('utf-8', errors='ignore'))
+            out.append(hint)
+            break
+        out.append(part)
+        used += size
+    return ''.join(out)
+
+
+# ---------- 模板 ----------
+
+NEWS_TEMPLATES = {
+    'markdown': (Template("# AI快讯 ({date} {weekday})\n## 今日要闻\n"),
+                 Template("### {title}\n> {content}\n来源：{source} [查看详情]({url})\n{related}\n")),
+    'markdown_v2': (Template("# AI快讯 ({date} {weekday})\n\n"),
+                    Template("### [{title}]({url})\n{content}\n\n*来源：{source}*\n{related}\n")),
+    'text': (Template("AI快讯 ({date} {weekday})\n\n"),
+             Template("{index}. {title}\n{url}\n{related}\n")),
+}
+# 日内增量推送的标题（条目模板与日报相同）
+NEWS_UPDATE_HEADERS = {
+    'markdown': Template("# AI快讯 · 新增 {count} 条 ({time})\n"),
+    'markdown_v2': Template("# AI快讯 · 新增 {count} 条 ({time})\n\n"),
+    'text': Template("AI快讯 新增 {count} 条 ({time})\n\n"),
+}
+TRENDING_TITLE = "# GitHub Trending 今日热榜\n\n"
+TRENDING_ARTICLE = Template("{rank}. {name}")
+
+_MD_LINK_RE = re.compile(r'\[([^\]]*)\]\(([^)]*)\)')
+_MD_MARK_RE = re.compile(r'^\s*(#+|>)\s?|\*\*|__|`', re.M)
+
+
+def markdown_to_text(content):
+    """markdown -> 纯文本（链接保留为 “文字 链接”）"""
+    content = _MD_LINK_RE.sub(lambda m: f"{m.group(1)} {m.group(2)}".strip(), content)
+    return _MD_MARK_RE.sub('', content)
+
+
+def _payload(channel, body):
+    if channel == 'news':
+        return {'msgtype': 'news', 'news': {'articles': body}}
+    if channel == 'text':
+        return {'msgtype': 'text', 'text': {'content': body}}
+    return {'msgtype': channel, channel: {'content': body}}
+
+
+def _render_news_items(header, items, channel, annotations=None):
+    if channel == 'news':
+        # 图文消息条数有限，条目过多时挑出最有代表性且互不重复的
+        if len(items) > MAX_ARTICLES:
+            items = summarize_news(items, MAX_ARTICLES)
+        articles = [{'title': item['title'], 'description': (item.get('summary') or item.get('content') or '')[:120],
+                     'url': item['url']} for item in items[:MAX_ARTICLES]]
+        return _payload(channel, articles)
+
+    item_template = NEWS_TEMPLATES[channel][1]
+    parts = [header]
+    annotations = annotations or {}
+    for index, item in enumerate(items, 1):
+        # 与当天热榜仓库的关联（见 entity_link），没有关联时为空
+        related = format_news_related(annotations.get(item['url']), channel)
+        parts.append(item_template.render({**item, 'index': index, 'related': related}))
+    return _payload(channel, join_within(parts, MAX_BYTES[channel]))
+
+
+def render_news(news, channel='markdown', links=None):
+    """
+    渲染 AI 快讯（跳过 duplicate_of 标记的重复条目）
+
+    Args:
+        links: 新闻与热榜的关联记录，关联的条目下标注对应仓库
+
+    Returns:
+        dict: 企业微信消息体 {'msgtype': ..., ...}
+    """
+    items = [item for item in news['items'] if not item.get('duplicate_of')]
+    header = NEWS_TEMPLATES[channel][0].render(news) if channel != 'news' else ''
+    return _render_news_items(header, items, channel, news_annotations(links or []))
+
+
+def render_news_update(items, time, channel='markdown'):
+    """渲染日内新增的快讯条目（跳过重复条目），没有可推送条目时返回 None"""
+    items = [item for item in items if not item.get('duplicate_of')]
+    if not items:
+        return None
+    header = NEWS_UPDATE_HEADERS[channel].render({'count': len(items), 'time': time}) if channel != 'news' else ''
+    return _render_news_items(header, items, channel)
+
+
+def render_trending(document, rows=None, channel='markdown'):
+    """
+    渲染 GitHub Trending（AI 分析报告或原始榜单 markdown）
+
+    Args:
+        document: markdown 正文；没有标题时补上 “今日热榜” 标题
+        rows: 结构化榜单行（news 图文渠道使用）
+    """
+    if channel == 'news':
+        articles = [{'title': TRENDING_ARTICLE.render(row), 'description': (row.get('description') or '')[:120],
+                     'url': row['url']} for row in (rows or [])[:MAX_ARTICLES]]
+        return _payload(channel, articles)
+
+    if not document.startswith('#'):
+        document = TRENDING_TITLE + document
+    if channel == 'text':
+        document = markdown_to_text(document)
+    # 按行拼接，截断时不会切断一行的中间
+    lines = document.splitlines(keepends=True)
+    return _payload(channel, join_within(lines, MAX_BYTES[channel]))
+
+
+# ---------- 缓存 ----------
+
+class RenderCache:
+    """渲染结果缓存：进程内 LRU + .cache/render/ 下的磁盘文件"""
+
+    def __init__(self, directory=None, capacity=128):
+        self.directory = directory or RENDER_CACHE_DIR
+        self.capacity = capacity
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        path = self._path(key)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                payload = None
+            if payload is not None:
+                self._remember(key, payload)
+                with self._lock:
+                    self.hits += 1
+                return payload
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, payload):
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
+
+    def put(self, key, payload):
+        self._remember(key, payload)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))
+
+
+_cache = RenderCache()
+
+
+def cache_key(template, channel, *contents):
+    digest = hashlib.sha1(f'{RENDER_VERSION}\0{template}\0{channel}'.encode('utf-8'))
+    for content in contents:
+        digest.update(b'\0')
+        digest.update((content or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+def render_news_artifact(date, channel='markdown', cache=None):
+    """渲染某天的 AI 快讯 JSON，没有数据时返回 None"""
+    cache = cache or _cache
+    content = read_artifact('ai-news', date, '.json')
+    if content is None:
+        return None
+    links = read_artifact('ai-news', date, '-links.json')
+    key = cache_key('ai-news', channel, content, links)
+    payload = cache.get(key)
+    if payload is None:
+        payload = render_news(json.loads(content), channel, json.loads(links)['links'] if links else None)
+        cache.put(key, payload)
+    return payload
+
+
+TRENDING_ARTIFACTS = (
+    ('rows', 'github-trending', '.json'),
+    ('analysis', 'github-trending', '-analysis.md'),
+    ('diff', 'github-trending', '-diff.json'),
+    ('links', 'ai-news', '-links.json'),
+    ('document', 'github-trending', '.md'),
+)
+
+
+def _read_trending(date):
+    """读取 Trending 消息用到的全部原始产物（不存在的为 None）"""
+    return {name: read_artifact(kind, date, suffix) for name, kind, suffix in TRENDING_ARTIFACTS}
+
+
+def _trending_document(raw):
+    """由原始产物生成 Trending 消息的来源说明与 markdown 内容"""
+    links_section = format_links_section(json.loads(raw['links'])['links']) if raw['links'] else ''
+    # 原始榜单自带“榜单变化”小节，AI 分析和离线摘要需要补上
+    diff_section = format_diff_section(json.loads(raw['diff'])) if raw['diff'] else ''
+    if raw['analysis'] is not None:
+        return 'AI分析', raw['analysis'] + diff_section + links_section
+    items = json.loads(raw['rows']).get('items', []) if raw['rows'] else []
+    if items:
+        return '离线摘要', summarize_trending(items) + diff_section + links_section
+    document = raw['document']
+    return '原始数据', document + links_section if document is not None else None
+
+
+def trending_source(date):
+    """
+    选择 Trending 消息的数据源：优先 AI 分析；没有时用结构化行生成离线摘要，最后回退到原始榜单
+
+    Returns:
+        (来源说明, markdown 内容, 结构化行 JSON 文本)；都不存在时 markdown 为 None
+    """
+    raw = _read_trending(date)
+    return _trending_document(raw) + (raw['rows'],)
+
+
+def render_trending_artifact(date, channel='markdown', cache=None):
+    """渲染某天的 GitHub Trending 消息，没有数据时返回 None"""
+    cache = cache or _cache
+    raw = _read_trending(date)
+    if raw['analysis'] is None and raw['rows'] is None and raw['document'] is None:
+        return None
+    # 缓存键只取原始产物，命中时不再生成离线摘要等中间文档
+    key = cache_key('github-trending', channel, *(raw[name] for name, _, _ in TRENDING_ARTIFACTS))
+    payload = cache.get(key)
+    if payload is None:
+        _, document = _trending_document(raw)
+        if document is None:
+            return None
+        items = json.loads(raw['rows']).get('items', []) if raw['rows'] else []
+        payload = render_trending(document, items, channel)
+        cache.put(key, payload)
+    return payload
+
+
+def payload_text(payload):
+    """消息体中的正文（news 图文返回 None）"""
+    body = payload.get(payload['msgtype'], {})
+    return body.get('content') if isinstance(body, dict) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='预览推送消息')
+    parser.add_argument('kind', choices=['ai-news', 'github-trending'])
+    parser.add_argument('date', help='日期 YYYY-MM-DD')
+    parser.add_argument('--channel', choices=CHANNELS, default='markdown')
+    args = parser.parse_args(argv)
+
+    render = render_news_artifact if args.kind == 'ai-news' else render_trending_artifact
+    payload = render(args.date, args.channel)
+    if payload is None:
+        print(f"未找到数据: {args.kind} {args.date}")
+        return
+    text = payload_text(payload)
+    print(text if text is not None else json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+# coding:utf-8
+
+"""
+周/月滚动聚合
+每天只把当天的新闻与热榜折叠进所在周、月的聚合文件（计数、来源、反复出现的话题、在榜仓库），
+周期结束后只把精简的聚合结果交给大模型生成回顾，并推送到企业微信
+"""
+
+import json
+import os
+import re
+from datetime import date as date_cls, timedelta
+
+from ..prompts.rollup_prompts import get_rollup_digest_prompt
+from .extraction import repair_mojibake
+from .llm import chat_completion
+from .manifest import record_artifact
+from .storage import read_artifact
+from .trending_analytics import REPORTS_DIR, period_bounds
+from .trending_records import load_trending_rows
+from .wecom import get_webhook_url, send_wecom_message
+
+
+PERIODS = ('week', 'month')
+PERIOD_NAMES = {'week': '本周', 'month': '本月'}
+
+# 聚合中最多保留的话题/仓库数，超出时淘汰出现天数最少的条目，保证单个文件大小有界
+MAX_TOPICS = 300
+MAX_REPOS = 300
+
+MAX_MESSAGE_BYTES = 3800
+
+# 话题：英文/数字专有名词（模型、公司、产品名）以及书名号、引号中的名称
+_LATIN_RE = re.compile(r'[A-Za-z][A-Za-z0-9.+\-]*[A-Za-z0-9+]|[A-Za-z]')
+_QUOTED_RE = re.compile(r'[《「“]([^》」”]{2,20})[》」”]')
+_STOPWORDS = {'ai', 'the', 'and', 'for', 'of', 'to', 'in', 'on', 'with', 'a', 'an', 'is', 'app', 'api'}
+
+
+def extract_topics(title):
+    """从新闻标题中提取话题词（去重，保留原始大小写）"""
+    topics = []
+    for word in _LATIN_RE.findall(title or ''):
+        if len(word) >= 2 and word.lower() not in _STOPWORDS:
+            topics.append(word)
+    topics.extend(m.strip() for m in _QUOTED_RE.findall(title or ''))
+    return list(dict.fromkeys(topics))
+
+
+def _clean_source(source):
+    """来源字段规范化：修复按 latin-1 误解码的 UTF-8 文本，去掉“来源：”前缀"""
+    return repair_mojibake(source or '').replace('来源：', '').strip() or '未知'
+
+
+def period_of(period, date):
+    """date 所在周期的 (起始日期, 结束日期, 标识)"""
+    day = date_cls.fromisoformat(date)
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=6)
+        year, week, _ = start.isocalendar()
+        return start.isoformat(), end.isoformat(), f'{year}-W{week:02d}'
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start.isoformat(), end.isoformat(), f'{start.year}-{start.month:02d}'
+
+
+def rollup_path(label):
+    return os.path.join(REPORTS_DIR, label[:4], f'rollup-{label}.json')
+
+
+def digest_path(label):
+    return os.path.join(REPORTS_DIR, label[:4], f'digest-{label}.md')
+
+
+def empty_rollup(period, start, end, label):
+    return {
+        'period': period,
+        'label': label,
+        'start': start,
+        'end': end,
+        'days': [],
+        'news': {'items': 0, 'duplicates': 0, 'sources': {}, 'topics': {}},
+        'trending': {'rows': 0, 'languages': {}, 'repos': {}},
+    }
+
+
+def load_rollup(period, label, start=None, end=None):
+    path = rollup_path(label)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"警告: 聚合文件损坏，重新开始: {path} ({e})")
+    return empty_rollup(period, start, end, label)
+
+
+def save_rollup(rollup):
+    path = rollup_path(rollup['label'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(rollup, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+    record_artifact(path)
+    return path
+
+
+def _prune(mapping, limit, key):
+    if len(mapping) > limit:
+        for name in sorted(mapping, key=key)[:len(mapping) - limit]:
+            del mapping[name]
+
+
+def fold_news(rollup, items):
+    """把一天的新闻折叠进聚合（每个话题每天最多计一次出现天数）"""
+    news = rollup['news']
+    day_topics = set()
+    for item in items:
+        if item.get('duplicate_of'):
+            news['duplicates'] += 1
+            continue
+        news['items'] += 1
+        source = _clean_source(item.get('source'))
+        news['sources'][source] = news['sources'].get(source, 0) + 1
+        for topic in extract_topics(item.get('title')):
+            entry = news['topics'].setdefault(topic, {'count': 0, 'days': 0})
+            entry['count'] += 1
+            if topic not in day_topics:
+                day_topics.add(topic)
+                entry['days'] += 1
+    _prune(news['topics'], MAX_TOPICS, key=lambda t: (news['topics'][t]['days'], news['topics'][t]['count']))
+
+
+def fold_trending(rollup, rows):
+    """把一天的热榜折叠进聚合"""
+    trending = rollup['trending']
+    seen = set()
+    for row in rows:
+        name = row['name']
+        if name in seen:
+            continue
+        seen.add(name)
+        trending['rows'] += 1
+        language = row.get('language') or 'Unknown'
+        trending['languages'][language] = trending['languages'].get(language, 0) + 1
+        entry = trending['repos'].get(name)
+        if entry is None:
+            entry = trending['repos'][name] = {
+                'days': 0, 'best_rank': row.get('rank') or 0,
+                'first_stars': row.get('stars', 0), 'last_stars': row.get('stars', 0),
+                'language': language, 'description': (row.get('description') or '')[:120],
+            }
+        entry['days'] += 1
+        if row.get('rank'):
+            entry['best_rank'] = min(entry['best_rank'] or row['rank'], row['rank'])
+        entry['last_stars'] = row.get('stars', entry['last_stars'])
+    repos = trending['repos']
+    _prune(repos, MAX_REPOS, key=lambda n: (repos[n]['days'], repos[n]['last_stars'] - repos[n]['first_stars']))
+
+
+def _load_news_items(date):
+    content = read_artifact('ai-news', date, '.json')
+    if not content:
+        return None
+    try:
+        return json.loads(content).get('items', [])
+    except ValueError:
+        print(f"警告: 新闻 JSON 解析失败: {date}")
+        return None
+
+
+def update_rollups(date):
+    """
+    把某一天的数据折叠进所在周、月的聚合（已折叠过的日期跳过，重复运行幂等）
+
+    Returns:
+        list[str]: 本次更新的聚合标识
+    """
+    pending = [(period,) + period_of(period, date) for period in PERIODS]
+    rollups = [load_rollup(period, label, start, end) for period, start, end, label in pending]
+    rollups = [r for r in rollups if date not in r['days']]
+    if not rollups:
+        return []
+
+    items = _load_news_items(date)
+    rows = load_trending_rows(date)
+    if items is None and not rows:
+        return []
+
+    for rollup in rollups:
+        fold_news(rollup, items or [])
+        fold_trending(rollup, rows or [])
+        rollup['days'] = sorted(rollup['days'] + [date])
+        save_rollup(rollup)
+    return [r['label'] for r in rollups]
+
+
+def compact_summary(rollup, top=10):
+    """把聚合压缩成交给大模型的精简文本"""
+    news, trending = rollup['news'], rollup['trending']
+    lines = [f"统计区间: {rollup['start']} ~ {rollup['end']}（有数据 {len(rollup['days'])} 天）",
+             f"AI 快讯: {news['items']} 条（另有 {news['duplicates']} 条重复报道）"]
+
+    sources = sorted(news['sources'].items(), key=lambda kv: -kv[1])[:5]
+    if sources:
+        lines.append("主要来源: " + '、'.join(f"{s}({n})" for s, n in sources))
+
+    topics = sorted(news['topics'].items(), key=lambda kv: (-kv[1]['days'], -kv[1]['count'], kv[0]))[:top]
+    if topics:
+        lines.append("反复出现的话题: " + '、'.join(f"{t}({v['days']}天/{v['count']}次)" for t, v in topics))
+
+    lines.append(f"GitHub Trending: {trending['rows']} 条上榜记录，{len(trending['repos'])} 个仓库")
+    languages = sorted(trending['languages'].items(), key=lambda kv: -kv[1])[:5]
+    if languages:
+        total = sum(trending['languages'].values())
+        lines.append("语言分布: " + '、'.join(f"{lang} {n / total:.0%}" for lang, n in languages))
+
+    repos = sorted(trending['repos'].items(),
+                   key=lambda kv: (-kv[1]['days'], -(kv[1]['last_stars'] - kv[1]['first_stars']), kv[0]))[:top]
+    if repos:
+        lines.append("在榜最久的仓库:")
+        for name, r in repos:
+            gain = r['last_stars'] - r['first_stars']
+            desc = f" - {r['description']}" if r['description'] else ''
+            lines.append(f"- {name} [{r['language']}] 在榜 {r['days']} 天，最高第 {r['best_rank']} 名，"
+                         f"星标 +{gain:,}{desc}")
+    return '\n'.join(lines)
+
+
+def render_digest(rollup, commentary=None):
+    """生成周期回顾 markdown（统计 + 可选的 AI 点评），不超过企业微信消息上限"""
+    title = '周报' if rollup['period'] == 'week' else '月报'
+    content = f"# AI 与开源{title} {rollup['label']}\n\n"
+    if commentary:
+        content += commentary.strip() + "\n\n---\n\n"
+    content += compact_summary(rollup) + "\n"
+    encoded = content.encode('utf-8')
+    if len(encoded) > MAX_MESSAGE_BYTES:
+        content = encoded[:MAX_MESSAGE_BYTES].decode('utf-8', errors='ignore') + "\n\n... (更多内容请查看仓库)"
+    return content
+
+
+def publish_digest(period, today, notify=True):
+    """
+    为上一个完整周期生成回顾并推送（回顾已存在则跳过）
+
+    Returns:
+        str: 回顾文件路径，跳过时返回 None
+    """
+    _, _, label = period_bounds(period, today)
+    path = digest_path(label)
+    if os.path.exists(path) or not os.path.exists(rollup_path(label)):
+        return None
+
+    rollup = load_rollup(period, label)
+    if not rollup['days']:
+        return None
+
+    prompt = get_rollup_digest_prompt(compact_summary(rollup), PERIOD_NAMES[period])
+    commentary = chat_completion([{'role': 'user', 'content': prompt}], max_tokens=1000, timeout=60)
+    content = render_digest(rollup, commentary)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    record_artifact(path)
+
+    webhook_url = get_webhook_url()
+    if notify and webhook_url:
+        if send_wecom_message(webhook_url, content):
+            print(f"✓ {PERIOD_NAMES[period]}回顾已发送到企业微信")
+    return path
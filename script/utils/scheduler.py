@@ -0,0 +1,184 @@
+# coding:utf-8
+
+"""
+进程内 cron 调度器
+支持标准 5 段 cron 表达式（分 时 日 月 周），每个任务在独立线程中运行；
+同一任务上一次尚未结束时跳过本次触发，收到 SIGINT/SIGTERM 后等待运行中的任务完成再退出
+"""
+
+import signal
+import threading
+from datetime import datetime, timedelta
+
+
+# (最小值, 最大值)
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_field(text, low, high):
+    """解析单个 cron 字段，返回允许值集合"""
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"无效的步长: {text}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(x) for x in part.split('-', 1))
+        else:
+            start = int(part)
+            # 'a/n' 表示从 a 开始每 n 个
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron 字段超出范围: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """5 段 cron 表达式，例如 '*/30 * * * *'、'0 2 * * 1-5'"""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式必须为 5 段: {expression}")
+        self.expression = expression
+        # 周字段允许用 7 表示周日
+        fields[4] = ','.join('0' if p == '7' else p for p in fields[4].split(','))
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES))
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7  # cron 中 0 为周日
+        in_days = dt.day in self.days
+        in_weekdays = weekday in self.weekdays
+        # 与标准 cron 一致：日、周同时受限时任一满足即可
+        if not self._any_day and not self._any_weekday:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def matches(self, dt):
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt):
+        """返回严格晚于 dt 的下一个触发时间（精确到分钟）"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 最多向后搜索 4 年（覆盖 2 月 29 日这类表达式）
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                month = candidate.month + 1
+                year = candidate.year + (month > 12)
+                candidate = candidate.replace(year=year, month=(month - 1) % 12 + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron 表达式没有可用的触发时间: {self.expression}")
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}')"
+
+
+class ScheduledJob:
+    def __init__(self, name, cron, func):
+        self.name = name
+        self.cron = cron if isinstance(cron, CronExpression) else CronExpression(cron)
+        self.func = func
+        self.lock = threading.Lock()
+        self.next_run = None
+
+
+class Scheduler:
+    """
+    常驻调度器
+
+    用法:
+        scheduler = Scheduler()
+        scheduler.add('ai-news', '*/30 * * * *', job)
+        scheduler.run_forever()
+    """
+
+    def __init__(self, clock=datetime.now):
+        self.jobs = []
+        self.clock = clock
+        self.stop_event = threading.Event()
+        self._threads = []
+
+    def add(self, name, cron, func):
+        self.jobs.append(ScheduledJob(name, cron, func))
+
+    def _run(self, job):
+        try:
+            print(f"\n[{self.clock().strftime('%Y-%m-%d %H:%M:%S')}] 开始执行: {job.name}")
+            job.func()
+            print(f"[{self.clock().strftime('%Y-%m-%d %H:%M:%S')}] 执行完成: {job.name}")
+        except Exception as e:
+            print(f"错误: 任务 {job.name} 执行异常: {str(e)}")
+        finally:
+            job.lock.release()
+
+    def trigger(self, job):
+        """在后台线程中运行任务；上一次尚未结束时跳过（防止重叠）"""
+        if not job.lock.acquire(blocking=False):
+            print(f"⚠ 任务 {job.name} 上一次尚未结束，跳过本次触发")
+            return None
+        thread = threading.Thread(target=self._run, args=(job,), name=f'job-{job.name}', daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()]
+        self._threads.append(thread)
+        thread.start()
+        return thread
+
+    def run_pending(self, now=None):
+        """触发所有到期任务，返回本次触发的任务名"""
+        now = now or self.clock()
+        triggered = []
+        for job in self.jobs:
+            if job.next_run is None:
+                job.next_run = job.cron.next_after(now)
+            elif job.next_run <= now:
+                job.next_run = job.cron.next_after(now)
+                if self.trigger(job):
+                    triggered.append(job.name)
+        return triggered
+
+    def install_signal_handlers(self):
+        def _handler(signum, frame):
+            print(f"\n收到信号 {signum}，等待运行中的任务结束后退出...")
+            self.stop_event.set()
+        signal.signal(signal.SIGINT, _handler)
+        signal.signal(signal.SIGTERM, _handler)
+
+    def run_forever(self, shutdown_timeout=600):
+        """主循环：睡眠到最近的触发时间，直到收到停止信号"""
+        if not self.jobs:
+            print("没有可调度的任务")
+            return
+        self.run_pending()
+        for job in self.jobs:
+            print(f"  - {job.name}: {job.cron.expression}（下次 {job.next_run.strftime('%Y-%m-%d %H:%M')}）")
+
+        while not self.stop_event.is_set():
+            now = self.clock()
+            wake_at = min(job.next_run for job in self.jobs)
+            self.stop_event.wait(max(0.0, min((wake_at - now).total_seconds(), 60.0)))
+            if not self.stop_event.is_set():
+                self.run_pending()
+
+        for thread in self._threads:
+            thread.join(timeout=shutdown_timeout)
+        print("调度器已停止")
@@ -0,0 +1,251 @@
+# coding:utf-8
+
+"""
+全文检索模块
+用 SQLite FTS5 为历史 AI 新闻与 Trending 分析报告建立倒排索引。
+中文按二元组切分、英文按单词切分后写入 FTS 表；按产物内容摘要增量更新，
+只重新检查最近几天的文件，更早的日期只补索引尚未索引过的
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from .storage import CACHE_DIR, list_dates, read_artifact
+
+
+DB_FILE = os.path.join(CACHE_DIR, 'search.sqlite')
+
+# (文档类别, 产物类别, 文件后缀)
+SOURCES = (
+    ('ai-news', 'ai-news', '.json'),
+    ('analysis', 'github-trending', '-analysis.md'),
+)
+
+_CJK = '㐀-䶿一-鿿豈-﫿'
+_TOKEN_RE = re.compile(rf'[{_CJK}]+|[a-z0-9]+(?:[.\-_][a-z0-9]+)*')
+_CJK_RE = re.compile(rf'^[{_CJK}]+$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    source_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    date TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_source ON documents(source_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, body, tokenize='unicode61');
+CREATE TABLE IF NOT EXISTS sources (
+    source_key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+"""
+
+
+def _terms(text):
+    """切分出检索词：中文连续片段、英文/数字单词"""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def _bigrams(run):
+    return [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text):
+    """把文本转换成空格分隔的索引词序列（中文二元组 + 英文单词）"""
+    tokens = []
+    for term in _terms(text):
+        tokens.extend(_bigrams(term) if _CJK_RE.match(term) else [term])
+    return ' '.join(tokens)
+
+
+def build_match_query(query):
+    """把用户查询转换成 FTS5 MATCH 表达式：中文片段作为二元组短语，各检索词之间为 AND"""
+    parts = []
+    for term in _terms(query):
+        if _CJK_RE.match(term):
+            parts.append('"' + ' '.join(_bigrams(term)) + '"')
+        else:
+            parts.append(f'"{term}"')
+    return ' '.join(parts)
+
+
+def connect(path=None):
+    path = path or DB_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _documents_for(kind, date, content):
+    """把一个产物拆成若干检索文档 (title, url, body)"""
+    if kind == 'ai-news':
+        try:
+            items = json.loads(content).get('items', [])
+        except ValueError:
+            return []
+        return [(item.get('title', ''), item.get('url', ''),
+                 f"{item.get('content', '')} 来源：{item.get('source', '')}")
+                for item in items if not item.get('duplicate_of')]
+
+    # 分析报告按二级/三级标题拆成小节，命中更精确
+    docs = []
+    title, lines = f'GitHub Trending 分析 {date}', []
+    for line in content.splitlines():
+        heading = re.match(r'^#{2,3}\s+(.*)', line)
+        if heading:
+            if ''.join(lines).strip():
+                docs.append((title, '', '\n'.join(lines).strip()))
+            title, lines = f'{heading.group(1).strip()} ({date})', []
+        else:
+            lines.append(line)
+    if ''.join(lines).strip():
+        docs.append((title, '', '\n'.join(lines).strip()))
+    return docs
+
+
+def index_artifact(conn, kind, artifact_kind, suffix, date):
+    """
+    索引一个产物；内容摘要未变化时直接跳过
+
+    Returns:
+        int: 新写入的文档数（跳过或不存在时为 0）
+    """
+    content = read_artifact(artifact_kind, date, suffix)
+    if content is None:
+        return 0
+    source_key = f'{kind}:{date}'
+    digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    row = conn.execute('SELECT digest FROM sources WHERE source_key = ?', (source_key,)).fetchone()
+    if row and row[0] == digest:
+        return 0
+
+    old_ids = [r[0] for r in conn.execute('SELECT id FROM documents WHERE source_key = ?', (source_key,))]
+    if old_ids:
+        conn.executemany('DELETE FROM documents_fts WHERE rowid = ?', [(i,) for i in old_ids])
+        conn.execute('DELETE FROM documents WHERE source_key = ?', (source_key,))
+
+    docs = _documents_for(kind, date, content)
+    for title, url, body in docs:
+        cursor = conn.execute(
+            'INSERT INTO documents (source_key, kind, date, title, url, body) VALUES (?, ?, ?, ?, ?, ?)',
+            (source_key, kind, date, title, url, body))
+        conn.execute('INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)',
+                     (cursor.lastrowid, tokenize(title), tokenize(body)))
+    conn.execute('INSERT OR REPLACE INTO sources (source_key, digest) VALUES (?, ?)', (source_key, digest))
+    return len(docs)
+
+
+def update_index(dates=None, path=None, since=None):
+    """
+    增量更新索引
+
+    Args:
+        dates: 要索引的日期列表，None 表示扫描全部归档（首次构建）
+        since: 扫描全部归档时，只重新检查该日期（YYYY-MM-DD）及之后的产物，
+               更早的日期只补上从未索引过的（例如补跑或迟到的归档）
+
+    Returns:
+        int: 新写入的文档数
+    """
+    conn = connect(path)
+    total = 0
+    try:
+        with conn:
+            indexed = {r[0] for r in conn.execute('SELECT source_key FROM sources')}
+            for kind, artifact_kind, suffix in SOURCES:
+                for date in (dates if dates is not None else list_dates(artifact_kind, suffix)):
+                    if dates is None and since and date < since and f'{kind}:{date}' in indexed:
+                        continue
+                    total += index_artifact(conn, kind, artifact_kind, suffix, date)
+    finally:
+        conn.close()
+    return total
+
+
+def _snippet(body, query, width=40):
+    """从原文中截取首个命中词附近的片段，命中词用【】标出"""
+    lowered = body.lower()
+    terms = sorted(set(_terms(query)), key=len, reverse=True)
+    positions = [(lowered.find(t), t) for t in terms if lowered.find(t) >= 0]
+    if not positions:
+        return body[:width * 2].replace('\n', ' ')
+    pos, term = min(positions)
+    start = max(0, pos - width)
+    text = body[start:pos] + '【' + body[pos:pos + len(term)] + '】' + body[pos + len(term):pos + len(term) + width]
+    return ('…' if start > 0 else '') + text.replace('\n', ' ') + '…'
+
+
+def search(query, limit=10, kind=None, path=None):
+    """
+    检索历史产物
+
+    Args:
+        query: 查询语句（中英文均可，多个词之间为 AND）
+        limit: 返回条数
+        kind: 可选，'ai-news' 或 'analysis'
+
+    Returns:
+        list[dict]: 按相关度排序的结果，包含 kind, date, title, url, snippet, score
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    conn = connect(path)
+    try:
+        sql = ('SELECT d.kind, d.date, d.title, d.url, d.body, bm25(documents_fts, 2.0, 1.0) AS score '
+               'FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid '
+               'WHERE documents_fts MATCH ?')
+        params = [match]
+        if kind:
+            sql += ' AND d.kind = ?'
+            params.append(kind)
+        sql += ' ORDER BY score LIMIT ?'
+        params.append(limit)
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return [{'kind': k, 'date': d, 'title': t, 'url': u, 'snippet': _snippet(b, query), 'score': s}
+            for k, d, t, u, b, s in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AI 新闻与 Trending 分析全文检索')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='扫描全部归档（只索引变化的文件）')
+    update = sub.add_parser('update', help='索引指定日期（默认今天）')
+    update.add_argument('dates', nargs='*')
+    query = sub.add_parser('query', help='检索')
+    query.add_argument('text')
+    query.add_argument('-n', '--limit', type=int, default=10)
+    query.add_argument('-k', '--kind', choices=[s[0] for s in SOURCES])
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        print(f"✓ 写入 {update_index()} 个文档")
+    elif args.command == 'update':
+        dates = args.dates or [datetime.now().strftime('%Y-%m-%d')]
+        print(f"✓ 写入 {update_index(dates)} 个文档")
+    else:
+        start = time.perf_counter()
+        results = search(args.text, args.limit, args.kind)
+        elapsed = (time.perf_counter() - start) * 1000
+        for i, r in enumerate(results, 1):
+            print(f"{i}. [{r['kind']}] {r['date']} {r['title']}")
+            if r['url']:
+                print(f"   {r['url']}")
+            print(f"   {r['snippet']}")
+        print(f"\n共 {len(results)} 条结果，耗时 {elapsed:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
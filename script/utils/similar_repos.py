@@ -0,0 +1,261 @@
+# coding:utf-8
+
+"""
+往期热榜相似项目检索
+把每个上过榜的仓库（名称、描述、topics、语言）哈希成定长词频向量，保存在 .cache/similar/ 下并按天增量更新；
+检索时按全量文档频率加权 IDF，用 NumPy 矩阵乘法做暴力余弦检索，毫秒级找出与今天项目相似的往期仓库
+"""
+
+import json
+import os
+import re
+import zlib
+from datetime import date as date_cls
+
+import numpy as np
+
+from .search_index import tokenize
+from .storage import CACHE_DIR, list_dates
+from .trending_records import load_trending_rows
+
+
+INDEX_DIR = os.path.join(CACHE_DIR, 'similar')
+# 哈希桶数（特征维度）；修改后索引会自动重建
+DIM = 2048
+INDEX_VERSION = 1
+
+TOP_K = 3
+MIN_SCORE = 0.25
+SECTION_LIMIT = 8
+
+
+def repo_text(row):
+    """参与向量化的文本：仓库名拆词、描述、topics、语言"""
+    name = re.sub(r'[-_./]+', ' ', row['name'])
+    topics = ' '.join(t.replace('-', ' ') for t in row.get('topics') or [])
+    return f"{name} {row.get('description') or ''} {topics}"
+
+
+def vectorize(row):
+    """
+    带符号的哈希词频向量（次线性词频），语言作为单独特征
+
+    Returns:
+        ndarray[float32]: 长度为 DIM，未归一化
+    """
+    terms = tokenize(repo_text(row)).split()
+    if row.get('language'):
+        terms.append('lang:' + row['language'].lower())
+    vector = np.zeros(DIM, dtype=np.float32)
+    if not terms:
+        return vector
+    hashes = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in terms), dtype=np.uint32, count=len(terms))
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes % DIM).astype(np.intp), signs)
+    return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+class SimilarIndex:
+    """
+    仓库向量索引
+
+    Attributes:
+        names: 仓库名列表，与 vectors 的行一一对应
+        repos: 仓库名 -> {first_seen, last_seen, text}
+        dates: 已索引的日期
+        vectors: float32 矩阵 (len(names), DIM)，未加权的词频向量
+        df: 各特征的文档频率
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or INDEX_DIR
+        self.names = []
+        self.repos = {}
+        self.dates = set()
+        self.vectors = np.zeros((0, DIM), dtype=np.float32)
+        self.df = np.zeros(DIM, dtype=np.int64)
+        self._weighted = None
+        self._load()
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.directory, 'vectors.npy')
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            vectors = np.load(self.vectors_path)
+        except (OSError, ValueError) as e:
+            print(f"警告: 相似项目索引损坏，重新构建: {e}")
+            return
+        if meta.get('version') != INDEX_VERSION or meta.get('dim') != DIM or len(vectors) != len(meta['names']):
+            return
+        self.names = meta['names']
+        self.repos = meta['repos']
+        self.dates = set(meta['dates'])
+        self.vectors = vectors
+        self.df = np.count_nonzero(vectors, axis=0).astype(np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, date, rows):
+        """
+        索引某天的热榜行：新仓库追加一行向量，描述/topics 变化的仓库替换原向量
+
+        Returns:
+            int: 新增或更新的向量数
+        """
+        rows = [row for row in rows or [] if row.get('name')]
+        if not rows:
+            return 0
+        positions = {name: i for i, name in enumerate(self.names)}
+        appended = []
+        changed = 0
+        for row in rows:
+            name, text = row['name'], repo_text(row)
+            repo = self.repos.get(name)
+            if repo is None:
+                self.repos[name] = {'first_seen': date, 'last_seen': date, 'text': text}
+                positions[name] = len(self.names)
+                self.names.append(name)
+                appended.append(vectorize(row))
+                changed += 1
+                continue
+            repo['first_seen'] = min(repo['first_seen'], date)
+            repo['last_seen'] = max(repo['last_seen'], date)
+            if repo['text'] != text and date >= repo['last_seen']:
+                i = positions[name]
+                if i < len(self.vectors):
+                    self.df -= self.vectors[i] != 0
+                    self.vectors[i] = vectorize(row)
+                    self.df += self.vectors[i] != 0
+                else:
+                    appended[i - len(self.vectors)] = vectorize(row)
+                repo['text'] = text
+                changed += 1
+        if appended:
+            block = np.vstack(appended)
+            self.vectors = np.vstack([self.vectors, block])
+            self.df += np.count_nonzero(block, axis=0)
+        self.dates.add(date)
+        self._weighted = None
+        return changed
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.vectors_path + '.tmp.npy'
+        np.save(tmp, self.vectors)
+        os.replace(tmp, self.vectors_path)
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'dim': DIM, 'names': self.names, 'repos': self.repos,
+                       'dates': sorted(self.dates)}, f, ensure_ascii=False)
+        os.replace(tmp, self.meta_path)
+
+    def _idf(self):
+        return (np.log((1 + len(self.names)) / (1 + self.df)) + 1.0).astype(np.float32)
+
+    def _normalize(self, matrix):
+        matrix = matrix * self._idf()
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def weighted(self):
+        """IDF 加权并 L2 归一化的索引矩阵（索引变化前复用）"""
+        if self._weighted is None:
+            self._weighted = self._normalize(self.vectors)
+        return self._weighted
+
+    def search(self, rows, k=TOP_K, before=None, min_score=MIN_SCORE):
+        """
+        为每个查询仓库找出最相似的若干个已索引仓库（排除自身）
+
+        Args:
+            rows: 查询的热榜行
+            before: 只返回首次上榜早于该日期的仓库（“往期”）
+            min_score: 余弦相似度下限
+
+        Returns:
+            list[list[dict]]: 与 rows 对应，每项为 name, score, first_seen, last_seen（按相似度降序）
+        """
+        if not rows or not self.names:
+            return [[] for _ in rows or []]
+        queries = self._normalize(np.vstack([vectorize(row) for row in rows]))
+        scores = queries @ self.weighted().T
+        if before is not None:
+            past = np.fromiter((self.repos[name]['first_seen'] < before for name in self.names),
+                               dtype=bool, count=len(self.names))
+            scores[:, ~past] = -1.0
+        positions = {name: i for i, name in enumerate(self.names)}
+        for q, row in enumerate(rows):
+            if row['name'] in positions:
+                scores[q, positions[row['name']]] = -1.0
+
+        k = min(k, len(self.names))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for q in range(len(rows)):
+            order = top[q][np.argsort(-scores[q, top[q]], kind='stable')]
+            results.append([{'name': self.names[i], 'score': round(float(scores[q, i]), 3),
+                             'first_seen': self.repos[self.names[i]]['first_seen'],
+                             'last_seen': self.repos[self.names[i]]['last_seen']}
+                            for i in order if scores[q, i] >= min_score])
+        return results
+
+
+def update_index(index, end=None):
+    """
+    把尚未索引的历史日期（截至 end，含）加入索引
+
+    Returns:
+        list[str]: 本次新索引的日期
+    """
+    dates = sorted(set(list_dates('github-trending', '.md', end=end)) |
+                   set(list_dates('github-trending', '.json', end=end)))
+    added = []
+    for date in dates:
+        if date in index.dates:
+            continue
+        index.add(date, load_trending_rows(date))
+        added.append(date)
+    return added
+
+
+def similar_today(date, rows, index=None, k=TOP_K):
+    """
+    索引截至昨天的历史后检索今天各项目的相似往期仓库，再把今天的热榜加入索引并保存
+
+    Returns:
+        list[list[dict]]: 与 rows 对应的检索结果
+    """
+    if index is None:
+        index = SimilarIndex()
+    yesterday = date_cls.fromordinal(date_cls.fromisoformat(date).toordinal() - 1).isoformat()
+    update_index(index, end=yesterday)
+    matches = index.search(rows, k=k, before=date)
+    index.add(date, rows)
+    index.save()
+    return matches
+
+
+def format_similar_section(rows, matches, limit=SECTION_LIMIT):
+    """生成“相似的往期热榜项目”markdown 小节（每个项目一行，没有相似项目时省略）"""
+    lines = []
+    for row, found in zip(rows, matches):
+        if not found:
+            continue
+        similar = '、'.join(f"{m['name']}（{m['score']:.2f}，{m['last_seen']}）" for m in found)
+        lines.append(f"- **{row['name']}** ↔ {similar}")
+        if len(lines) >= limit:
+            break
+    if not lines:
+        return ''
+    return '\n### 🧭 相似的往期热榜项目\n\n' + '\n'.join(lines) + '\n'
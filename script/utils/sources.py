@@ -0,0 +1,355 @@
+# coding:utf-8
+
+"""
+数据源插件框架
+插件只需声明 URL、提取规则、输出字段、调度与并发度；抓取（共享连接池 + 条件请求缓存）、
+解析、字段校验与按日存储由框架完成。插件放在 script/sources/ 下，自动发现
+
+示例:
+    class HackerNewsSource(Source):
+        SOURCE_ID = 'hackernews'
+        URLS = ['https://hn.algolia.com/api/v1/search?tags=front_page']
+        FORMAT = 'json'
+        EXTRACT = {'items': 'hits', 'fields': {'title': 'title', 'url': 'url', 'points': 'points'}}
+        SCHEMA = {'title': str, 'url': str, 'points': int}
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pyquery import PyQuery as pq
+
+from .deadline import bind_context
+from .http import hedged_get
+from .manifest import ROOT_DIR, record_artifact
+from .storage import CACHE_DIR, artifact_path
+
+
+SOURCES_DIR = os.path.join(ROOT_DIR, 'script', 'sources')
+SOURCE_CACHE_DIR = os.path.join(CACHE_DIR, 'sources')
+
+# 所有数据源共享的抓取线程数上限
+MAX_WORKERS = int(os.environ.get('SOURCES_WORKERS', '8'))
+
+
+class Source:
+    """
+    数据源插件基类
+
+    Attributes:
+        SOURCE_ID: 唯一标识，也是输出目录名 output/sources/{SOURCE_ID}/
+        URLS: URL 列表，可包含 {date} 占位符
+        FORMAT: 'html'、'json' 或 'xml'（RSS/Atom）
+        EXTRACT: {'items': 条目选择器或 JSON 路径, 'fields': {字段: 规则}}
+                 html/xml 规则为 CSS 选择器，或 {'css', 'attr', 'many'}；json 规则为点分路径，或 {'path', 'many'}
+        SCHEMA: {字段: 类型}，类型为 str / int / float / list
+        REQUIRED: 必填字段，缺失的条目丢弃
+        KEY: 去重字段，同一天多次抓取按该字段合并
+        SCHEDULE: 常驻模式下的 cron 表达式
+        CONCURRENCY: 本数据源同时进行的请求数
+        REQUEST_INTERVAL: 同一数据源两次请求之间的最小间隔（秒）
+        CACHE_TTL: 响应缓存有效期（秒），过期后用 ETag/Last-Modified 做条件请求
+    """
+
+    SOURCE_ID = ''
+    URLS = []
+    FORMAT = 'html'
+    EXTRACT = {}
+    SCHEMA = {}
+    REQUIRED = ('title', 'url')
+    KEY = 'url'
+    SCHEDULE = '0 * * * *'
+    CONCURRENCY = 2
+    REQUEST_INTERVAL = 0
+    CACHE_TTL = 600
+    HEADERS = {}
+    TIMEOUT = 15
+
+    def __init__(self):
+        self._semaphore = threading.Semaphore(self.CONCURRENCY)
+        self._last_request = 0.0
+        self._interval_lock = threading.Lock()
+
+    def urls(self, date):
+        return [url.format(date=date) for url in self.URLS]
+
+    def transform(self, item):
+        """单条记录的后处理钩子，返回 None 表示丢弃"""
+        return item
+
+    def __repr__(self):
+        return f"<Source {self.SOURCE_ID}>"
+
+
+# ---------- 抓取 ----------
+
+def _cache_file(source, url):
+    return os.path.join(SOURCE_CACHE_DIR, source.SOURCE_ID, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+
+def _load_cached(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _wait_interval(source):
+    if not source.REQUEST_INTERVAL:
+        return
+    with source._interval_lock:
+        delay = source._last_request + source.REQUEST_INTERVAL - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        source._last_request = time.monotonic()
+
+
+def fetch_url(source, url):
+    """
+    抓取 URL（带缓存）：缓存未过期直接返回；过期则发条件请求，304 时沿用缓存内容
+
+    Returns:
+        str: 响应正文，失败返回 None
+    """
+    path = _cache_file(source, url)
+    cached = _load_cached(path)
+    if cached and time.time() - cached['fetched_at'] < source.CACHE_TTL:
+        return cached['body']
+
+    headers = dict(source.HEADERS)
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    with source._semaphore:
+        _wait_interval(source)
+        try:
+            response = hedged_get(url, headers=headers, timeout=source.TIMEOUT)
+            if response.status_code == 304 and cached:
+                body = cached['body']
+            else:
+                response.raise_for_status()
+                if source.FORMAT == 'html' and response.encoding and response.encoding.lower() == 'iso-8859-1':
+                    response.encoding = response.apparent_encoding
+                body = response.text
+        except Exception as e:
+            print(f"[{source.SOURCE_ID}] 抓取失败 {url}: {str(e)}")
+            return cached['body'] if cached else None
+
+    # 304 可以不带校验头，此时沿用缓存里的，下次仍能发条件请求
+    cached = cached if response.status_code == 304 else {}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'fetched_at': time.time(), 'body': body,
+                   'etag': response.headers.get('ETag') or cached.get('etag'),
+                   'last_modified': response.headers.get('Last-Modified') or cached.get('last_modified')},
+                  f, ensure_ascii=False)
+    return body
+
+
+# ---------- 解析 ----------
+
+def _json_path(data, path):
+    for part in path.split('.') if path else []:
+        if isinstance(data, list):
+            try:
+                data = data[int(part)]
+            except (ValueError, IndexError):
+                return None
+        elif isinstance(data, dict):
+            data = data.get(part)
+        else:
+            return None
+    return data
+
+
+def _extract_json(body, spec):
+    data = json.loads(body)
+    items = []
+    for node in _json_path(data, spec.get('items', '')) or []:
+        item = {}
+        for field, rule in spec['fields'].items():
+            rule = rule if isinstance(rule, dict) else {'path': rule}
+            item[field] = _json_path(node, rule['path'])
+        items.append(item)
+    return items
+
+
+def _extract_markup(body, spec, fmt):
+    if fmt == 'xml':
+        doc = pq(body.encode('utf-8'), parser='xml').remove_namespaces()
+    else:
+        doc = pq(body)
+    items = []
+    for node in doc(spec['items']).items():
+        item = {}
+        for field, rule in spec['fields'].items():
+            rule = rule if isinstance(rule, dict) else {'css': rule}
+            targets = node.find(rule['css']) if rule.get('css') else node
+            values = [t.attr(rule['attr']) if rule.get('attr') else t.text() for t in targets.items()]
+            values = [v.strip() for v in values if v and v.strip()]
+            item[field] = values if rule.get('many') else (values[0] if values else None)
+        items.append(item)
+    return items
+
+
+def extract(source, body):
+    """按插件的提取规则解析响应正文，返回原始字段字典列表"""
+    if source.FORMAT == 'json':
+        return _extract_json(body, source.EXTRACT)
+    if source.FORMAT in ('html', 'xml'):
+        return _extract_markup(body, source.EXTRACT, source.FORMAT)
+    raise ValueError(f"[{source.SOURCE_ID}] 不支持的格式: {source.FORMAT}")
+
+
+_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def _coerce(value, kind):
+    if value is None:
+        return None
+    if kind is list:
+        return value if isinstance(value, list) else [value]
+    if isinstance(value, list):
+        value = ' '.join(str(v) for v in value)
+    if kind in (int, float):
+        if isinstance(value, (int, float)):
+            return kind(value)
+        match = _NUMBER_RE.search(str(value).replace(',', ''))
+        return kind(float(match.group())) if match else None
+    return str(value).strip()
+
+
+def coerce_item(item, schema, required):
+    """按 SCHEMA 转换字段类型，缺少必填字段时返回 None"""
+    result = {field: _coerce(item.get(field), kind) for field, kind in schema.items()}
+    for field, value in item.items():
+        result.setdefault(field, value)
+    if any(result.get(field) in (None, '', []) for field in required):
+        return None
+    return result
+
+
+def parse(source, body):
+    """提取 + 校验 + 插件后处理"""
+    items = []
+    for raw in extract(source, body):
+        item = coerce_item(raw, source.SCHEMA, source.REQUIRED)
+        if item is not None:
+            item = source.transform(item)
+        if item is not None:
+            items.append(item)
+    return items
+
+
+# ---------- 存储 ----------
+
+def source_kind(source):
+    return f'sources/{source.SOURCE_ID}'
+
+
+def save_items(source, date, items):
+    """
+    合并写入 output/sources/{SOURCE_ID}/{年}/{月}/{date}.json（同一天按 KEY 去重，保留首次抓到的顺序）
+
+    Returns:
+        int: 新增条目数
+    """
+    path = artifact_path(source_kind(source), date, '.json')
+    existing = []
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                existing = json.load(f).get('items', [])
+        except (OSError, ValueError):
+            existing = []
+    seen = {item.get(source.KEY) for item in existing}
+    new = []
+    for item in items:
+        key = item.get(source.KEY)
+        if key not in seen:
+            seen.add(key)
+            new.append(item)
+    if not new and os.path.exists(path):
+        return 0
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'source': source.SOURCE_ID, 'date': date, 'items': existing + new}, f,
+                  ensure_ascii=False, indent=2)
+    record_artifact(path)
+    return len(new)
+
+
+# ---------- 发现与运行 ----------
+
+def discover_sources(directory=None):
+    """加载 script/sources/ 下的全部插件；SOURCES_ENABLED（逗号分隔）可限定启用的数据源"""
+    directory = directory or SOURCES_DIR
+    enabled = {s.strip() for s in os.environ.get('SOURCES_ENABLED', '').split(',') if s.strip()}
+    sources = []
+    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        if not name.endswith('.py') or name.startswith('_'):
+            continue
+        try:
+            module = importlib.import_module(f'script.sources.{name[:-3]}')
+        except Exception as e:
+            print(f"错误: 加载数据源插件 {name} 失败: {str(e)}")
+            continue
+        for obj in vars(module).values():
+            if (isinstance(obj, type) and issubclass(obj, Source) and obj is not Source
+                    and obj.SOURCE_ID and obj.__module__ == module.__name__):
+                if not enabled or obj.SOURCE_ID in enabled:
+                    sources.append(obj())
+    return sources
+
+
+def _fetch_and_parse(source, url, fetch):
+    body = fetch(source, url)
+    if body is None:
+        return None
+    try:
+        return parse(source, body)
+    except Exception as e:
+        print(f"[{source.SOURCE_ID}] 解析失败 {url}: {str(e)}")
+        return None
+
+
+def run_sources(sources=None, date=None, max_workers=None, fetch=fetch_url):
+    """
+    并发运行数据源：所有 (数据源, URL) 共用一个线程池，每个数据源再受自身 CONCURRENCY 限制
+
+    Returns:
+        dict: SOURCE_ID -> {'items': 解析条数, 'new': 新增条数, 'failed': 失败 URL 数}
+    """
+    sources = discover_sources() if sources is None else sources
+    date = date or datetime.now().strftime('%Y-%m-%d')
+    if not sources:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS, thread_name_prefix='source') as executor:
+        task = bind_context(_fetch_and_parse)
+        futures = {source.SOURCE_ID: [executor.submit(task, source, url, fetch)
+                                      for url in source.urls(date)]
+                   for source in sources}
+
+    stats = {}
+    for source in sources:
+        results = [f.result() for f in futures[source.SOURCE_ID]]
+        items = [item for result in results if result for item in result]
+        new = save_items(source, date, items) if items else 0
+        stats[source.SOURCE_ID] = {'items': len(items), 'new': new,
+                                   'failed': sum(1 for r in results if r is None)}
+        print(f"[{source.SOURCE_ID}] 解析 {len(items)} 条，新增 {new} 条")
+    return stats
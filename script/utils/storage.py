@@ -0,0 +1,260 @@
+# coding:utf-8
+
+"""
+输出目录布局管理模块
+产物按 output/{类别}/{年}/{月}/{日期}{后缀} 分片存放，
+过去月份打包成 output/{类别}/{年}/{年-月}.zip（zip 中央目录即随机访问索引），
+并负责把历史遗留的错位文件迁移到正确位置
+"""
+
+import os
+import re
+import shutil
+import zipfile
+from datetime import datetime
+
+from .manifest import ROOT_DIR, batch, record_artifact, record_removal
+
+
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
+# 可重建的派生数据（索引、缓存），不提交到仓库
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache')
+
+KINDS = ('ai-news', 'github-trending')
+
+DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(.*)$')
+YEAR_RE = re.compile(r'^\d{4}$')
+BUNDLE_RE = re.compile(r'^(\d{4})-(\d{2})\.zip$')
+
+
+def _split_date(date):
+    """'2026-02-16' -> ('2026', '02')"""
+    return date[:4], date[5:7]
+
+
+def shard_dir(kind, date):
+    """日期所在的月分片目录"""
+    year, month = _split_date(date)
+    return os.path.join(OUTPUT_DIR, kind, year, month)
+
+
+def bundle_path(kind, year, month):
+    """月归档包路径"""
+    return os.path.join(OUTPUT_DIR, kind, year, f'{year}-{month}.zip')
+
+
+def artifact_path(kind, date, suffix, create=True):
+    """
+    获取产物的标准存放路径
+
+    Args:
+        kind: 产物类别，如 'ai-news'、'github-trending'
+        date: 日期字符串 YYYY-MM-DD
+        suffix: 文件后缀，如 '.json'、'-analysis.md'
+        create: 是否创建所在目录
+
+    Returns:
+        str: 绝对路径
+    """
+    directory = shard_dir(kind, date)
+    if create:
+        os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{date}{suffix}')
+
+
+def _legacy_paths(kind, date, suffix):
+    """旧布局下可能的路径（按年平铺、按类别平铺）"""
+    year, _ = _split_date(date)
+    name = f'{date}{suffix}'
+    return [
+        os.path.join(OUTPUT_DIR, kind, year, name),
+        os.path.join(OUTPUT_DIR, kind, name),
+    ]
+
+
+def find_artifact(kind, date, suffix):
+    """查找已存在的松散文件（新布局优先，其次旧布局），找不到返回 None"""
+    for path in [artifact_path(kind, date, suffix, create=False)] + _legacy_paths(kind, date, suffix):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_artifact(kind, date, suffix):
+    """
+    读取产物内容（先查松散文件，再查月归档包）
+
+    Returns:
+        str: 文件内容，不存在时返回 None
+    """
+    path = find_artifact(kind, date, suffix)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    year, month = _split_date(date)
+    bundle = bundle_path(kind, year, month)
+    if os.path.exists(bundle):
+        with zipfile.ZipFile(bundle) as zf:
+            try:
+                return zf.read(f'{date}{suffix}').decode('utf-8')
+            except KeyError:
+                return None
+    return None
+
+
+def list_dates(kind, suffix, start=None, end=None):
+    """
+    列出某类产物已有的日期（包括松散文件与归档包），按日期升序
+
+    Args:
+        start/end: 可选的闭区间边界 YYYY-MM-DD
+    """
+    dates = set()
+    kind_dir = os.path.join(OUTPUT_DIR, kind)
+    if not os.path.isdir(kind_dir):
+        return []
+
+    def _collect(names):
+        for name in names:
+            m = DATE_RE.match(name)
+            if m and m.group(4) == suffix:
+                dates.add(name[:10])
+
+    for root, dirs, files in os.walk(kind_dir):
+        _collect(files)
+        for name in files:
+            m = BUNDLE_RE.match(name)
+            if not m:
+                continue
+            month_key = f'{m.group(1)}-{m.group(2)}'
+            if (start and month_key < start[:7]) or (end and month_key > end[:7]):
+                continue
+            with zipfile.ZipFile(os.path.join(root, name)) as zf:
+                _collect(zf.namelist())
+
+    return sorted(d for d in dates if (not start or d >= start) and (not end or d <= end))
+
+
+def _move(src, dst):
+    """移动文件并登记到产物清单；目标已存在时相同则删除源文件，不同则保留不动"""
+    if os.path.exists(dst):
+        with open(src, 'rb') as a, open(dst, 'rb') as b:
+            identical = a.read() == b.read()
+        if not identical:
+            print(f"⚠ 跳过冲突文件（目标已存在且内容不同）: {src}")
+            return False
+        os.remove(src)
+    else:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.move(src, dst)
+        record_artifact(dst)
+    record_removal(src)
+    return True
+
+
+def relocate_misplaced():
+    """
+    把错位的产物迁移到月分片目录
+
+    覆盖以下情况：
+    - output/{类别}/{日期}.* （按类别平铺）
+    - output/{类别}/{年}/{日期}.* （按年平铺）
+    - 仓库根目录下的 {年}/ 目录（旧版分析脚本在工作目录中创建）
+
+    Returns:
+        int: 迁移的文件数
+    """
+    with batch():
+        moved = 0
+        for kind in KINDS:
+            kind_dir = os.path.join(OUTPUT_DIR, kind)
+            if not os.path.isdir(kind_dir):
+                continue
+            candidates = [kind_dir] + [os.path.join(kind_dir, d) for d in os.listdir(kind_dir) if YEAR_RE.match(d)]
+            for directory in candidates:
+                for name in sorted(os.listdir(directory)):
+                    src = os.path.join(directory, name)
+                    if os.path.isfile(src) and DATE_RE.match(name):
+                        date = name[:10]
+                        if _move(src, artifact_path(kind, date, name[10:])):
+                            moved += 1
+
+        # 根目录下的年份目录只会出现 trending 相关的 markdown
+        for year_dir in os.listdir(ROOT_DIR):
+            directory = os.path.join(ROOT_DIR, year_dir)
+            if not (YEAR_RE.match(year_dir) and os.path.isdir(directory)):
+                continue
+            for name in sorted(os.listdir(directory)):
+                src = os.path.join(directory, name)
+                if os.path.isfile(src) and DATE_RE.match(name) and name.endswith('.md'):
+                    if _move(src, artifact_path('github-trending', name[:10], name[10:])):
+                        moved += 1
+            if not os.listdir(directory):
+                os.rmdir(directory)
+
+    return moved
+
+
+def compact_month(kind, year, month):
+    """
+    把一个月的松散文件打包成 zip 归档并删除原文件
+
+    已有归档时追加新文件（同名文件以松散文件为准）
+
+    Returns:
+        int: 打包的文件数
+    """
+    directory = os.path.join(OUTPUT_DIR, kind, year, month)
+    if not os.path.isdir(directory):
+        return 0
+    names = sorted(n for n in os.listdir(directory) if DATE_RE.match(n))
+    if not names:
+        return 0
+
+    bundle = bundle_path(kind, year, month)
+    existing = {}
+    if os.path.exists(bundle):
+        with zipfile.ZipFile(bundle) as zf:
+            existing = {n: zf.read(n) for n in zf.namelist() if n not in names}
+
+    tmp_bundle = bundle + '.tmp'
+    with zipfile.ZipFile(tmp_bundle, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for name, data in sorted(existing.items()):
+            zf.writestr(name, data)
+        for name in names:
+            zf.write(os.path.join(directory, name), arcname=name)
+    os.replace(tmp_bundle, bundle)
+    with batch():
+        record_artifact(bundle)
+        for name in names:
+            path = os.path.join(directory, name)
+            os.remove(path)
+            record_removal(path)
+    if not os.listdir(directory):
+        os.rmdir(directory)
+    return len(names)
+
+
+def archive_kinds():
+    """需要按月打包的类别：固定类别加上 output/sources/ 下的各数据源"""
+    sources_dir = os.path.join(OUTPUT_DIR, 'sources')
+    plugins = sorted(os.listdir(sources_dir)) if os.path.isdir(sources_dir) else []
+    return KINDS + tuple(f'sources/{name}' for name in plugins
+                         if os.path.isdir(os.path.join(sources_dir, name)))
+
+
+def compact_archives(today=None):
+    """把当前月之前的所有月分片打包，返回打包的文件总数"""
+    current = (today or datetime.now().strftime('%Y-%m-%d'))[:7]
+    packed = 0
+    for kind in archive_kinds():
+        kind_dir = os.path.join(OUTPUT_DIR, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        for year in sorted(d for d in os.listdir(kind_dir) if YEAR_RE.match(d)):
+            year_dir = os.path.join(kind_dir, year)
+            for month in sorted(os.listdir(year_dir)):
+                if re.match(r'^\d{2}$', month) and f'{year}-{month}' < current:
+                    packed += compact_month(kind, year, month)
+    return packed
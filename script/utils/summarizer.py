@@ -0,0 +1,234 @@
+# coding:utf-8
+
+"""
+离线抽取式摘要
+句子切分后按中文二元组 + 英文单词建 TF-IDF 矩阵，用 NumPy 计算余弦相似度并做 TextRank 迭代，
+毫秒级得到最有代表性的句子/条目；大模型不可用时作为热榜速览与新闻摘要的降级方案，
+也用于在送入大模型前压缩长文本
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from .search_index import tokenize
+
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+# 与已选句子相似度超过该值时视为重复，不再选入
+REDUNDANCY = 0.6
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'is', 'are', 'be', 'by', 'as', 'at', 'it',
+    'this', 'that', 'from', 'your', 'you', 'we', 'our', 'its', 'can', 'will', 'into', 'using', 'use', 'based',
+}
+
+
+def split_sentences(text, min_length=6):
+    """按中英文句末标点与换行切分句子（英文句号后需跟空格）"""
+    sentences = []
+    for part in re.split(r'(?<=[。！？!?；;])|\n+|(?<=[.!?])\s+', text or ''):
+        part = part.strip()
+        if len(part) >= min_length:
+            sentences.append(part)
+    return sentences
+
+
+def _terms(text):
+    return [t for t in tokenize(text).split() if t not in STOPWORDS]
+
+
+def tfidf_matrix(documents):
+    """
+    文档 -> L2 归一化的 TF-IDF 矩阵
+
+    Returns:
+        (matrix, vocabulary): matrix[i, j] 为文档 i 中词 j 的权重
+    """
+    counts = [Counter(_terms(doc)) for doc in documents]
+    vocabulary = {}
+    for counter in counts:
+        for term in counter:
+            vocabulary.setdefault(term, len(vocabulary))
+    matrix = np.zeros((len(documents), len(vocabulary)))
+    for i, counter in enumerate(counts):
+        if counter:
+            idx = np.fromiter((vocabulary[t] for t in counter), dtype=np.int64, count=len(counter))
+            matrix[i, idx] = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+    df = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + df)) + 1.0
+    matrix = np.log1p(matrix) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix, vocabulary
+
+
+def textrank(similarity, damping=DAMPING):
+    """
+    在相似度图上做 PageRank 迭代
+
+    Returns:
+        ndarray: 各节点得分（和为 1）
+    """
+    n = len(similarity)
+    if n == 0:
+        return np.zeros(0)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0.0)
+    out = weights.sum(axis=1, keepdims=True)
+    # 孤立节点均匀连向所有节点
+    transition = np.where(out > 0, weights / np.where(out > 0, out, 1), 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def rank(documents, prior=None):
+    """
+    文档的代表性得分
+
+    Args:
+        prior: 可选的先验权重（如星标增速），与 TextRank 得分相乘
+
+    Returns:
+        (scores, similarity)
+    """
+    matrix, _ = tfidf_matrix(documents)
+    similarity = matrix @ matrix.T
+    scores = textrank(similarity)
+    if prior is not None:
+        prior = np.asarray(prior, dtype=np.float64)
+        scores = scores * (prior / prior.max() if prior.max() > 0 else 1.0)
+    return scores, similarity
+
+
+def select(documents, limit, max_chars=None, prior=None):
+    """
+    按得分挑选文档，跳过与已选文档高度相似的（冗余），返回按原顺序排列的下标
+    """
+    if not documents:
+        return []
+    scores, similarity = rank(documents, prior)
+    chosen, used = [], 0
+    for i in np.argsort(-scores, kind='stable'):
+        if len(chosen) >= limit:
+            break
+        if any(similarity[i, j] > REDUNDANCY for j in chosen):
+            continue
+        if max_chars is not None and chosen and used + len(documents[i]) > max_chars:
+            continue
+        chosen.append(int(i))
+        used += len(documents[i])
+    return sorted(chosen)
+
+
+def summarize(text, max_sentences=3, max_chars=None):
+    """抽取式摘要：按原文顺序返回最有代表性的若干句"""
+    sentences = split_sentences(text)
+    if len(sentences) <= 1:
+        return (text or '').strip()[:max_chars] if max_chars else (text or '').strip()
+    picked = select(sentences, max_sentences, max_chars)
+    summary = ''.join(s if re.search(r'[。！？!?；;.]$', s) else s + '。' for s in (sentences[i] for i in picked))
+    return summary[:max_chars] if max_chars else summary
+
+
+def compress_markdown(markdown, max_chars=300, max_sentences=3):
+    """
+    送入大模型前压缩 markdown：过长的正文段落与引用行换成抽取式摘要，
+    标题、列表项和表格行原样保留
+
+    Returns:
+        str: 压缩后的 markdown
+    """
+    out, paragraph = [], []
+
+    def flush():
+        if paragraph:
+            text = ' '.join(line.strip() for line in paragraph)
+            out.append(summarize(text, max_sentences, max_chars) if len(text) > max_chars else '\n'.join(paragraph))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        quote = re.match(r'^(\s*>\s?)(.*)$', line)
+        if quote:
+            flush()
+            body = quote.group(2)
+            out.append(quote.group(1) + (summarize(body, max_sentences, max_chars) if len(body) > max_chars else body))
+        elif not stripped or re.match(r'^(#|[-*+|]|\d+\.)', stripped):
+            flush()
+            out.append(line)
+        else:
+            paragraph.append(line)
+    flush()
+    return '\n'.join(out) + ('\n' if markdown.endswith('\n') else '')
+
+
+def top_terms(documents, limit=8):
+    """整体 TF-IDF 权重最高的词（用作主题关键词，中文为二元组）"""
+    matrix, vocabulary = tfidf_matrix(documents)
+    if not vocabulary:
+        return []
+    weights = matrix.sum(axis=0)
+    terms = list(vocabulary)
+    picked = []
+    for j in np.argsort(-weights, kind='stable'):
+        term = terms[j]
+        if len(term) < 2 or term.isdigit():
+            continue
+        picked.append(term)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def summarize_trending(rows, top=5):
+    """
+    热榜离线速览：语言分布、主题词，以及兼顾代表性与今日新增星标的若干仓库
+
+    Returns:
+        str: markdown
+    """
+    lines = ['# GitHub Trending 今日速览', '', '> AI 分析暂不可用，以下为离线摘要', '']
+    if not rows:
+        return '\n'.join(lines + ['今日没有热榜数据。']) + '\n'
+
+    languages = Counter(row.get('language') or 'Unknown' for row in rows)
+    lines.append('- 语言分布: ' + '、'.join(f"{lang} {count}" for lang, count in languages.most_common(5)))
+    documents = [f"{row['name'].split('/')[-1]} {row.get('description') or ''} {' '.join(row.get('topics') or [])}"
+                 for row in rows]
+    themes = top_terms(documents)
+    if themes:
+        lines.append('- 主题词: ' + '、'.join(themes))
+    lines += ['', '### 重点项目', '']
+
+    prior = np.log1p([row.get('stars_today') or 0 for row in rows]) + 1.0
+    for n, i in enumerate(select(documents, top, prior=prior), 1):
+        row = rows[i]
+        description = summarize(row.get('description') or '', max_sentences=1, max_chars=120)
+        stars = f"+{row['stars_today']:,}" if row.get('stars_today') else f"{row.get('stars') or 0:,}"
+        lines.append(f"{n}. **[{row['name']}]({row.get('url', '')})** ⭐ {stars}（{row.get('language') or 'Unknown'}）")
+        if description:
+            lines.append(f"   > {description}")
+    return '\n'.join(lines) + '\n'
+
+
+def summarize_news(items, limit=8):
+    """
+    新闻离线摘要：挑出最有代表性且互不重复的若干条
+
+    Returns:
+        list[dict]: 选中的条目（按原顺序），没有 summary 的条目补上一句话摘要
+    """
+    items = [item for item in items if not item.get('duplicate_of')]
+    documents = [f"{item.get('title', '')}。{item.get('content', '')}" for item in items]
+    # 已有模型摘要的条目保留原摘要
+    return [{**items[i], 'summary': items[i].get('summary') or summarize(items[i].get('content') or '', 1, 80)}
+            for i in select(documents, limit)]
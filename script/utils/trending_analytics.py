@@ -0,0 +1,270 @@
+# coding:utf-8
+
+"""
+Trending 历史分析模块
+把历史热榜加载成列式 NumPy 数组（日期、仓库、语言、星标、排名），
+向量化计算语言占比、星标中位数滚动窗口、在榜时长与留存曲线，并生成周报/月报
+"""
+
+import os
+from datetime import date as date_cls, timedelta
+
+import numpy as np
+
+from .manifest import record_artifact
+from .record_store import trending_store
+from .storage import OUTPUT_DIR, list_dates
+from .trending_records import load_trending_rows
+
+
+REPORTS_DIR = os.path.join(OUTPUT_DIR, 'reports')
+
+
+class TrendingHistory:
+    """
+    列式热榜历史
+
+    Attributes:
+        day: int32 日期序数（date.toordinal()）
+        repo / language: int32 编号，对应 repos / languages 词表
+        stars: int64 总星标
+        rank: int16 排名
+    """
+
+    def __init__(self, days, names, languages, stars, ranks):
+        self.day = np.asarray(days, dtype=np.int32)
+        repo_vocab, self.repo = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+        lang_vocab, self.language = np.unique(np.asarray(languages, dtype=object), return_inverse=True)
+        self.repos = list(repo_vocab)
+        self.languages = list(lang_vocab)
+        self.repo = self.repo.astype(np.int32)
+        self.language = self.language.astype(np.int32)
+        self.stars = np.asarray(stars, dtype=np.int64)
+        self.rank = np.asarray(ranks, dtype=np.int16)
+
+    def __len__(self):
+        return len(self.day)
+
+    def between(self, start, end):
+        """按日期闭区间筛选，返回新的 TrendingHistory"""
+        mask = (self.day >= date_cls.fromisoformat(start).toordinal()) & \
+               (self.day <= date_cls.fromisoformat(end).toordinal())
+        return TrendingHistory(self.day[mask], np.asarray(self.repos, dtype=object)[self.repo[mask]],
+                               np.asarray(self.languages, dtype=object)[self.language[mask]],
+                               self.stars[mask], self.rank[mask])
+
+
+def load_history(start=None, end=None, directory=None):
+    """
+    优先从记录存储加载（mmap，无需解析）；存储中缺少的日期（首次部署、缓存被清理后只追加了最近几天）
+    逐日回退到解析归档文件
+
+    Args:
+        directory: 记录存储目录，默认 .cache/records
+    """
+    days, names, languages, stars, ranks = [], [], [], [], []
+    stored = set()
+    with trending_store(directory) as store:
+        for record in store.iter_range(start, end):
+            ordinal = date_cls.fromisoformat(record.date).toordinal()
+            stored.add(ordinal)
+            days.append(ordinal)
+            names.append(record['name'])
+            languages.append(record['language'])
+            stars.append(record.raw('stars'))
+            ranks.append(record.raw('rank'))
+
+    dates = sorted(set(list_dates('github-trending', '.md', start, end)) |
+                   set(list_dates('github-trending', '.json', start, end)))
+    for date in dates:
+        ordinal = date_cls.fromisoformat(date).toordinal()
+        if ordinal in stored:
+            continue
+        for row in load_trending_rows(date) or []:
+            days.append(ordinal)
+            names.append(row['name'])
+            languages.append(row.get('language') or 'Unknown')
+            stars.append(row.get('stars', 0))
+            ranks.append(row.get('rank', 0))
+
+    return TrendingHistory(days, names, languages, stars, ranks)
+
+
+def period_keys(day, period):
+    """日期序数 -> 周期键（'week': ISO 周一的序数；'month': 年*12+月）"""
+    if period == 'week':
+        # 序数 1 (0001-01-01) 是周一
+        return day - (day - 1) % 7
+    if period == 'month':
+        # 按月需要日历换算，先对去重后的日期换算再映射回去
+        unique, inverse = np.unique(day, return_inverse=True)
+        months = np.array([(d.year * 12 + d.month - 1) for d in map(date_cls.fromordinal, unique.tolist())],
+                          dtype=np.int32)
+        return months[inverse]
+    raise ValueError(f"未知周期: {period}")
+
+
+def language_share(history, period='week'):
+    """
+    各周期的语言占比
+
+    Returns:
+        (periods, languages, share): share[i, j] 为第 i 个周期中语言 j 的占比
+    """
+    if len(history) == 0:
+        return np.zeros(0, dtype=np.int32), [], np.zeros((0, 0))
+    keys = period_keys(history.day, period)
+    periods, period_idx = np.unique(keys, return_inverse=True)
+    n_lang = len(history.languages)
+    counts = np.bincount(period_idx * n_lang + history.language,
+                         minlength=len(periods) * n_lang).reshape(len(periods), n_lang)
+    share = counts / counts.sum(axis=1, keepdims=True)
+    return periods, history.languages, share
+
+
+def daily_median_stars(history):
+    """
+    每天在榜仓库星标数的中位数（排序 + 分组边界定位，无逐日循环）
+
+    Returns:
+        (days, medians)
+    """
+    if len(history) == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0)
+    order = np.lexsort((history.stars, history.day))
+    day = history.day[order]
+    stars = history.stars[order].astype(np.float64)
+    days, starts, counts = np.unique(day, return_index=True, return_counts=True)
+    lower = stars[starts + (counts - 1) // 2]
+    upper = stars[starts + counts // 2]
+    return days, (lower + upper) / 2.0
+
+
+def rolling_mean(values, window):
+    """尾部对齐的滚动均值（窗口不足时按已有数据计算）"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return values
+    csum = np.cumsum(np.r_[0.0, values])
+    idx = np.arange(1, len(values) + 1)
+    lo = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[lo]) / (idx - lo)
+
+
+def days_on_list(history):
+    """每个仓库的在榜天数（同一天重复出现只计一次）与最长连续在榜天数"""
+    n_repo = len(history.repos)
+    if len(history) == 0:
+        return np.zeros(n_repo, dtype=np.int64), np.zeros(n_repo, dtype=np.int64)
+    pairs = np.unique(history.repo.astype(np.int64) << 32 | history.day.astype(np.int64))
+    repo = (pairs >> 32).astype(np.int64)
+    day = (pairs & 0xFFFFFFFF).astype(np.int64)
+    total = np.bincount(repo, minlength=n_repo)
+
+    # 连续段：与前一行同仓库且日期相差 1 天则延续
+    breaks = np.r_[True, (repo[1:] != repo[:-1]) | (day[1:] - day[:-1] != 1)]
+    run_id = np.cumsum(breaks) - 1
+    run_len = np.bincount(run_id)
+    run_repo = repo[breaks]
+    longest = np.zeros(n_repo, dtype=np.int64)
+    np.maximum.at(longest, run_repo, run_len)
+    return total, longest
+
+
+def retention_curve(history, max_days=14):
+    """留存曲线：curve[k-1] 为在榜至少 k 天的仓库占比"""
+    total, _ = days_on_list(history)
+    if len(total) == 0:
+        return np.zeros(max_days)
+    hist = np.bincount(np.minimum(total, max_days), minlength=max_days + 1)[1:]
+    at_least = np.cumsum(hist[::-1])[::-1]
+    return at_least / len(total)
+
+
+def period_bounds(period, today):
+    """上一个完整周期的 (起始日期, 结束日期, 报告标识)"""
+    today = date_cls.fromisoformat(today)
+    if period == 'week':
+        end = today - timedelta(days=today.weekday() + 1)
+        start = end - timedelta(days=6)
+        year, week, _ = start.isocalendar()
+        return start.isoformat(), end.isoformat(), f'{year}-W{week:02d}'
+    end = today.replace(day=1) - timedelta(days=1)
+    start = end.replace(day=1)
+    return start.isoformat(), end.isoformat(), f'{start.year}-{start.month:02d}'
+
+
+def report_path(label):
+    return os.path.join(REPORTS_DIR, label[:4], f'trending-{label}.md')
+
+
+def build_report(history, period, start, end, label, top=8):
+    """生成周期报告 markdown"""
+    current = history.between(start, end)
+    title = '周报' if period == 'week' else '月报'
+    lines = [f"# GitHub Trending {title} {label}", '', f"> 统计区间: {start} ~ {end}", '']
+    if len(current) == 0:
+        lines.append('本周期没有热榜数据。')
+        return '\n'.join(lines) + '\n'
+
+    n_days = len(np.unique(current.day))
+    lines += [f"- 热榜天数: {n_days}", f"- 上榜记录: {len(current)}", f"- 上榜仓库: {len(np.unique(current.repo))}", '']
+
+    # 语言占比（与上一周期对比）
+    span = date_cls.fromisoformat(end).toordinal() - date_cls.fromisoformat(start).toordinal() + 1
+    prev_start = date_cls.fromordinal(date_cls.fromisoformat(start).toordinal() - span).isoformat()
+    prev_end = date_cls.fromordinal(date_cls.fromisoformat(start).toordinal() - 1).isoformat()
+    prev = history.between(prev_start, prev_end)
+    counts = np.bincount(current.language, minlength=len(current.languages))
+    prev_share = {}
+    if len(prev):
+        prev_counts = np.bincount(prev.language, minlength=len(prev.languages))
+        prev_share = dict(zip(prev.languages, prev_counts / prev_counts.sum()))
+    lines += ['## 语言占比', '', '| 语言 | 占比 | 较上期 |', '|------|------|--------|']
+    share = counts / counts.sum()
+    for j in np.argsort(-share, kind='stable')[:top]:
+        lang = current.languages[j]
+        delta = share[j] - prev_share.get(lang, 0.0)
+        lines.append(f"| {lang} | {share[j]:.1%} | {delta:+.1%} |")
+    lines.append('')
+
+    # 星标中位数
+    days, medians = daily_median_stars(current)
+    lines += ['## 星标中位数', '',
+              f"- 区间中位数: {np.median(current.stars):,.0f}",
+              f"- 日中位数最高: {medians.max():,.0f}（{date_cls.fromordinal(int(days[medians.argmax()]))}）",
+              f"- 日中位数最低: {medians.min():,.0f}（{date_cls.fromordinal(int(days[medians.argmin()]))}）",
+              f"- 期末 7 日滚动均值: {rolling_mean(medians, 7)[-1]:,.0f}", '']
+
+    # 在榜时长
+    total, longest = days_on_list(current)
+    lines += ['## 在榜最久', '', '| 仓库 | 在榜天数 | 最长连续 |', '|------|----------|----------|']
+    for i in np.lexsort((-longest, -total))[:top]:
+        lines.append(f"| {current.repos[i]} | {total[i]} | {longest[i]} |")
+    lines.append('')
+
+    curve = retention_curve(current, max_days=min(n_days, 7))
+    lines += ['## 留存曲线', '', ' / '.join(f"≥{k + 1}天 {v:.0%}" for k, v in enumerate(curve)), '']
+    return '\n'.join(lines)
+
+
+def write_report(period, today, history=None):
+    """
+    生成上一个完整周期的报告（已存在则跳过）
+
+    Returns:
+        str: 报告路径，跳过时返回 None
+    """
+    start, end, label = period_bounds(period, today)
+    path = report_path(label)
+    if os.path.exists(path):
+        return None
+    if history is None:
+        # 多加载一个周期用于环比
+        history = load_history((date_cls.fromisoformat(start) - timedelta(days=31)).isoformat(), end)
+    content = build_report(history, period, start, end, label)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    record_artifact(path)
+    return path
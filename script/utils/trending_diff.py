@@ -0,0 +1,124 @@
+# coding:utf-8
+
+"""
+Trending 逐日对比
+用仓库名做哈希键，把今天的热榜与前 N 天线性比较：新上榜（首次 / 重新上榜）、跌出榜单、名次变化、连续在榜天数；
+对比结果保存为 {date}-diff.json，并生成日报、AI 分析与推送中的“榜单变化”小节
+"""
+
+import json
+from datetime import date as date_cls, timedelta
+
+from .manifest import record_artifact
+from .storage import artifact_path, read_artifact
+from .trending_records import load_trending_rows
+
+
+LOOKBACK_DAYS = 7
+SECTION_LIMIT = 5
+
+
+def load_previous(date, days=LOOKBACK_DAYS):
+    """前 N 天（由近到远）的 (日期, 热榜行) 列表，跳过没有数据的日期"""
+    day = date_cls.fromisoformat(date)
+    history = []
+    for offset in range(1, days + 1):
+        prev = (day - timedelta(days=offset)).isoformat()
+        rows = load_trending_rows(prev)
+        if rows:
+            history.append((prev, rows))
+    return history
+
+
+def compute_diff(date, rows, history):
+    """
+    计算今天与历史的差异
+
+    Args:
+        rows: 今天的热榜行（需包含 name, rank）
+        history: load_previous 的结果（由近到远）
+
+    Returns:
+        dict: date, previous（对比日期）, entered, exited, moved, streaks
+    """
+    today = {row['name']: row.get('rank', i + 1) for i, row in enumerate(rows)}
+    previous_date, previous_rows = history[0] if history else (None, [])
+    previous = {row['name']: row.get('rank', i + 1) for i, row in enumerate(previous_rows)}
+    seen_before = {row['name'] for _, day_rows in history for row in day_rows}
+
+    # 连续在榜：从今天向前，逐天保留仍在榜的仓库
+    streaks = dict.fromkeys(today, 1)
+    alive = set(today)
+    expected = date_cls.fromisoformat(date)
+    for day, day_rows in history:
+        expected -= timedelta(days=1)
+        # 中间缺一天数据时连续记录中断
+        if day != expected.isoformat():
+            break
+        alive &= {row['name'] for row in day_rows}
+        if not alive:
+            break
+        for name in alive:
+            streaks[name] += 1
+
+    entered = [{'name': name, 'rank': rank, 'returning': name in seen_before}
+               for name, rank in today.items() if name not in previous]
+    exited = [{'name': name, 'last_rank': rank} for name, rank in previous.items() if name not in today]
+    moved = [{'name': name, 'rank': rank, 'previous_rank': previous[name], 'delta': previous[name] - rank}
+             for name, rank in today.items() if name in previous and previous[name] != rank]
+    moved.sort(key=lambda m: (-abs(m['delta']), m['rank']))
+
+    return {
+        'date': date,
+        'previous': previous_date,
+        'entered': sorted(entered, key=lambda e: e['rank']),
+        'exited': sorted(exited, key=lambda e: e['last_rank']),
+        'moved': moved,
+        'streaks': {name: days for name, days in sorted(streaks.items(), key=lambda kv: (-kv[1], today[kv[0]]))},
+    }
+
+
+def write_diff(diff):
+    """保存为 output/github-trending/{年}/{月}/{date}-diff.json"""
+    path = artifact_path('github-trending', diff['date'], '-diff.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(diff, f, ensure_ascii=False, indent=2)
+    record_artifact(path)
+    return path
+
+
+def load_diff(date):
+    """读取某天的对比结果，不存在返回 None"""
+    raw = read_artifact('github-trending', date, '-diff.json')
+    return json.loads(raw) if raw else None
+
+
+def diff_today(date, rows, days=LOOKBACK_DAYS):
+    """计算并保存今天的对比结果"""
+    diff = compute_diff(date, rows, load_previous(date, days))
+    write_diff(diff)
+    return diff
+
+
+def format_diff_section(diff, limit=SECTION_LIMIT):
+    """生成“榜单变化”markdown 小节；没有前一天数据时返回空字符串"""
+    if not diff or not diff.get('previous'):
+        return ''
+    lines = [f"\n### 📈 榜单变化（对比 {diff['previous']}）\n"]
+    if diff['entered']:
+        lines.append('- 新上榜: ' + '、'.join(
+            f"{e['name']} #{e['rank']}{'（重新上榜）' if e['returning'] else ''}" for e in diff['entered'][:limit]))
+    if diff['exited']:
+        lines.append('- 跌出榜单: ' + '、'.join(f"{e['name']}（原 #{e['last_rank']}）" for e in diff['exited'][:limit]))
+    up = [m for m in diff['moved'] if m['delta'] > 0][:limit]
+    down = [m for m in diff['moved'] if m['delta'] < 0][:limit]
+    if up:
+        lines.append('- 排名上升: ' + '、'.join(f"{m['name']} ↑{m['delta']}（#{m['rank']}）" for m in up))
+    if down:
+        lines.append('- 排名下降: ' + '、'.join(f"{m['name']} ↓{-m['delta']}（#{m['rank']}）" for m in down))
+    streaks = [(name, days) for name, days in diff['streaks'].items() if days > 1][:limit]
+    if streaks:
+        lines.append('- 连续在榜: ' + '、'.join(f"{name} {days} 天" for name, days in streaks))
+    if len(lines) == 1:
+        lines.append('- 榜单与前一天相同')
+    return '\n'.join(lines) + '\n'
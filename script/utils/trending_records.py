@@ -0,0 +1,117 @@
+# coding:utf-8
+
+"""
+GitHub Trending 结构化记录
+把每日热榜解析成行记录（排名、仓库、描述、语言、星标），供历史查询和分析使用
+"""
+
+import json
+import re
+
+from .extraction import ExtractionSchema, SelectorSet, check_url
+from .storage import read_artifact
+
+
+ITEM_RE = re.compile(r'^(\d+)\.\s+\*\*\[(.+?)\]\((\S+?)\)\*\*\s*$')
+DESC_RE = re.compile(r'^\s+>\s?(.*)$')
+META_RE = re.compile(r'^\s+📦\s*(.*?)\s*⭐\s*(.*)$')
+
+
+def parse_stars(text):
+    """'19,375' / '1.2k' / '' -> int"""
+    text = (text or '').strip().lower().replace(',', '')
+    match = re.search(r'(\d+(?:\.\d+)?)\s*(k?)', text)
+    if not match:
+        return 0
+    value = float(match.group(1))
+    return int(value * 1000) if match.group(2) else int(value)
+
+
+def repo_name(url):
+    """'https://github.com/owner/repo' -> 'owner/repo'"""
+    return '/'.join(url.rstrip('/').split('/')[-2:])
+
+
+def _check_count(value):
+    return None if re.search(r'\d', value) else '不含数字'
+
+
+def _clean_trending_item(item):
+    # 'owner /\n repo' -> 'owner / repo'
+    item['title'] = ' '.join(item['title'].split())
+    return item
+
+
+TRENDING_PAGE_SCHEMA = ExtractionSchema(
+    name='github-trending',
+    version=1,
+    selector_sets=[
+        SelectorSet('box-row', items='div.Box article.Box-row', fields={
+            'title': '.lh-condensed a',
+            'href': ('.lh-condensed a', 'href'),
+            'description': 'p.col-9',
+            'language': "span[itemprop='programmingLanguage']",
+            'stars': "a[href*='/stargazers']",
+            'stars_today': 'span.d-inline-block.float-sm-right',
+        }),
+        SelectorSet('article', items='article', fields={
+            'title': 'h2 a',
+            'href': ('h2 a', 'href'),
+            'description': 'p',
+            'language': "[itemprop='programmingLanguage']",
+            'stars': "a[href$='/stargazers']",
+            'stars_today': 'span.float-sm-right',
+        }),
+    ],
+    required=('title', 'href', 'stars'),
+    min_items=10,
+    max_items=30,
+    checks={'href': check_url, 'stars': _check_count},
+    postprocess=_clean_trending_item,
+)
+
+
+def parse_trending_markdown(content):
+    """
+    解析 2.github-trending.py 生成的 markdown
+
+    Returns:
+        list[dict]: 每行包含 rank, name, url, description, language, stars
+    """
+    rows = []
+    current = None
+    for line in content.splitlines():
+        match = ITEM_RE.match(line)
+        if match:
+            current = {
+                'rank': int(match.group(1)),
+                'name': repo_name(match.group(3)),
+                'url': match.group(3),
+                'description': '',
+                'language': 'Unknown',
+                'stars': 0,
+            }
+            rows.append(current)
+            continue
+        if current is None:
+            continue
+        meta = META_RE.match(line)
+        if meta:
+            current['language'] = meta.group(1) or 'Unknown'
+            current['stars'] = parse_stars(meta.group(2))
+            continue
+        desc = DESC_RE.match(line)
+        if desc and not current['description']:
+            current['description'] = desc.group(1).strip()
+    return rows
+
+
+def load_trending_rows(date):
+    """读取某天的热榜行记录，优先使用结构化 JSON，否则解析 markdown；不存在返回 None"""
+    raw = read_artifact('github-trending', date, '.json')
+    if raw:
+        return json.loads(raw)['items']
+    content = read_artifact('github-trending', date, '.md')
+    if content is None:
+        return None
+    return parse_trending_markdown(content)
@@ -0,0 +1,193 @@
+# coding:utf-8
+
+"""
+Trending 快照时间序列
+每次抓取热榜时把各仓库的星标数追加为定长二进制记录（按年分文件，仓库名单独编号），
+用 NumPy 向量化计算每个仓库的星标增速（stars/小时）与加速度
+"""
+
+import os
+import time
+
+import numpy as np
+
+from .manifest import record_artifact
+from .storage import OUTPUT_DIR
+
+
+SNAPSHOT_DIR = os.path.join(OUTPUT_DIR, 'github-trending', 'snapshots')
+REPOS_FILE = os.path.join(SNAPSHOT_DIR, 'repos.txt')
+
+# 每条 18 字节：时间戳(秒) / 仓库编号 / 总星标 / 今日新增星标 / 排名
+SNAPSHOT_DTYPE = np.dtype([
+    ('ts', '<u4'),
+    ('repo', '<u4'),
+    ('stars', '<u4'),
+    ('stars_today', '<u4'),
+    ('rank', '<u2'),
+])
+
+
+def _snapshot_file(year):
+    return os.path.join(SNAPSHOT_DIR, f'{year}.bin')
+
+
+def load_repo_names(path=None):
+    path = path or REPOS_FILE
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f]
+
+
+def _repo_ids(names, path=None):
+    """为仓库分配稳定编号（repos.txt 的行号），新仓库追加到末尾"""
+    path = path or REPOS_FILE
+    known = load_repo_names(path)
+    ids = {name: i for i, name in enumerate(known)}
+    new = [name for name in dict.fromkeys(names) if name not in ids]
+    if new:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            for name in new:
+                ids[name] = len(ids)
+                f.write(name + '\n')
+        record_artifact(path)
+    return [ids[name] for name in names]
+
+
+def append_snapshot(rows, ts=None, directory=None):
+    """
+    追加一次热榜快照
+
+    Args:
+        rows: 热榜行记录，需包含 name, stars，可选 stars_today, rank
+        ts: 快照时间戳（秒），默认当前时间
+        directory: 快照目录，默认 output/github-trending/snapshots
+
+    Returns:
+        int: 写入的记录数
+    """
+    if not rows:
+        return 0
+    directory = directory or SNAPSHOT_DIR
+    ts = int(ts or time.time())
+    ids = _repo_ids([row['name'] for row in rows], os.path.join(directory, 'repos.txt'))
+
+    records = np.zeros(len(rows), dtype=SNAPSHOT_DTYPE)
+    records['ts'] = ts
+    records['repo'] = ids
+    records['stars'] = [row.get('stars', 0) for row in rows]
+    records['stars_today'] = [row.get('stars_today', 0) for row in rows]
+    records['rank'] = [row.get('rank', i + 1) for i, row in enumerate(rows)]
+
+    path = os.path.join(directory, f"{time.strftime('%Y', time.localtime(ts))}.bin")
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(records.tobytes())
+    record_artifact(path)
+    return len(rows)
+
+
+def load_snapshots(since_ts=None, directory=None):
+    """读取快照（可选起始时间），返回结构化数组"""
+    directory = directory or SNAPSHOT_DIR
+    if not os.path.isdir(directory):
+        return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+    first_year = time.localtime(since_ts).tm_year if since_ts else 0
+    parts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.bin') and name[:-4].isdigit() and int(name[:-4]) >= first_year:
+            parts.append(np.fromfile(os.path.join(directory, name), dtype=SNAPSHOT_DTYPE))
+    if not parts:
+        return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+    snapshots = np.concatenate(parts)
+    if since_ts:
+        snapshots = snapshots[snapshots['ts'] >= since_ts]
+    return snapshots
+
+
+def compute_velocity(snapshots):
+    """
+    向量化计算每个仓库最近一次的星标增速与加速度
+
+    Returns:
+        dict: repo(ndarray), stars, velocity(stars/小时), acceleration(stars/小时²), last_ts；
+              只有一次快照的仓库增速为 NaN
+    """
+    if len(snapshots) == 0:
+        empty = np.zeros(0)
+        return {'repo': empty.astype(np.uint32), 'stars': empty, 'velocity': empty,
+                'acceleration': empty, 'last_ts': empty}
+
+    order = np.lexsort((snapshots['ts'], snapshots['repo']))
+    s = snapshots[order]
+    repo = s['repo']
+    hours = s['ts'].astype(np.float64) / 3600.0
+    stars = s['stars'].astype(np.float64)
+
+    same = repo[1:] == repo[:-1]
+    dt = np.diff(hours)
+    valid = same & (dt > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # velocity[i] 表示第 i 与 i+1 条快照之间的增速
+        velocity = np.where(valid, np.diff(stars) / dt, np.nan)
+        acceleration = np.full_like(velocity, np.nan)
+        mid_dt = (dt[1:] + dt[:-1]) / 2.0
+        acceleration[1:] = np.where(valid[1:] & valid[:-1], np.diff(velocity) / mid_dt, np.nan)
+
+    # 每个仓库最后一条快照的位置
+    last = np.flatnonzero(np.r_[repo[1:] != repo[:-1], True])
+    prev = last - 1
+    has_prev = (prev >= 0) & np.r_[False, same][last]
+    repo_velocity = np.full(len(last), np.nan)
+    repo_acceleration = np.full(len(last), np.nan)
+    repo_velocity[has_prev] = velocity[prev[has_prev]]
+    repo_acceleration[has_prev] = acceleration[prev[has_prev]]
+
+    return {
+        'repo': repo[last],
+        'stars': stars[last],
+        'velocity': repo_velocity,
+        'acceleration': repo_acceleration,
+        'last_ts': s['ts'][last],
+    }
+
+
+def fastest_rising(window_hours=48, top=5, now=None, directory=None):
+    """
+    最近窗口内仍在榜的仓库中增速最快的若干个
+
+    Returns:
+        list[dict]: name, stars, velocity, acceleration（按增速降序）
+    """
+    now = int(now or time.time())
+    snapshots = load_snapshots(now - window_hours * 3600, directory)
+    if len(snapshots) == 0:
+        return []
+    result = compute_velocity(snapshots)
+    # 只看最新一次快照中仍在榜的仓库
+    current = result['last_ts'] == snapshots['ts'].max()
+    candidates = np.flatnonzero(current & np.isfinite(result['velocity']))
+    ranked = candidates[np.argsort(-result['velocity'][candidates], kind='stable')][:top]
+
+    names = load_repo_names(os.path.join(directory or SNAPSHOT_DIR, 'repos.txt'))
+    return [{
+        'name': names[result['repo'][i]],
+        'stars': int(result['stars'][i]),
+        'velocity': float(result['velocity'][i]),
+        'acceleration': float(result['acceleration'][i]),
+    } for i in ranked]
+
+
+def format_rising_section(rising):
+    """生成日报中的“上升最快”markdown 小节"""
+    if not rising:
+        return ''
+    lines = ['\n### 🚀 上升最快\n']
+    for i, item in enumerate(rising, 1):
+        trend = ''
+        if np.isfinite(item['acceleration']):
+            trend = ' ↗ 加速' if item['acceleration'] > 0 else ' ↘ 放缓'
+        lines.append(f"{i}. **{item['name']}** +{item['velocity']:.1f} ⭐/小时（总计 {item['stars']:,}）{trend}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,247 @@
+# coding:utf-8
+
+"""
+关注列表提醒
+把 watchlist.txt 中的关键词（厂商、模型、仓库，中英文均可）编译成一个 Aho-Corasick 自动机（文件不变时只编译一次），
+一趟扫描当天所有新闻标题/内容与热榜描述，命中的条目作为优先提醒单独推送到企业微信，
+扫描耗时只与文本长度有关，不随关键词数量增长
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+from .storage import CACHE_DIR, ROOT_DIR, read_artifact
+from .trending_records import load_trending_rows
+from .wecom import get_webhook_url, send_wecom_message
+
+
+WATCHLIST_FILE = os.environ.get('WATCHLIST_FILE', os.path.join(ROOT_DIR, 'watchlist.txt'))
+SENT_FILE = os.path.join(CACHE_DIR, 'watchlist-sent.json')
+# 已提醒记录保留天数
+SENT_KEEP_DAYS = 7
+MAX_ALERTS = 10
+
+
+def _is_word_char(ch):
+    return ch.isascii() and (ch.isalnum() or ch == '_')
+
+
+class AhoCorasick:
+    """
+    多模式匹配自动机（不区分大小写）
+
+    word_boundary=True 时纯 ASCII 的关键词要求两侧不是字母数字（避免 'ai' 命中 'said'），含中文的关键词不做边界限制
+    """
+
+    def __init__(self, keywords, word_boundary=True):
+        # goto[state]: 字符 -> 下一状态；output[state]: 在该状态结束的关键词编号
+        self.goto = [{}]
+        self.output = [[]]
+        self.keywords = []
+        for keyword in keywords:
+            pattern = keyword.strip().lower()
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.output.append([])
+                state = nxt
+            self.output[state].append(len(self.keywords))
+            ascii_word = word_boundary and all(_is_word_char(c) or c in ' -.' for c in pattern)
+            self.keywords.append((keyword.strip(), len(pattern), ascii_word))
+        self._build_failure()
+
+    def _build_failure(self):
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                # 合并后缀状态的输出，匹配时无需沿失败链回溯
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def finditer(self, text):
+        """返回 (起始位置, 关键词) 迭代器"""
+        lowered = text.lower()
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in output[state]:
+                keyword, length, ascii_word = self.keywords[index]
+                start = i - length + 1
+                if ascii_word and ((start > 0 and _is_word_char(lowered[start - 1])) or
+                                   (i + 1 < len(lowered) and _is_word_char(lowered[i + 1]))):
+                    continue
+                yield start, keyword
+
+    def search(self, text):
+        """命中的关键词（去重，按首次出现顺序）"""
+        return list(dict.fromkeys(keyword for _, keyword in self.finditer(text)))
+
+
+def parse_watchlist(text):
+    """
+    解析关注列表：每行一个关键词，'#' 开头为注释，'[分组]' 开始新分组
+
+    Returns:
+        dict: 关键词 -> 分组
+    """
+    groups, group = {}, '关注'
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            group = line[1:-1].strip() or group
+            continue
+        groups.setdefault(line, group)
+    return groups
+
+
+class Watchlist:
+    def __init__(self, groups):
+        self.groups = groups
+        self.matcher = AhoCorasick(groups)
+
+    def match(self, text):
+        """返回命中的 [(关键词, 分组)]"""
+        return [(keyword, self.groups[keyword]) for keyword in self.matcher.search(text)]
+
+
+_compiled = None
+_compiled_key = None
+_lock = threading.Lock()
+
+
+def load_watchlist(path=None):
+    """加载并编译关注列表；文件未变化时复用已编译的自动机（常驻模式下只编译一次）"""
+    global _compiled, _compiled_key
+    path = path or WATCHLIST_FILE
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _compiled_key != key:
+            with open(path, 'r', encoding='utf-8') as f:
+                _compiled = Watchlist(parse_watchlist(f.read()))
+            _compiled_key = key
+        return _compiled
+
+
+def scan(watchlist, news_items=(), trending_rows=()):
+    """
+    一趟扫描新闻与热榜
+
+    Returns:
+        list[dict]: kind('news'/'trending'), title, url, keywords[(关键词, 分组)]
+    """
+    hits = []
+    for item in news_items:
+        if item.get('duplicate_of'):
+            continue
+        matched = watchlist.match(f"{item.get('title', '')}\n{item.get('content', '')}")
+        if matched:
+            hits.append({'kind': 'news', 'title': item.get('title', ''), 'url': item.get('url', ''), 'keywords': matched})
+    for row in trending_rows:
+        matched = watchlist.match(f"{row.get('name', '')}\n{row.get('description', '')}\n{' '.join(row.get('topics') or [])}")
+        if matched:
+            hits.append({'kind': 'trending', 'title': row.get('name', ''), 'url': row.get('url', ''),
+                         'keywords': matched})
+    return hits
+
+
+def format_alert(date, hits):
+    """生成优先提醒的 markdown 消息"""
+    lines = [f'# <font color="warning">🔔 关注提醒</font> ({date})', '']
+    for hit in hits[:MAX_ALERTS]:
+        label = '新闻' if hit['kind'] == 'news' else '热榜'
+        keywords = '、'.join(f"{keyword}" for keyword, _ in hit['keywords'])
+        lines.append(f"> [{label}] [{hit['title']}]({hit['url']})")
+        lines.append(f"> 命中: <font color=\"info\">{keywords}</font>")
+        lines.append('')
+    if len(hits) > MAX_ALERTS:
+        lines.append(f"... 另有 {len(hits) - MAX_ALERTS} 条命中")
+    return '\n'.join(lines)
+
+
+class SentLog:
+    """已提醒的 URL（按日期保存，避免常驻模式下重复提醒）"""
+
+    def __init__(self, path=None):
+        self.path = path or SENT_FILE
+        self.days = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.days = json.load(f)
+            except (OSError, ValueError):
+                self.days = {}
+
+    def seen(self, url):
+        return any(url in urls for urls in self.days.values())
+
+    def add(self, date, urls):
+        self.days.setdefault(date, [])
+        self.days[date].extend(u for u in urls if u not in self.days[date])
+
+    def save(self):
+        for day in sorted(self.days)[:-SENT_KEEP_DAYS]:
+            del self.days[day]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.days, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def _load_news_items(date):
+    raw = read_artifact('ai-news', date, '.json')
+    return json.loads(raw).get('items', []) if raw else []
+
+
+def alert_today(date, watchlist=None, sent=None, send=send_wecom_message):
+    """
+    扫描当天的新闻与热榜，把尚未提醒过的命中条目推送到企业微信
+
+    Returns:
+        list[dict]: 本次推送的命中条目
+    """
+    watchlist = watchlist or load_watchlist()
+    if watchlist is None or not len(watchlist.matcher):
+        return []
+    sent = sent or SentLog()
+    hits = [hit for hit in scan(watchlist, _load_news_items(date), load_trending_rows(date) or [])
+            if hit['url'] and not sent.seen(hit['url'])]
+    if not hits:
+        return []
+
+    print(f"关注列表命中 {len(hits)} 条: " + '、'.join(hit['title'] for hit in hits[:5]))
+    webhook_url = os.environ.get('WATCHLIST_WEBHOOK_URL') or get_webhook_url()
+    if not webhook_url:
+        print("⚠ 未设置 WECOM_WEBHOOK_URL，跳过关注提醒推送")
+        return hits
+    if send(webhook_url, format_alert(date, hits)):
+        sent.add(date, [hit['url'] for hit in hits])
+        sent.save()
+        print("✓ 关注提醒已发送到企业微信")
+    return hits
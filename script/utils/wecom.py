@@ -0,0 +1,47 @@
+# coding:utf-8
+
+"""
+企业微信机器人
+通过 webhook 发送 markdown / markdown_v2 / text / news 消息（markdown 单条上限 4096 字节）
+"""
+
+import os
+
+from .deadline import DeadlineExceeded, stage_timeout
+from .http import get_session
+
+
+def get_webhook_url():
+    return os.environ.get('WECOM_WEBHOOK_URL')
+
+
+def get_msgtypes():
+    """推送使用的消息类型（WECOM_MSGTYPES，逗号分隔，默认 markdown）"""
+    value = os.environ.get('WECOM_MSGTYPES', 'markdown')
+    return [t.strip() for t in value.split(',') if t.strip()] or ['markdown']
+
+
+def send_wecom_message(webhook_url, content):
+    """发送 markdown 消息，成功返回 True"""
+    return send_wecom_payload(webhook_url, {'msgtype': 'markdown', 'markdown': {'content': content}})
+
+
+def send_wecom_payload(webhook_url, data):
+    """发送完整的消息体（{'msgtype': ..., <msgtype>: {...}}），成功返回 True"""
+    headers = {
+        'Content-Type': 'application/json'
+    }
+    try:
+        response = get_session().post(webhook_url, headers=headers, json=data, timeout=stage_timeout(10, minimum=2))
+        response.raise_for_status()
+        result = response.json()
+        if result['errcode'] != 0:
+            print(f"发送消息失败: {result['errmsg']}")
+            return False
+        return True
+    except DeadlineExceeded as e:
+        print(f"发送消息失败: 剩余时间不足 - {str(e)}")
+        return False
+    except Exception as e:
+        print(f"发送消息时发生错误: {str(e)}")
+        return False
@@ -0,0 +1,151 @@
+# coding:utf-8
+"""
+测试新闻原文抓取（正文提取、域名限速、robots.txt、条件请求缓存）
+"""
+
+import threading
+
+from script.utils import article_crawler
+from script.utils.article_crawler import ArticleCache, Crawler, HostLimiter, extract_article
+
+
+ARTICLE = """<html><head><title>站点标题</title><meta property="og:title" content="大模型发布"></head><body>
+<nav><a href="/">首页</a><a href="/ai">AI</a></nav>
+<div class="sidebar"><p>推荐阅读：这是一段很长的推荐阅读文字，里面有很多链接，不应该出现在正文里。</p></div>
+<div id="js_content" class="rich_media_content">
+  <p>今天，某公司发布了新一代大模型，在推理、编程和多模态方面都有显著提升，参数规模达到千亿。</p>
+  <p>据介绍，该模型采用混合专家架构，训练数据覆盖多种语言，并针对中文场景做了优化。</p>
+  <h2>性能表现</h2>
+  <ul><li><p>在多个基准测试中超过了上一代模型，尤其是在数学和代码任务上表现突出。</p></li></ul>
+</div>
+<div class="comment-list"><p>网友评论：太厉害了，期待开源，什么时候能用上呢，非常期待。</p></div>
+<footer>版权所有 © 2026</footer>
+<script>var tracking = "今天，某公司发布了新一代大模型，在推理、编程和多模态方面";</script>
+</body></html>"""
+
+
+def test_extract_article():
+    article = extract_article(ARTICLE)
+    assert article['title'] == '大模型发布'
+    assert article['text'].split('\n\n') == [
+        '今天，某公司发布了新一代大模型，在推理、编程和多模态方面都有显著提升，参数规模达到千亿。',
+        '据介绍，该模型采用混合专家架构，训练数据覆盖多种语言，并针对中文场景做了优化。',
+        '性能表现',
+        '在多个基准测试中超过了上一代模型，尤其是在数学和代码任务上表现突出。',
+    ]
+
+
+def test_extract_article_falls_back_to_description():
+    html = '<html><head><meta name="description" content="一句话简介"></head><body><p>短</p></body></html>'
+    assert extract_article(html) == {'title': '', 'text': '一句话简介'}
+    assert extract_article('') == {'title': '', 'text': ''}
+
+
+def test_interleave_by_host():
+    urls = ['https://a.com/1', 'https://a.com/2', 'https://a.com/3', 'https://b.com/1', 'https://c.com/1']
+    assert article_crawler.interleave_by_host(urls) == [
+        'https://a.com/1', 'https://b.com/1', 'https://c.com/1', 'https://a.com/2', 'https://a.com/3']
+
+
+def test_host_limiter_spaces_requests():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = HostLimiter(per_host=1, interval=1.0, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.acquire('a.com')
+        limiter.release('a.com')
+    limiter.acquire('b.com')
+    limiter.release('b.com')
+    assert sleeps == [1.0, 1.0]
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeWeb:
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        self.active = {}
+        self.max_active = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url, headers):
+        host = url.split('/')[2]
+        with self._lock:
+            self.requests.append((url, headers.get('If-None-Match')))
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+        try:
+            if url.endswith('/robots.txt'):
+                return FakeResponse(200, 'User-agent: *\nDisallow: /private/\n')
+            if url not in self.pages:
+                return FakeResponse(404)
+            etag = f'"{hash(self.pages[url]) & 0xffff}"'
+            if headers.get('If-None-Match') == etag:
+                return FakeResponse(304)
+            return FakeResponse(200, self.pages[url], {'ETag': etag})
+        finally:
+            with self._lock:
+                self.active[host] -= 1
+
+
+def test_crawl_streams_to_disk_and_revalidates(tmp_path):
+    now = [1000.0]
+    web = FakeWeb()
+    web.pages = {f'https://news.example.com/{i}': ARTICLE for i in range(6)}
+    web.pages['https://news.example.com/private/x'] = ARTICLE
+    cache = ArticleCache(str(tmp_path), clock=lambda: now[0])
+    crawler = Crawler(cache, web, HostLimiter(per_host=2, interval=0), max_workers=6)
+
+    urls = list(web.pages) + ['https://news.example.com/missing', 'not-a-url']
+    stats = crawler.crawl(urls)
+    assert stats == {'fetched': 6, 'disallowed': 1, 'failed': 1}
+    assert web.max_active['news.example.com'] <= 2
+
+    # 正文逐篇写在独立文件中，索引只保存元数据
+    url = 'https://news.example.com/0'
+    assert cache.text_path(url).startswith(str(tmp_path))
+    assert article_crawler.load_article(url, cache).startswith('今天，某公司发布了新一代大模型')
+    assert 'text' not in cache.entry(url) and cache.entry(url)['title'] == '大模型发布'
+    excerpt = article_crawler.article_excerpt(url, limit=60, cache=cache)
+    assert excerpt == '今天，某公司发布了新一代大模型，在推理、编程和多模态方面都有显著提升，参数规模达到千亿。'
+
+    # 有效期内不再请求；过期后发条件请求，304 沿用缓存
+    web.requests.clear()
+    reloaded = ArticleCache(str(tmp_path), clock=lambda: now[0])
+    assert Crawler(reloaded, web, HostLimiter(interval=0)).crawl([url]) == {'cached': 1}
+    now[0] += article_crawler.ARTICLE_TTL + 1
+    assert Crawler(reloaded, web, HostLimiter(interval=0)).crawl([url]) == {'not_modified': 1}
+    assert web.requests[-1][1] is not None
+
+
+def test_reader_sees_articles_crawled_by_another_cache(tmp_path):
+    reader = ArticleCache(str(tmp_path))
+    url = 'https://news.example.com/later'
+    assert reader.read(url) is None
+
+    web = FakeWeb()
+    web.pages = {url: ARTICLE}
+    # 常驻模式下后续任务用新的缓存实例抓取，先创建的读取方索引里没有这条
+    Crawler(ArticleCache(str(tmp_path)), web, HostLimiter(interval=0), respect_robots=False).crawl([url])
+    assert url not in reader.index
+    assert article_crawler.load_article(url, reader).startswith('今天，某公司发布了新一代大模型')
+
+
+def test_crawl_news_skips_duplicates(tmp_path):
+    web = FakeWeb()
+    web.pages = {'https://a.example.com/1': ARTICLE}
+    crawler = Crawler(ArticleCache(str(tmp_path)), web, HostLimiter(interval=0), respect_robots=False)
+    news = {'items': [{'url': 'https://a.example.com/1'},
+                      {'url': 'https://a.example.com/2', 'duplicate_of': 'https://a.example.com/1'}]}
+    assert article_crawler.crawl_news(news, crawler) == {'fetched': 1}
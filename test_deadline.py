@@ -0,0 +1,131 @@
+# coding:utf-8
+"""
+测试截止时间传递与对冲请求
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from script.utils import http
+from script.utils.deadline import (Deadline, DeadlineExceeded, bind_context, current_deadline, stage_timeout,
+                                   with_deadline)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timeout_is_capped_by_remaining_budget():
+    clock = FakeClock()
+    with Deadline(30, 'run', clock=clock):
+        assert stage_timeout(10) == 10
+        clock.now += 25
+        assert stage_timeout(10) == pytest.approx(5)
+        clock.now += 4.5
+        with pytest.raises(DeadlineExceeded):
+            stage_timeout(10)
+    # 退出后恢复为不限时
+    assert stage_timeout(10) == 10
+
+
+def test_child_reserves_time_for_later_stages():
+    clock = FakeClock()
+    run = Deadline(100, 'run', clock=clock)
+    assert run.child('analyze', seconds=240, reserve=30).remaining() == pytest.approx(70)
+    assert run.child('fetch', seconds=20).remaining() == pytest.approx(20)
+
+
+def test_context_propagates_to_worker_threads():
+    with Deadline(50, 'run'):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(bind_context(lambda: current_deadline().name)).result() == 'run'
+            # 不绑定时工作线程看不到调用方的截止时间
+            assert pool.submit(lambda: current_deadline().name).result() == 'unlimited'
+
+
+def test_with_deadline_wraps_each_run():
+    seen = []
+    job = with_deadline(lambda: seen.append(current_deadline().remaining()), 60, 'job')
+    job()
+    assert 0 < seen[0] <= 60
+
+
+class FakeResponse:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class SlowThenFastSession:
+    """第一个请求很慢，之后的请求立即返回"""
+
+    def __init__(self, first_delay):
+        self.calls = 0
+        self.first_delay = first_delay
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None, **kwargs):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(self.first_delay)
+        return FakeResponse(f'call-{call}')
+
+
+@pytest.fixture
+def fake_session(monkeypatch, tmp_path):
+    monkeypatch.setattr(http, 'latency', http.LatencyTracker(str(tmp_path / 'latency.json')))
+
+    def install(session):
+        monkeypatch.setattr(http, 'get_session', lambda: session)
+        return session
+    return install
+
+
+def test_hedged_get_sends_duplicate_after_delay(fake_session):
+    session = fake_session(SlowThenFastSession(first_delay=1.0))
+    started = time.monotonic()
+    response = http.hedged_get('https://slow.example/page', hedge_after=0.2)
+    assert response.name == 'call-2'
+    assert session.calls == 2
+    assert time.monotonic() - started < 0.9
+
+
+def test_hedged_get_no_duplicate_when_fast(fake_session):
+    session = fake_session(SlowThenFastSession(first_delay=0.0))
+    assert http.hedged_get('https://fast.example/page', hedge_after=0.5).name == 'call-1'
+    assert session.calls == 1
+
+
+def test_latency_percentile(tmp_path):
+    tracker = http.LatencyTracker(str(tmp_path / 'latency.json'))
+    assert tracker.percentile('a.example') is None
+    for value in range(1, 21):
+        tracker.record('a.example', value / 10)
+    assert tracker.percentile('a.example') == pytest.approx(2.0)
+    tracker.save()
+    assert http.LatencyTracker(str(tmp_path / 'latency.json')).percentile('a.example') == pytest.approx(2.0)
+
+
+def test_run_budget_read_from_dotenv(tmp_path):
+    """.env 中的 RUN_BUDGET_SECONDS 生效（在 load_dotenv 之后读取）"""
+    (tmp_path / '.env').write_text('RUN_BUDGET_SECONDS=42\n', encoding='utf-8')
+    env = {k: v for k, v in os.environ.items() if k != 'RUN_BUDGET_SECONDS'}
+    env['PYTHONPATH'] = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-c', 'import main; print(main.RUN_BUDGET_SECONDS)'],
+                            cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '42.0'
@@ -0,0 +1,73 @@
+# coding:utf-8
+"""
+测试新闻与热榜的实体关联
+"""
+
+import json
+
+from script.utils import entity_link, render, storage
+
+
+ROWS = [
+    {'rank': 1, 'name': 'anthropics/claude-code', 'url': 'https://github.com/anthropics/claude-code'},
+    {'rank': 2, 'name': 'ollama/ollama', 'url': 'https://github.com/ollama/ollama', 'homepage': 'https://ollama.com'},
+    {'rank': 3, 'name': 'microsoft/agent', 'url': 'https://github.com/microsoft/agent'},
+    {'rank': 4, 'name': 'Lightricks/LTX-2', 'url': 'https://github.com/Lightricks/LTX-2'},
+]
+NEWS = [
+    {'title': 'Claude Code 新增子代理', 'content': '命令行工具更新', 'url': 'https://n.example/1', 'source': ''},
+    {'title': 'Ollama 支持新模型', 'content': '详情见 ollama.com 与 ollama/ollama', 'url': 'https://n.example/2', 'source': ''},
+    {'title': 'Lightricks 发布视频模型', 'content': '基于 LTX-2', 'url': 'https://n.example/3', 'source': ''},
+    {'title': 'Microsoft 发布新 agent 框架', 'content': '', 'url': 'https://n.example/4', 'source': ''},
+    {'title': '重复报道 Claude Code', 'content': '', 'url': 'https://n.example/5', 'source': '',
+     'duplicate_of': 'https://n.example/1'},
+]
+
+
+def test_aliases_skip_generic_names():
+    assert entity_link.repo_aliases(ROWS[0]) == [
+        ('anthropics/claude-code', 'repo'), ('claude-code', 'name'), ('claude code', 'name'), ('anthropics', 'owner')]
+    assert entity_link.repo_aliases(ROWS[1]) == [('ollama/ollama', 'repo'), ('ollama', 'name'), ('ollama.com', 'name')]
+    # 'agent' 与 'microsoft' 太常见，不作为别名
+    assert entity_link.repo_aliases(ROWS[2]) == [('microsoft/agent', 'repo')]
+
+
+def test_link_news():
+    links = entity_link.link_news(NEWS, ROWS)
+    assert [(l['news_url'], l['repo'], l['kind']) for l in links] == [
+        ('https://n.example/1', 'anthropics/claude-code', 'name'),
+        ('https://n.example/2', 'ollama/ollama', 'repo'),
+        ('https://n.example/3', 'Lightricks/LTX-2', 'name'),
+    ]
+    assert links[0]['rank'] == 1 and links[0]['repo_url'] == 'https://github.com/anthropics/claude-code'
+
+
+def test_link_today_annotates_both_messages(sandbox):
+    date = '2026-09-01'
+    with open(storage.artifact_path('ai-news', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'weekday': '周二', 'items': NEWS}, f, ensure_ascii=False)
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': ROWS}, f)
+    with open(storage.artifact_path('github-trending', date, '.md'), 'w', encoding='utf-8') as f:
+        f.write('## 2026-09-01\n')
+
+    links = entity_link.link_today(date)
+    assert len(links) == 3 and entity_link.load_links(date) == links
+
+    news_message = render.payload_text(render.render_news_artifact(date))
+    assert ("### Claude Code 新增子代理\n> 命令行工具更新\n来源： [查看详情](https://n.example/1)\n"
+            "🔗 热榜: [anthropics/claude-code](https://github.com/anthropics/claude-code) #1\n\n") in news_message
+    assert "### Microsoft 发布新 agent 框架\n> \n来源： [查看详情](https://n.example/4)\n\n" in news_message
+    text_message = render.payload_text(render.render_news_artifact(date, 'text'))
+    assert "2. Ollama 支持新模型\nhttps://n.example/2\n热榜: ollama/ollama #2\n\n" in text_message
+
+    trending_message = render.payload_text(render.render_trending_artifact(date))
+    assert trending_message.endswith(
+        "### 🔗 今日新闻提及\n\n"
+        "- **anthropics/claude-code**（#1）: [Claude Code 新增子代理](https://n.example/1)\n"
+        "- **ollama/ollama**（#2）: [Ollama 支持新模型](https://n.example/2)\n"
+        "- **Lightricks/LTX-2**（#4）: [Lightricks 发布视频模型](https://n.example/3)\n")
+
+    # 历史查询直接读取关联记录
+    assert [m['news_url'] for m in entity_link.repo_mentions('ollama/ollama')] == ['https://n.example/2']
+    assert entity_link.repo_mentions('ollama/ollama', start='2026-09-02') == []
@@ -0,0 +1,110 @@
+# coding:utf-8
+"""
+测试带版本的页面提取规则、校验与改版检测
+"""
+
+import pytest
+
+from script.utils.extraction import (ExtractionError, ExtractionSchema, SelectorSet, check_drift, check_url,
+                                     is_mojibake, repair_mojibake, structural_fingerprint)
+from script.utils.news_parser import parse_news_html
+from script.utils.trending_records import TRENDING_PAGE_SCHEMA
+
+
+SCHEMA = ExtractionSchema(
+    name='demo',
+    version=1,
+    selector_sets=[
+        SelectorSet('old', items='li.item', fields={'title': 'a', 'url': ('a', 'href')}),
+        SelectorSet('new', items='div.card', fields={'title': 'h3', 'url': ('h3 a', 'href')}),
+    ],
+    required=('title', 'url'),
+    min_items=2,
+    checks={'url': check_url},
+)
+
+
+def _cards(n, tag='div', cls='card'):
+    return ''.join(f'<{tag} class="{cls}"><h3><a href="https://x.example/{i}">标题 {i}</a></h3></{tag}>'
+                   for i in range(n))
+
+
+def _trending_page(n):
+    rows = ''.join(f"""
+    <article class="Box-row">
+      <h2 class="h3 lh-condensed"><a href="/owner{i}/repo{i}">owner{i} /
+        repo{i}</a></h2>
+      <p class="col-9">Repo {i}</p>
+      <span itemprop="programmingLanguage">Python</span>
+      <a href="/owner{i}/repo{i}/stargazers">1,2{i}0</a>
+      <span class="d-inline-block float-sm-right">{i}0 stars today</span>
+    </article>""" for i in range(n))
+    return f'<html><body><div class="Box">{rows}</div></body></html>'
+
+
+def test_primary_selectors():
+    result = SCHEMA.extract('<ul><li class="item"><a href="https://a">A</a></li>'
+                            '<li class="item"><a href="https://b">B</a></li></ul>')
+    assert result.selector_set == 'old' and not result.used_fallback
+    assert [i['title'] for i in result.items] == ['A', 'B']
+
+
+def test_fallback_selectors():
+    result = SCHEMA.extract(f'<main>{_cards(3)}</main>')
+    assert result.selector_set == 'new' and result.used_fallback
+    assert result.items[2] == {'title': '标题 2', 'url': 'https://x.example/2'}
+
+
+def test_validation_failure_raises():
+    with pytest.raises(ExtractionError) as excinfo:
+        SCHEMA.extract('<ul><li class="item"><a>没有链接</a></li></ul>')
+    assert excinfo.value.schema is SCHEMA
+    assert [name for name, _ in excinfo.value.attempts] == ['old', 'new']
+
+
+def test_mojibake():
+    garbled = '机器之心'.encode('utf-8').decode('latin-1')
+    assert is_mojibake(garbled)
+    assert repair_mojibake(garbled) == '机器之心'
+    assert not is_mojibake('机器之心') and not is_mojibake('café') and not is_mojibake('plain')
+
+
+def test_news_page_is_repaired_before_parsing():
+    page = ('<div class="news-list"><div class="news-date">2月16日·周一</div>'
+            '<div class="news-item"><div class="news-content"><h2><a href="https://a.example">发布新模型</a></h2>'
+            '<p class="text-muted">正文<span class="news-time">来源：量子位</span></p></div></div></div>')
+    garbled = page.encode('utf-8').decode('latin-1')
+    news = parse_news_html(garbled, '2026-02-16')
+    assert news['weekday'] == '周一'
+    assert news['items'][0]['title'] == '发布新模型'
+    assert news['items'][0]['source'] == '量子位'
+    with pytest.raises(ExtractionError):
+        parse_news_html('<div class="news-list"><div class="news-date">改版了</div></div>', '2026-02-16')
+
+
+def test_trending_schema():
+    result = TRENDING_PAGE_SCHEMA.extract(_trending_page(15))
+    assert len(result.items) == 15
+    assert result.items[1]['title'] == 'owner1 / repo1'
+    assert result.items[1]['stars'] == '1,210'
+    assert result.tag == 'github-trending@1'
+    with pytest.raises(ExtractionError):
+        TRENDING_PAGE_SCHEMA.extract(_trending_page(3))
+
+
+def test_structural_fingerprint_ignores_content():
+    a = structural_fingerprint(f'<html><body><main>{_cards(3)}</main></body></html>')
+    b = structural_fingerprint(f'<html><body><main>{_cards(8).replace("标题", "Title")}</main></body></html>')
+    assert a == b
+
+
+def test_drift_detection(tmp_path):
+    path = str(tmp_path / 'layout.json')
+    page = f'<html><body><nav class="top"><a>x</a></nav><main>{_cards(3)}</main></body></html>'
+    assert check_drift('demo', page, '2026-02-16', path)['distance'] is None
+    assert check_drift('demo', page.replace('标题', '新闻'), '2026-02-17', path)['drift'] is False
+
+    redesigned = ('<html><body><header class="site"><ul class="menu"><li class="m"><span>x</span></li></ul></header>'
+                  + _cards(3, tag='section', cls='story') + '<footer class="f"><p class="c">c</p></footer></body></html>')
+    report = check_drift('demo', redesigned, '2026-02-18', path)
+    assert report['drift'] is True
@@ -0,0 +1,105 @@
+# coding:utf-8
+"""
+测试产物清单与 Git 发布的变更检测
+"""
+
+import subprocess
+
+from script.utils import git_helper, manifest
+from script.utils.git_helper import changed_artifacts
+
+
+def test_blob_hash_matches_git(tmp_path):
+    """git_blob_hash 与 git hash-object 结果一致"""
+    path = tmp_path / 'sample.md'
+    path.write_text('## 2026-02-16\n今日热榜\n', encoding='utf-8')
+
+    expected = subprocess.run(['git', 'hash-object', str(path)],
+                              capture_output=True, text=True).stdout.strip()
+    assert manifest.git_blob_hash(str(path)) == expected
+
+
+def test_record_and_clear_manifest(tmp_path, monkeypatch):
+    """登记产物后可读回，清空后为空"""
+    monkeypatch.setattr(manifest, 'MANIFEST_FILE', str(tmp_path / '.manifest.json'))
+    artifact = tmp_path / 'a.json'
+    artifact.write_text('{}', encoding='utf-8')
+
+    manifest.record_artifact(str(artifact))
+    entries = manifest.load_manifest()
+    assert len(entries) == 1
+    assert list(entries.values())[0] == manifest.git_blob_hash(str(artifact))
+
+    manifest.clear_manifest()
+    assert manifest.load_manifest() == {}
+
+
+def _repo(path):
+    """创建只含若干已提交文件的临时 git 仓库"""
+    def git(*args):
+        subprocess.run(['git', *args], cwd=path, check=True, capture_output=True)
+    git('init', '-q')
+    for i in range(5):
+        (path / f'file{i}.md').write_text(f'内容 {i}\n', encoding='utf-8')
+    git('add', '.')
+    git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'init')
+
+
+def test_changed_artifacts_skips_unchanged(tmp_path, monkeypatch):
+    """内容与 HEAD 相同的产物不会被暂存，内容不同或缺失的才会"""
+    _repo(tmp_path)
+    monkeypatch.setattr(git_helper, 'ROOT_DIR', str(tmp_path))
+    path = 'file0.md'
+    head_sha = manifest.git_blob_hash(str(tmp_path / path))
+
+    assert changed_artifacts({path: head_sha}) == []
+    assert changed_artifacts({path: '0' * 40}) == [path]
+    # 磁盘上不存在的文件直接忽略，已跟踪但被删除的文件需要暂存删除
+    assert changed_artifacts({'output/not-exist.md': '0' * 40}) == []
+    (tmp_path / 'file1.md').unlink()
+    assert changed_artifacts({'file1.md': None}) == ['file1.md']
+
+
+def test_head_blob_hashes_in_batches(tmp_path, monkeypatch):
+    _repo(tmp_path)
+    monkeypatch.setattr(git_helper, 'ROOT_DIR', str(tmp_path))
+    monkeypatch.setattr(git_helper, 'LS_TREE_BATCH', 2)
+    paths = [f'file{i}.md' for i in range(5)] + ['missing.md']
+    hashes = git_helper.head_blob_hashes(paths)
+    assert sorted(hashes) == paths[:5]
+    assert hashes['file3.md'] == manifest.git_blob_hash(str(tmp_path / 'file3.md'))
+
+
+def test_push_retry_rebases_with_dirty_tracked_file(tmp_path, monkeypatch):
+    """推送被拒后变基重试，未登记的已跟踪文件有改动也不影响，且改动保留"""
+    def git(cwd, *args):
+        return subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                              cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+    remote, mine, other = tmp_path / 'remote.git', tmp_path / 'mine', tmp_path / 'other'
+    git(tmp_path, 'init', '-q', '--bare', '-b', 'main', str(remote))
+    mine.mkdir()
+    _repo(mine)
+    git(mine, 'branch', '-M', 'main')
+    git(mine, 'remote', 'add', 'origin', str(remote))
+    git(mine, 'push', '-q', 'origin', 'main')
+
+    # 远端先有了别人的提交
+    git(tmp_path, 'clone', '-q', str(remote), str(other))
+    (other / 'remote.md').write_text('远端\n', encoding='utf-8')
+    git(other, 'add', '.')
+    git(other, 'commit', '-q', '-m', 'remote')
+    git(other, 'push', '-q', 'origin', 'main')
+
+    # 本地提交一次，同时有未登记的已跟踪文件改动
+    (mine / 'file0.md').write_text('本地产物\n', encoding='utf-8')
+    git(mine, 'add', 'file0.md')
+    git(mine, 'commit', '-q', '-m', 'local')
+    (mine / 'file1.md').write_text('常驻模式写入\n', encoding='utf-8')
+
+    monkeypatch.setattr(git_helper, 'ROOT_DIR', str(mine))
+    monkeypatch.setenv('GIT_COMMITTER_NAME', 'test')
+    monkeypatch.setenv('GIT_COMMITTER_EMAIL', 'test@example.com')
+    assert git_helper.push_with_retry('main', backoff=0)
+    assert git(remote, 'log', '--format=%s', 'main').split() == ['local', 'remote', 'init']
+    assert (mine / 'file1.md').read_text(encoding='utf-8') == '常驻模式写入\n'
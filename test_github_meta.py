@@ -0,0 +1,149 @@
+# coding:utf-8
+"""
+测试 GitHub GraphQL 元数据批量获取与缓存（使用本地 GraphQL 桩服务）
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from script.utils import github_meta
+
+
+SELECTION_RE = re.compile(r'(r\d+): repository\(owner: \$(o\d+), name: \$(n\d+)\) \{ \.\.\.(\w+) \}')
+
+
+class GraphQLStub:
+    """按别名返回仓库节点的 GraphQL 桩，记录收到的每次请求"""
+
+    def __init__(self):
+        self.repos = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.requests.append({'auth': self.headers.get('Authorization'), **body})
+                data, errors = {'rateLimit': {'cost': 1, 'remaining': 4999}}, []
+                for alias, owner, name, fragment in SELECTION_RE.findall(body['query']):
+                    full_name = f"{body['variables'][owner]}/{body['variables'][name]}"
+                    data[alias] = stub.repos.get(full_name)
+                    if data[alias] is None:
+                        errors.append({'type': 'NOT_FOUND', 'path': [alias], 'message': 'not found'})
+                payload = json.dumps({'data': data, 'errors': errors} if errors else {'data': data}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/graphql'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def fragments(self, i=-1):
+        return [f for *_, f in SELECTION_RE.findall(self.requests[i]['query'])]
+
+
+def _repo(name, updated='2026-09-01T00:00:00Z', stars=100):
+    return {'nameWithOwner': name, 'description': 'desc', 'homepageUrl': None, 'isArchived': False,
+            'isFork': False, 'stargazerCount': stars, 'forkCount': 5, 'createdAt': '2025-01-02T00:00:00Z',
+            'pushedAt': '2026-09-01T12:00:00Z', 'updatedAt': updated, 'primaryLanguage': {'name': 'Python'},
+            'licenseInfo': {'spdxId': 'MIT', 'name': 'MIT License'},
+            'repositoryTopics': {'nodes': [{'topic': {'name': 'llm'}}, {'topic': {'name': 'agent'}}]}}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = GraphQLStub()
+    monkeypatch.setattr(github_meta, 'GRAPHQL_URL', stub.url)
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+    yield stub
+    stub.server.shutdown()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_batched_query_and_cache(stub, tmp_path):
+    stub.repos = {'a/one': _repo('a/one'), 'b/two': _repo('b/two')}
+    clock = Clock()
+    cache = github_meta.MetadataCache(str(tmp_path / 'meta.json'), ttl=3600, clock=clock)
+
+    meta = github_meta.fetch_metadata(['a/one', 'b/two', 'c/gone'], cache=cache)
+    # 三个仓库一次请求
+    assert len(stub.requests) == 1
+    assert stub.requests[0]['auth'] == 'bearer test-token'
+    assert stub.fragments() == ['Full', 'Full', 'Full']
+    assert set(meta) == {'a/one', 'b/two'}
+    assert meta['a/one']['topics'] == ['llm', 'agent'] and meta['a/one']['license'] == 'MIT'
+
+    # 缓存有效期内不再请求（包括不存在的仓库）
+    github_meta.fetch_metadata(['a/one', 'b/two', 'c/gone'], cache=cache)
+    assert len(stub.requests) == 1
+
+    # 过期后轻量校验：a/one 未变化只刷新星标，b/two 变化后重新拉取完整字段
+    clock.now += 7200
+    stub.repos['a/one'] = _repo('a/one', stars=150)
+    stub.repos['b/two'] = dict(_repo('b/two', updated='2026-09-02T00:00:00Z'),
+                               repositoryTopics={'nodes': [{'topic': {'name': 'rust'}}]})
+    meta = github_meta.fetch_metadata(['a/one', 'b/two'], cache=cache)
+    assert stub.fragments(-2) == ['Light', 'Light']
+    assert stub.fragments(-1) == ['Full']
+    assert meta['a/one']['stars'] == 150 and meta['a/one']['topics'] == ['llm', 'agent']
+    assert meta['b/two']['topics'] == ['rust']
+
+    # 缓存持久化
+    reloaded = github_meta.MetadataCache(str(tmp_path / 'meta.json'), clock=clock)
+    assert reloaded.get('b/two')['meta']['updated_at'] == '2026-09-02T00:00:00Z'
+
+
+def test_failure_falls_back_to_stale_cache(stub, tmp_path):
+    stub.repos = {'a/one': _repo('a/one')}
+    clock = Clock()
+    cache = github_meta.MetadataCache(str(tmp_path / 'meta.json'), ttl=60, clock=clock)
+    github_meta.fetch_metadata(['a/one'], cache=cache)
+
+    clock.now += 120
+    stub.server.shutdown()
+    stub.server.server_close()
+    meta = github_meta.fetch_metadata(['a/one'], cache=cache)
+    assert meta['a/one']['license'] == 'MIT'
+
+
+def test_skips_without_token(monkeypatch, tmp_path):
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    cache = github_meta.MetadataCache(str(tmp_path / 'meta.json'))
+    assert github_meta.fetch_metadata(['a/one'], cache=cache) == {}
+
+
+def test_merge_and_prompt_section():
+    rows = [{'name': 'a/one', 'description': ''}, {'name': 'b/two', 'description': 'keep'}]
+    meta = github_meta.normalize(_repo('a/one'))
+    github_meta.merge_metadata(rows, {'a/one': meta})
+    assert rows[0]['description'] == 'desc' and rows[0]['topics'] == ['llm', 'agent']
+    assert 'topics' not in rows[1]
+    section = github_meta.format_metadata_section(rows)
+    assert section == ("\n### 仓库元数据\n\n"
+                       "- a/one: topics: llm, agent；许可证: MIT；创建: 2025-01-02；最近推送: 2026-09-01\n")
+    assert github_meta.format_metadata_section(rows[1:]) == ''
+
+
+def test_build_query_uses_variables():
+    query, variables, aliases = github_meta.build_query(['a/one'], ['b/"two'])
+    assert variables == {'o0': 'a', 'n0': 'one', 'o1': 'b', 'n1': '"two'}
+    assert aliases == {'r0': 'a/one', 'r1': 'b/"two'}
+    assert '"two' not in query and 'fragment Full' in query and 'fragment Light' in query
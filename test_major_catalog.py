@@ -0,0 +1,160 @@
+# coding:utf-8
+"""
+测试专业目录批量生成
+"""
+
+import json
+import threading
+
+import pytest
+
+from script.utils import major_catalog
+from script.utils.article_crawler import HostLimiter
+
+
+MAJORS = [{'major_id': f'm{i}', 'major_name': f'专业{i}', 'subject_name': '工学', 'category_name': '计算机类'}
+          for i in range(20)]
+
+QA_REPLY = """```sql
+INSERT INTO major_qa (major_id, question, answer) VALUES ('{id}', '主要学什么？', '学习 O''Reilly 的书; 以及 DROP TABLE majors;');
+INSERT INTO major_qa (major_id, question, answer) VALUES ('other', '考研比例大吗？', '比较大'), ('x', '适合公务员吗？', NULL);
+INSERT INTO majors (major_id, major_name) VALUES ('evil', '注入');
+DROP TABLE major_qa; --
+```"""
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(major_catalog, 'BACKOFF_SECONDS', 0.0)
+
+
+class FakeModel:
+    """按专业与任务返回固定回复，记录调用次数与最大并发；fail 中的专业回复为空，down 中的专业拿不到回复"""
+
+    def __init__(self, fail=(), down=()):
+        self.fail = set(fail)
+        self.down = set(down)
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, messages, max_tokens=2000):
+        prompt = messages[0]['content']
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            major_id = next(m['major_id'] for m in MAJORS if f"【{m['major_name']}】" in prompt
+                            or f"'{m['major_id']}'" in prompt)
+            if major_id in self.down:
+                return None
+            if major_id in self.fail:
+                return ''
+            if 'INSERT' in prompt:
+                return QA_REPLY.replace('{id}', major_id)
+            return f"```\n{major_id} 的介绍\n```"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _run(store, model, **kwargs):
+    return major_catalog.run(MAJORS, store, workers=4, rpm=0, complete=model, commit_every=7,
+                             limiter=HostLimiter(per_host=4, interval=0.0), progress=False, **kwargs)
+
+
+def test_parse_qa_rows_only_accepts_literals():
+    rows = major_catalog.parse_qa_rows(QA_REPLY.replace('{id}', 'model-id'), 'm1')
+    assert rows == [('m1', '主要学什么？', "学习 O'Reilly 的书; 以及 DROP TABLE majors;"),
+                    ('m1', '考研比例大吗？', '比较大')]
+    assert major_catalog.parse_qa_rows("INSERT INTO major_qa (major_id, question, answer) "
+                                       "VALUES ('m1', lower('x'), 'y');", 'm1') == []
+    assert major_catalog.parse_qa_rows("INSERT INTO major_qa (question, answer) VALUES ('q', '未闭合", 'm1') == []
+
+
+def test_load_catalog_formats(tmp_path):
+    csv_path = tmp_path / 'majors.csv'
+    csv_path.write_text('﻿major_id,major_name,subject_name,category_name\n'
+                        '080901,计算机科学与技术,工学,计算机类\n080901,重复,,\n,缺少编号,,\n', encoding='utf-8')
+    assert major_catalog.load_catalog(str(csv_path)) == [
+        {'major_id': '080901', 'major_name': '计算机科学与技术', 'subject_name': '工学', 'category_name': '计算机类'}]
+
+    jsonl_path = tmp_path / 'majors.jsonl'
+    jsonl_path.write_text(json.dumps({'major_id': 1, 'major_name': '哲学'}, ensure_ascii=False) + '\n', encoding='utf-8')
+    assert major_catalog.load_catalog(str(jsonl_path))[0]['major_id'] == '1'
+
+
+def test_run_writes_rows_and_resumes(tmp_path):
+    db = str(tmp_path / 'majors.sqlite')
+    model = FakeModel(fail={'m3'})
+    store = major_catalog.CatalogStore(db)
+    stats = _run(store, model)
+    assert stats['done'] == 38 and stats['failed'] == 2
+    assert model.peak <= 4
+    # 失败的任务在本次运行内重试过
+    assert model.calls == 38 + 2 * major_catalog.RETRIES
+
+    conn = store.conn
+    assert conn.execute('SELECT COUNT(*) FROM major_intro').fetchone()[0] == 19
+    assert conn.execute("SELECT content FROM major_intro WHERE major_id = 'm0'").fetchone()[0] == 'm0 的介绍'
+    assert conn.execute('SELECT COUNT(*) FROM major_qa').fetchone()[0] == 38
+    assert conn.execute("SELECT COUNT(*) FROM majors WHERE major_id = 'evil'").fetchone()[0] == 0
+    assert store.counts()['qa'] == {'done': 19, 'failed': 1}
+    store.close()
+
+    # 再次运行只重试失败的任务，问答整体替换而不是重复追加
+    resumed = FakeModel()
+    store = major_catalog.CatalogStore(db)
+    stats = _run(store, resumed)
+    assert stats['skipped'] == 38 and stats['done'] == 2
+    assert resumed.calls == 2
+    assert store.conn.execute("SELECT COUNT(*) FROM major_qa WHERE major_id = 'm3'").fetchone()[0] == 2
+    assert _run(store, resumed)['skipped'] == 40
+
+
+def test_failures_stop_after_max_attempts(tmp_path):
+    store = major_catalog.CatalogStore(str(tmp_path / 'majors.sqlite'))
+    model = FakeModel(fail={'m0'})
+    for _ in range(major_catalog.MAX_ATTEMPTS):
+        _run(store, model, tasks=('intro',))
+    assert store.pending(MAJORS, ('intro',)) == []
+    assert store.conn.execute("SELECT attempts, error FROM progress WHERE major_id = 'm0'").fetchone() == (
+        major_catalog.MAX_ATTEMPTS, '介绍为空')
+
+
+def test_unavailable_model_does_not_count_attempts(tmp_path, monkeypatch):
+    store = major_catalog.CatalogStore(str(tmp_path / 'majors.sqlite'))
+    for _ in range(major_catalog.MAX_ATTEMPTS + 1):
+        stats = _run(store, FakeModel(down={'m0'}), tasks=('intro',))
+    assert stats['unavailable'] == 1 and stats['failed'] == 0
+    assert store.conn.execute("SELECT COUNT(*) FROM progress WHERE major_id = 'm0'").fetchone()[0] == 0
+    assert store.pending(MAJORS, ('intro',)) == [(MAJORS[0], 'intro')]
+
+    # 服务整体不可用时很快停止提交新任务
+    monkeypatch.setattr(major_catalog, 'MAX_UNAVAILABLE', 3)
+    down = FakeModel(down={m['major_id'] for m in MAJORS})
+    stats = _run(store, down, tasks=('qa',))
+    assert stats['unavailable'] < len(MAJORS)
+    assert store.conn.execute("SELECT COUNT(*) FROM progress WHERE task = 'qa'").fetchone()[0] == 0
+
+
+def test_missing_key_fails_before_submitting(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv('VOLCENGINE_API_KEY', raising=False)
+    monkeypatch.setattr(major_catalog, 'load_dotenv', lambda: None)
+    db = tmp_path / 'majors.sqlite'
+    catalog = tmp_path / 'majors.json'
+    catalog.write_text(json.dumps(MAJORS, ensure_ascii=False), encoding='utf-8')
+    major_catalog.main([str(catalog), '--db', str(db)])
+    assert 'VOLCENGINE_API_KEY' in capsys.readouterr().out
+    assert not db.exists()
+    with pytest.raises(RuntimeError):
+        major_catalog.run(MAJORS, major_catalog.CatalogStore(':memory:'))
+
+
+def test_commit_is_atomic_with_progress(tmp_path):
+    store = major_catalog.CatalogStore(str(tmp_path / 'majors.sqlite'))
+    with pytest.raises(Exception):
+        store.commit([{'major_id': 'm0', 'task': 'qa', 'qa': [('m0', 'q', None)]}])
+    assert store.conn.execute('SELECT COUNT(*) FROM progress').fetchone()[0] == 0
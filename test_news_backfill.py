@@ -0,0 +1,68 @@
+# coding:utf-8
+"""
+测试快讯页面解析与并行回填
+"""
+
+import json
+
+import pytest
+
+from script.utils import news_backfill, storage
+from script.utils.news_parser import parse_news_html
+
+
+PAGE = """<html><body>
+<div class="news-list">
+  <div class="news-date">2月16日·周一</div>
+  <div class="news-item"><div class="news-content">
+    <h2><a href="https://example.com/{date}">新闻 {date}</a></h2>
+    <p class="text-muted">正文内容<span class="news-time">来源：量子位</span></p>
+  </div></div>
+</div>
+<div class="news-list"><div class="news-item"><div class="news-content"><h2><a href="x">旧闻</a></h2></div></div></div>
+</body></html>"""
+
+
+@pytest.fixture
+def archive(sandbox):
+    for date in ('2026-02-16', '2026-02-17', '2026-02-18'):
+        with open(storage.artifact_path('ai-news', date, '.html'), 'w', encoding='utf-8') as f:
+            f.write(PAGE.replace('{date}', date))
+    return sandbox
+
+
+def test_parse_news_html():
+    news = parse_news_html(PAGE.replace('{date}', '2026-02-16'), '2026-02-16')
+    assert news['weekday'] == '周一'
+    assert news['items'] == [{'title': '新闻 2026-02-16', 'url': 'https://example.com/2026-02-16',
+                              'content': '正文内容', 'source': '量子位', 'schema': 'ai-news@2'}]
+
+
+def test_backfill_streams_and_resumes(archive):
+    output = str(archive / 'backfill.jsonl')
+    stats = news_backfill.backfill(workers=2, chunk_size=2, output=output, progress=False)
+    assert stats['parsed'] == 3 and stats['failed'] == 0
+
+    with open(output, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r['date'] for r in records) == ['2026-02-16', '2026-02-17', '2026-02-18']
+    assert all(r['news']['items'][0]['title'] == f"新闻 {r['date']}" for r in records)
+
+    # 模拟中断：最后一行只写了一半
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('{"date": "2026-02-1')
+    stats = news_backfill.backfill(workers=2, output=output, progress=False)
+    assert stats['skipped'] == 3 and stats['parsed'] == 0
+
+    # 删掉一条结果后续跑只补这一天，半行被截掉
+    with open(output, encoding='utf-8') as f:
+        lines = [line for line in f if '2026-02-17' not in line]
+    with open(output, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    stats = news_backfill.backfill(workers=2, output=output, progress=False)
+    assert stats['parsed'] == 1
+    with open(output, encoding='utf-8') as f:
+        assert len([json.loads(line) for line in f]) == 3
+
+    stats = news_backfill.backfill(workers=1, output=output, restart=True, progress=False)
+    assert stats['parsed'] == 3
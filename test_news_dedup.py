@@ -0,0 +1,75 @@
+# coding:utf-8
+"""
+测试 AI 新闻 SimHash 去重
+"""
+
+from script.utils.news_dedup import FingerprintIndex, dedup_news, hamming, simhash
+
+
+STORY = ('OpenAI 发布新模型 GPT-5',
+         '今天，OpenAI 正式发布了备受期待的 GPT-5 模型，该模型在推理能力、多模态理解和代码生成方面均有显著提升')
+REWORDED = ('OpenAI 正式发布新模型 GPT-5',
+            '今天，OpenAI 正式发布了备受期待的 GPT-5 模型，该模型在推理能力、多模态理解和代码生成方面均有显著提升。')
+OTHER = ('Meta 发布 Llama 4',
+         'Meta 发布了 Llama 4 系列模型，包括 7B、13B、70B 三个版本，性能全面超越前代')
+
+
+def _item(story, url):
+    return {'title': story[0], 'content': story[1], 'source': 'AIbot', 'url': url}
+
+
+def test_simhash_distance():
+    assert hamming(simhash(*STORY), simhash(*REWORDED)) <= 5
+    assert hamming(simhash(*STORY), simhash(*OTHER)) > 5
+
+
+def test_same_day_cluster_keeps_longest():
+    news = {'date': '2026-02-16', 'items': [
+        _item(STORY, 'https://a.com/1'),
+        _item(REWORDED, 'https://b.com/2'),
+        _item(OTHER, 'https://c.com/3'),
+    ]}
+    stats = dedup_news(news, FingerprintIndex())
+
+    items = news['items']
+    assert items[0]['duplicate_of'] == 'https://b.com/2'
+    assert 'duplicate_of' not in items[1]
+    assert 'duplicate_of' not in items[2]
+    assert stats == {'total': 3, 'same_day': 1, 'cross_day': 0}
+
+
+def test_cross_day_repeat_tagged():
+    index = FingerprintIndex()
+    dedup_news({'date': '2026-02-15', 'items': [_item(STORY, 'https://a.com/1')]}, index)
+
+    news = {'date': '2026-02-16', 'items': [_item(REWORDED, 'https://b.com/2'), _item(OTHER, 'https://c.com/3')]}
+    stats = dedup_news(news, index)
+
+    assert news['items'][0]['first_seen'] == '2026-02-15'
+    assert news['items'][0]['duplicate_of'] == 'https://a.com/1'
+    assert 'first_seen' not in news['items'][1]
+    assert stats['cross_day'] == 1
+
+
+def test_cross_day_cluster_counted_once():
+    index = FingerprintIndex()
+    dedup_news({'date': '2026-02-15', 'items': [_item(STORY, 'https://a.com/1')]}, index)
+
+    news = {'date': '2026-02-16', 'items': [_item(STORY, 'https://b.com/2'), _item(REWORDED, 'https://c.com/3'),
+                                            _item(OTHER, 'https://d.com/4')]}
+    stats = dedup_news(news, index)
+
+    assert [item.get('duplicate_of') for item in news['items']] == ['https://a.com/1', 'https://a.com/1', None]
+    # 每条重复只计一次：两条都被标记，统计合计为 2
+    assert stats == {'total': 3, 'same_day': 1, 'cross_day': 1}
+
+
+def test_index_round_trip(tmp_path):
+    path = str(tmp_path / 'fp.json')
+    index = FingerprintIndex()
+    dedup_news({'date': '2026-02-15', 'items': [_item(STORY, 'https://a.com/1')]}, index)
+    index.save(path)
+
+    # 窗口之外的条目在加载时被裁剪
+    assert FingerprintIndex.load('2026-02-16', path).find_url('https://a.com/1')
+    assert FingerprintIndex.load('2026-03-16', path).entries == []
@@ -0,0 +1,73 @@
+# coding:utf-8
+"""
+测试 AI 快讯批量增强
+"""
+
+import json
+import re
+import threading
+
+from script.utils.llm import parse_json_reply
+from script.utils.news_enrich import EnrichMemo, enrich_news
+
+
+def _news(n):
+    return {'date': '2026-02-16', 'items': [
+        {'title': f'新闻 {i}', 'url': f'https://example.com/{i}', 'content': '内容', 'source': '量子位'}
+        for i in range(n)]}
+
+
+class FakeModel:
+    """按 prompt 中的编号返回结果，记录调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, messages, max_tokens=None, timeout=None):
+        with self.lock:
+            self.calls += 1
+        ids = [int(i) for i in re.findall(r'^\[(\d+)\]', messages[0]['content'], re.M)]
+        items = [{'id': i, 'category': '大模型', 'tags': ['GPT'], 'summary': f'摘要 {i}'} for i in ids]
+        return '```json\n' + json.dumps({'items': items}, ensure_ascii=False) + '\n```'
+
+
+def test_parse_json_reply():
+    assert parse_json_reply('```json\n{"a": 1}\n```') == {'a': 1}
+    assert parse_json_reply('结果如下：{"a": 2}') == {'a': 2}
+    assert parse_json_reply('not json') is None
+
+
+def test_batches_and_memo(tmp_path):
+    model = FakeModel()
+    memo = EnrichMemo(str(tmp_path / 'memo.json'))
+    news = _news(10)
+    stats = enrich_news(news, memo=memo, completion=model, batch_size=4, max_workers=3)
+    assert stats == {'cached': 0, 'enriched': 10, 'failed': 0, 'batches': 3}
+    assert model.calls == 3
+    assert news['items'][7]['summary'] == '摘要 7'
+    assert news['items'][7]['category'] == '大模型'
+
+    # 重复运行全部命中缓存，不再调用模型
+    rerun = _news(10)
+    stats = enrich_news(rerun, memo=EnrichMemo(str(tmp_path / 'memo.json')), completion=model, batch_size=4)
+    assert stats['cached'] == 10 and stats['batches'] == 0
+    assert model.calls == 3
+    assert rerun['items'][3]['tags'] == ['GPT']
+
+
+def test_duplicates_reuse_original(tmp_path):
+    model = FakeModel()
+    news = _news(2)
+    news['items'][1]['duplicate_of'] = news['items'][0]['url']
+    stats = enrich_news(news, memo=EnrichMemo(str(tmp_path / 'memo.json')), completion=model)
+    assert stats['enriched'] == 1
+    assert news['items'][1]['summary'] == '摘要 0'
+
+
+def test_invalid_reply_leaves_items_unenriched(tmp_path):
+    news = _news(3)
+    stats = enrich_news(news, memo=EnrichMemo(str(tmp_path / 'memo.json')),
+                        completion=lambda *a, **k: None)
+    assert stats['failed'] == 3
+    assert 'category' not in news['items'][0]
@@ -0,0 +1,137 @@
+# coding:utf-8
+"""
+测试 AI 快讯日内增量轮询
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from script.utils import news_dedup, news_poll, storage
+from script.utils.news_parser import parse_news_html
+
+
+def _page(*items):
+    rows = ''.join(
+        f'<div class="news-item"><div class="news-content"><h2><a href="https://example.com/{key}">{title}</a></h2>'
+        f'<p class="text-muted">{title}的详细内容<span class="news-time">来源：量子位</span></p></div></div>'
+        for key, title in items)
+    return f'<html><body><div class="news-list"><div class="news-date">9月1日·周二</div>{rows}</div></body></html>'
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', etag=None):
+        self.status_code = status_code
+        self.text = text
+        self.encoding = 'utf-8'
+        self.headers = {'ETag': etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class FakeSite:
+    def __init__(self):
+        self.page = None
+        self.version = 0
+        self.requests = []
+
+    def publish(self, *items):
+        self.page = _page(*items)
+        self.version += 1
+
+    def __call__(self, state):
+        self.requests.append(state.etag)
+        etag = f'"v{self.version}"'
+        if state.etag == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.page, etag)
+
+
+@pytest.fixture
+def sandbox(sandbox, monkeypatch):
+    monkeypatch.setattr(news_dedup, 'FINGERPRINT_FILE', str(sandbox / 'fingerprints.json'))
+    monkeypatch.setattr(news_poll, 'append_news', lambda date, items: None)
+    monkeypatch.setenv('WECOM_WEBHOOK_URL', 'https://example.com/hook')
+    monkeypatch.delenv('WECOM_MSGTYPES', raising=False)
+    return sandbox
+
+
+def _day_json(date):
+    return json.loads(storage.read_artifact('ai-news', date, '.json'))
+
+
+def test_poll_appends_and_pushes_only_new_items(sandbox):
+    date, site, sent = '2026-09-01', FakeSite(), []
+    send = lambda url, payload: sent.append(payload['markdown']['content']) or True
+    now = datetime(2026, 9, 1, 14, 5)
+    state = lambda: news_poll.PollState(date, str(sandbox / 'poll'))
+
+    site.publish(('a', '模型A发布'), ('b', '芯片B量产'))
+    assert [i['url'] for i in news_poll.poll_once(date, state(), site, send, now)] == \
+        ['https://example.com/a', 'https://example.com/b']
+    assert sent[0].startswith('# AI快讯 · 新增 2 条 (14:05)\n### 模型A发布')
+
+    # 页面未变化：条件请求返回 304，不解析也不推送
+    assert news_poll.poll_once(date, state(), site, send, now) == []
+    assert site.requests[-1] == '"v1"' and len(sent) == 1
+
+    # 新发布的条目排在页面最前，只追加和推送新条目
+    site.publish(('c', '框架C开源'), ('a', '模型A发布'), ('b', '芯片B量产'))
+    new = news_poll.poll_once(date, state(), site, send, now)
+    assert [i['url'] for i in new] == ['https://example.com/c']
+    assert sent[1].startswith('# AI快讯 · 新增 1 条 (14:05)\n### 框架C开源')
+    assert [i['url'] for i in _day_json(date)['items']] == \
+        ['https://example.com/a', 'https://example.com/b', 'https://example.com/c']
+
+
+def test_failed_push_is_retried(sandbox):
+    date, site = '2026-09-01', FakeSite()
+    site.publish(('a', '模型A发布'))
+    state = lambda: news_poll.PollState(date, str(sandbox / 'poll'))
+
+    assert news_poll.poll_once(date, state(), site, lambda url, payload: False)
+    assert state().unsent == ['https://example.com/a']
+    # 页面未变化（304）时也会重试待推送的条目
+    sent = []
+    assert news_poll.poll_once(date, state(), site, lambda url, payload: sent.append(payload) or True) == []
+    assert len(sent) == 1 and '模型A发布' in sent[0]['markdown']['content']
+    assert state().unsent == []
+    # JSON 中不会重复追加
+    assert len(_day_json(date)['items']) == 1
+
+
+def test_items_saved_by_daily_job_are_not_pushed(sandbox):
+    date, site, sent = '2026-09-01', FakeSite(), []
+    send = lambda url, payload: sent.append(payload) or True
+    site.publish(('a', '模型A发布'), ('b', '芯片B量产'))
+    news_poll.merge_day(parse_news_html(site.page, date))
+
+    # 当天首次轮询（或刚开启轮询）：日报已保存的条目不算新增
+    assert news_poll.poll_once(date, news_poll.PollState(date, str(sandbox / 'poll')), site, send) == []
+    assert sent == []
+
+    site.publish(('c', '框架C开源'), ('a', '模型A发布'), ('b', '芯片B量产'))
+    new = news_poll.poll_once(date, news_poll.PollState(date, str(sandbox / 'poll')), site, send)
+    assert [i['url'] for i in new] == ['https://example.com/c']
+    assert len(sent) == 1 and '新增 1 条' in sent[0]['markdown']['content']
+
+
+def test_daily_job_merge_keeps_polled_items(sandbox):
+    date = '2026-09-01'
+    news_poll.merge_day({'date': date, 'weekday': '周二', 'items': [
+        {'title': '早间新闻', 'url': 'https://example.com/early', 'content': '内容一', 'source': ''}]})
+    news, new_items = news_poll.merge_day({'date': date, 'weekday': '周二', 'items': [
+        {'title': '晚间新闻', 'url': 'https://example.com/late', 'content': '内容二', 'source': ''},
+        {'title': '早间新闻', 'url': 'https://example.com/early', 'content': '内容一', 'source': ''}]})
+    assert [i['url'] for i in new_items] == ['https://example.com/late']
+    assert [i['title'] for i in _day_json(date)['items']] == ['早间新闻', '晚间新闻']
+
+
+def test_poll_state_prunes_old_days(tmp_path):
+    old = news_poll.PollState('2026-08-01', str(tmp_path))
+    old.save()
+    news_poll.PollState('2026-09-01', str(tmp_path)).save()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['2026-09-01.json']
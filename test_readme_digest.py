@@ -0,0 +1,140 @@
+# coding:utf-8
+"""
+测试 README 获取与内容寻址的摘要缓存
+"""
+
+import base64
+
+from script.utils import readme_digest
+
+
+README = """<p align="center"><img src="logo.png"></p>
+
+# Foo
+
+[![CI](https://img.shields.io/badge.svg)](https://ci.example.com)
+
+Foo is a **fast** toolkit for building [LLM](https://example.com) agents in Python.
+
+## Installation
+
+```bash
+$ pip install foo
+# 可选依赖
+foo --help
+```
+
+## Features
+
+Plans, tools and memory in one package.
+
+| a | b |
+|---|---|
+"""
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, etag=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {'ETag': etag} if etag else {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class FakeGitHub:
+    def __init__(self, readmes):
+        self.readmes = readmes
+        self.calls = []
+
+    def __call__(self, url, headers):
+        name = url.split('/repos/')[1].rsplit('/readme', 1)[0]
+        self.calls.append((name, headers.get('If-None-Match')))
+        if name not in self.readmes:
+            return FakeResponse(404)
+        sha, text = self.readmes[name]
+        etag = f'"{sha}"'
+        if headers.get('If-None-Match') == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, {'sha': sha, 'encoding': 'base64',
+                                  'content': base64.b64encode(text.encode()).decode()}, etag)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_make_digest_keeps_intro_install_and_sections():
+    digest = readme_digest.make_digest(README)
+    assert digest.splitlines() == [
+        'Foo is a fast toolkit for building LLM agents in Python.',
+        '安装: pip install foo',
+        '[Features] Plans, tools and memory in one package.',
+    ]
+
+
+def test_make_digest_respects_token_budget():
+    text = '# T\n\n' + '\n\n'.join(f'## S{i}\n\n' + '段落内容' * 10 for i in range(30))
+    digest = readme_digest.make_digest(text, max_tokens=100)
+    assert readme_digest.estimate_tokens(digest) <= 100
+    long_intro = readme_digest.make_digest('word ' * 1000, max_tokens=50)
+    assert long_intro.endswith('…') and readme_digest.estimate_tokens(long_intro) <= 55
+
+
+def test_digests_are_fetched_once_and_content_addressed(tmp_path, monkeypatch):
+    clock = Clock()
+    store = readme_digest.DigestStore(str(tmp_path), clock=clock)
+    github = FakeGitHub({'a/foo': ('sha1', README), 'b/fork': ('sha1', README), 'c/other': ('sha2', '# X\n\nAnother project readme here.')})
+
+    made = []
+    original = readme_digest.make_digest
+    monkeypatch.setattr(readme_digest, 'make_digest', lambda text, max_tokens: made.append(1) or original(text, max_tokens))
+
+    digests = readme_digest.readme_digests(['a/foo', 'b/fork', 'c/other', 'd/none'], store, github, max_workers=1)
+    assert set(digests) == {'a/foo', 'b/fork', 'c/other'}
+    assert digests['a/foo'] == digests['b/fork']
+    # 相同 blob 只摘要一次
+    assert len(made) == 2
+
+    # 同一天再次运行不发请求
+    github.calls.clear()
+    readme_digest.readme_digests(['a/foo', 'd/none'], store, github)
+    assert github.calls == []
+
+    # 第二天：带 ETag 的条件请求，304 沿用已有摘要
+    clock.now += readme_digest.RECHECK_SECONDS + 1
+    again = readme_digest.readme_digests(['a/foo'], readme_digest.DigestStore(str(tmp_path), clock=clock), github)
+    assert github.calls == [('a/foo', '"sha1"')]
+    assert again['a/foo'] == digests['a/foo'] and len(made) == 2
+
+    # README 更新后重新摘要
+    clock.now += readme_digest.RECHECK_SECONDS + 1
+    github.readmes['a/foo'] = ('sha3', '# Foo\n\nFoo was rewritten in Rust for speed.')
+    updated = readme_digest.readme_digests(['a/foo'], store, github)
+    assert updated['a/foo'] == 'Foo was rewritten in Rust for speed.' and len(made) == 3
+
+
+def test_failure_returns_cached_digest(tmp_path):
+    clock = Clock()
+    store = readme_digest.DigestStore(str(tmp_path), clock=clock)
+    readme_digest.readme_digests(['a/foo'], store, FakeGitHub({'a/foo': ('sha1', README)}))
+    clock.now += readme_digest.RECHECK_SECONDS + 1
+
+    def broken(url, headers):
+        raise ConnectionError('offline')
+    assert 'pip install foo' in readme_digest.readme_digests(['a/foo'], store, broken)['a/foo']
+
+
+def test_format_readme_section():
+    rows = [{'name': 'a/foo'}, {'name': 'b/bar'}]
+    assert readme_digest.format_readme_section(rows, {'a/foo': '摘要'}) == "\n### README 摘要\n\n#### a/foo\n摘要\n"
+    assert readme_digest.format_readme_section(rows, {}) == ''
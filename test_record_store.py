@@ -0,0 +1,76 @@
+# coding:utf-8
+"""
+测试定长记录存储与热榜 markdown 解析
+"""
+
+import pytest
+
+from script.utils.record_store import NEWS_SCHEMA, TRENDING_SCHEMA, RecordStore
+from script.utils.trending_records import parse_stars, parse_trending_markdown
+
+
+TRENDING_MD = """## 2026-02-16
+
+### 今日热榜 Top 15
+
+1. **[nautechsystems / nautilus_trader](https://github.com/nautechsystems/nautilus_trader)**
+   > A high-performance algorithmic trading platform
+   📦 Rust ⭐ 19,375
+
+2. **[steipete / gogcli](https://github.com/steipete/gogcli)**
+   📦 Go ⭐ 3,060
+
+"""
+
+
+def _news(title):
+    return {'title': title, 'url': f'https://example.com/{title}', 'content': f'{title} 的内容', 'source': '来源'}
+
+
+def test_parse_trending_markdown():
+    rows = parse_trending_markdown(TRENDING_MD)
+    assert [r['name'] for r in rows] == ['nautechsystems/nautilus_trader', 'steipete/gogcli']
+    assert rows[0]['description'] == 'A high-performance algorithmic trading platform'
+    assert rows[0]['stars'] == 19375
+    assert rows[1]['description'] == ''
+    assert rows[1]['language'] == 'Go'
+    assert parse_stars('1.2k') == 1200
+
+
+def test_append_and_iterate_range(tmp_path):
+    with RecordStore('news', NEWS_SCHEMA, str(tmp_path)) as store:
+        store.append_day('2026-02-14', [_news('a'), _news('b')])
+        store.append_day('2026-02-15', [_news('c')])
+        store.append_day('2026-02-16', [_news('d'), _news('e')])
+
+        assert len(store) == 5
+        assert store.dates() == ['2026-02-14', '2026-02-15', '2026-02-16']
+        titles = [r['title'] for r in store.iter_range('2026-02-15', '2026-02-16')]
+        assert titles == ['c', 'd', 'e']
+
+        record = next(store.iter_range('2026-02-16'))
+        assert isinstance(record.raw('title'), memoryview)
+        assert bytes(record.raw('content')).decode('utf-8') == 'd 的内容'
+        assert record.date == '2026-02-16'
+
+
+def test_same_day_overwrites_and_order_enforced(tmp_path):
+    with RecordStore('trending', TRENDING_SCHEMA, str(tmp_path)) as store:
+        store.append_day('2026-02-15', [{'rank': 1, 'name': 'a/a', 'stars': 10}])
+        store.append_day('2026-02-16', [{'rank': 1, 'name': 'b/b', 'stars': 20}])
+        # 重跑当天：覆盖而不是重复追加
+        store.append_day('2026-02-16', [{'rank': 1, 'name': 'c/c', 'stars': 30},
+                                        {'rank': 2, 'name': 'd/d', 'stars': 40}])
+
+        rows = [r.to_dict() for r in store.iter_range()]
+        assert [r['name'] for r in rows] == ['a/a', 'c/c', 'd/d']
+        assert rows[-1]['stars'] == 40
+
+        with pytest.raises(ValueError):
+            store.append_day('2026-02-01', [])
+
+
+def test_schema_mismatch_detected(tmp_path):
+    RecordStore('mixed', NEWS_SCHEMA, str(tmp_path)).append_day('2026-02-16', [_news('a')])
+    with pytest.raises(ValueError):
+        RecordStore('mixed', TRENDING_SCHEMA, str(tmp_path)).append_day('2026-02-17', [])
@@ -0,0 +1,100 @@
+# coding:utf-8
+"""
+测试通知消息模板渲染与渲染缓存
+"""
+
+import json
+
+from script.utils import render, storage
+
+
+NEWS = {'date': '2026-09-01', 'weekday': '星期二', 'items': [
+    {'title': '标题一', 'content': '内容一', 'source': '量子位', 'url': 'https://example.com/1'},
+    {'title': '重复', 'content': '', 'source': '', 'url': 'https://example.com/2', 'duplicate_of': 'https://example.com/1'},
+    {'title': '标题二', 'content': '内容二', 'source': '机器之心', 'url': 'https://example.com/3'},
+]}
+
+
+def test_template_dotted_fields_and_format_spec():
+    template = render.Template("{repo.name}: {stars:,} ⭐ {missing}!")
+    assert template.render({'repo': {'name': 'a/b'}, 'stars': 12345}) == "a/b: 12,345 ⭐ !"
+
+
+def test_news_markdown_matches_legacy_format():
+    content = render.payload_text(render.render_news(NEWS, 'markdown'))
+    assert content == ("# AI快讯 (2026-09-01 星期二)\n## 今日要闻\n"
+                       "### 标题一\n> 内容一\n来源：量子位 [查看详情](https://example.com/1)\n\n"
+                       "### 标题二\n> 内容二\n来源：机器之心 [查看详情](https://example.com/3)\n\n")
+
+
+def test_news_channels():
+    text = render.render_news(NEWS, 'text')
+    assert text['msgtype'] == 'text'
+    assert text['text']['content'].endswith("2. 标题二\nhttps://example.com/3\n\n")
+    news = render.render_news(NEWS, 'news')
+    assert [a['url'] for a in news['news']['articles']] == ['https://example.com/1', 'https://example.com/3']
+    assert render.render_news(NEWS, 'markdown_v2')['markdown_v2']['content'].startswith('# AI快讯')
+
+
+def test_join_within_truncates_on_part_boundary():
+    parts = ['头\n'] + [f'第{i}行' + 'x' * 100 + '\n' for i in range(100)]
+    content = render.join_within(parts, 2048)
+    assert len(content.encode('utf-8')) <= 2048
+    assert content.endswith(render.TRUNCATED_HINT)
+    assert content[:-len(render.TRUNCATED_HINT)].endswith('\n')
+
+
+def test_trending_adds_title_and_strips_markdown_for_text():
+    payload = render.render_trending("1. **[a/b](https://github.com/a/b)** ⭐ 10\n")
+    assert render.payload_text(payload).startswith(render.TRENDING_TITLE)
+    text = render.render_trending("# 报告\n> 引用 [链接](https://x.y)\n", channel='text')
+    assert render.payload_text(text) == "报告\n引用 链接 https://x.y\n"
+
+
+def test_trending_news_channel_uses_rows_in_rank_order():
+    rows = [{'rank': i, 'name': f'o/r{i}', 'url': f'https://github.com/o/r{i}', 'description': 'd' * 200,
+             'language': 'Python', 'stars': i} for i in range(1, 11)]
+    payload = render.render_trending('x', rows, 'news')
+    articles = payload['news']['articles']
+    assert payload['msgtype'] == 'news'
+    assert [a['url'] for a in articles] == [row['url'] for row in rows[:render.MAX_ARTICLES]]
+    assert len(articles[0]['description']) == 120
+
+
+def test_artifact_render_is_cached_by_content(sandbox, monkeypatch):
+    path = storage.artifact_path('ai-news', '2026-09-01', '.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(NEWS, f, ensure_ascii=False)
+
+    calls = []
+    original = render.render_news
+    monkeypatch.setattr(render, 'render_news',
+                        lambda news, channel, links=None: calls.append(channel) or original(news, channel, links))
+
+    first = render.render_news_artifact('2026-09-01', 'markdown')
+    assert render.render_news_artifact('2026-09-01', 'markdown') == first
+    render.render_news_artifact('2026-09-01', 'text')
+    assert calls == ['markdown', 'text']
+
+    # 新进程（内存缓存为空）从磁盘缓存读取
+    fresh = render.RenderCache(render._cache.directory)
+    assert render.render_news_artifact('2026-09-01', 'markdown', cache=fresh) == first
+    assert fresh.hits == 1 and calls == ['markdown', 'text']
+
+    # 产物内容变化后重新渲染
+    changed = dict(NEWS, weekday='周二')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(changed, f, ensure_ascii=False)
+    assert '周二' in render.payload_text(render.render_news_artifact('2026-09-01', 'markdown'))
+    assert calls == ['markdown', 'text', 'markdown']
+
+
+def test_trending_artifact_prefers_analysis(sandbox):
+    date = '2026-09-01'
+    with open(storage.artifact_path('github-trending', date, '.md'), 'w', encoding='utf-8') as f:
+        f.write("1. a/b\n")
+    assert render.payload_text(render.render_trending_artifact(date)).startswith(render.TRENDING_TITLE)
+    with open(storage.artifact_path('github-trending', date, '-analysis.md'), 'w', encoding='utf-8') as f:
+        f.write("# 分析报告\n")
+    assert render.payload_text(render.render_trending_artifact(date)) == "# 分析报告\n"
+    assert render.render_trending_artifact('2026-09-02') is None
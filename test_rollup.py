@@ -0,0 +1,74 @@
+# coding:utf-8
+"""
+测试周/月滚动聚合
+"""
+
+import json
+import os
+
+import pytest
+
+from script.utils import rollup, storage
+
+
+@pytest.fixture
+def sandbox(sandbox, monkeypatch):
+    monkeypatch.setattr(rollup, 'REPORTS_DIR', str(sandbox / 'output' / 'reports'))
+    monkeypatch.delenv('VOLCENGINE_API_KEY', raising=False)
+    monkeypatch.delenv('WECOM_WEBHOOK_URL', raising=False)
+    return sandbox
+
+
+def _write_day(date, titles, repos):
+    news = {'date': date, 'weekday': '', 'items': [
+        {'title': t, 'url': f'https://example.com/{i}', 'content': '', 'source': '来源：量子位'}
+        for i, t in enumerate(titles)]}
+    with open(storage.artifact_path('ai-news', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump(news, f, ensure_ascii=False)
+    rows = [{'rank': i + 1, 'name': name, 'url': f'https://github.com/{name}', 'description': '',
+             'language': 'Python', 'stars': stars} for i, (name, stars) in enumerate(repos)]
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': rows}, f)
+
+
+def test_extract_topics():
+    assert rollup.extract_topics('OpenAI 发布 GPT-5，《星辰》AI 助手上线') == ['OpenAI', 'GPT-5', '星辰']
+
+
+def test_period_of():
+    assert rollup.period_of('week', '2026-02-18') == ('2026-02-16', '2026-02-22', '2026-W08')
+    assert rollup.period_of('month', '2026-02-18') == ('2026-02-01', '2026-02-28', '2026-02')
+
+
+def test_update_is_incremental_and_idempotent(sandbox):
+    _write_day('2026-02-16', ['OpenAI 发布新模型', 'DeepSeek 开源'], [('a/a', 100), ('b/b', 50)])
+    _write_day('2026-02-17', ['OpenAI 再次更新'], [('a/a', 180)])
+
+    assert rollup.update_rollups('2026-02-16') == ['2026-W08', '2026-02']
+    assert rollup.update_rollups('2026-02-17') == ['2026-W08', '2026-02']
+    assert rollup.update_rollups('2026-02-17') == []
+
+    week = rollup.load_rollup('week', '2026-W08')
+    assert week['days'] == ['2026-02-16', '2026-02-17']
+    assert week['news']['items'] == 3
+    assert week['news']['sources'] == {'量子位': 3}
+    assert week['news']['topics']['OpenAI'] == {'count': 2, 'days': 2}
+    assert week['trending']['repos']['a/a']['days'] == 2
+    assert week['trending']['repos']['a/a']['last_stars'] - week['trending']['repos']['a/a']['first_stars'] == 80
+
+    summary = rollup.compact_summary(week)
+    assert 'OpenAI(2天/2次)' in summary
+    assert 'a/a [Python] 在榜 2 天' in summary
+
+
+def test_publish_digest_without_llm(sandbox):
+    _write_day('2026-02-16', ['OpenAI 发布新模型'], [('a/a', 100)])
+    rollup.update_rollups('2026-02-16')
+
+    path = rollup.publish_digest('week', '2026-02-23')
+    assert path == rollup.digest_path('2026-W08')
+    with open(path, encoding='utf-8') as f:
+        assert f.read().startswith('# AI 与开源周报 2026-W08')
+    # 已生成则跳过
+    assert rollup.publish_digest('week', '2026-02-24') is None
+    assert not os.path.exists(rollup.digest_path('2026-01'))
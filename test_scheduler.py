@@ -0,0 +1,57 @@
+# coding:utf-8
+"""
+测试常驻模式的 cron 调度器
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from script.utils.scheduler import CronExpression, Scheduler
+
+
+def test_cron_next_after():
+    assert CronExpression('*/30 * * * *').next_after(datetime(2026, 2, 16, 8, 5)) == datetime(2026, 2, 16, 8, 30)
+    assert CronExpression('0 * * * *').next_after(datetime(2026, 2, 16, 8, 0)) == datetime(2026, 2, 16, 9, 0)
+    assert CronExpression('0 2 * * *').next_after(datetime(2026, 12, 31, 3, 0)) == datetime(2027, 1, 1, 2, 0)
+    # 每周一 09:00（2026-02-16 是周一）
+    assert CronExpression('0 9 * * 1').next_after(datetime(2026, 2, 16, 9, 0)) == datetime(2026, 2, 23, 9, 0)
+    assert CronExpression('0 0 29 2 *').next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29, 0, 0)
+
+
+def test_cron_invalid():
+    with pytest.raises(ValueError):
+        CronExpression('* * * *')
+    with pytest.raises(ValueError):
+        CronExpression('61 * * * *')
+
+
+def test_run_pending_and_overlap_protection():
+    now = [datetime(2026, 2, 16, 8, 0)]
+    scheduler = Scheduler(clock=lambda: now[0])
+    release = threading.Event()
+    calls = []
+
+    def slow_job():
+        calls.append(now[0])
+        release.wait(5)
+
+    scheduler.add('slow', '*/30 * * * *', slow_job)
+    assert scheduler.run_pending() == []  # 首次只计算下次触发时间
+
+    now[0] = datetime(2026, 2, 16, 8, 30)
+    assert scheduler.run_pending() == ['slow']
+
+    # 上一次尚未结束，下一个触发点被跳过
+    now[0] = datetime(2026, 2, 16, 9, 0)
+    assert scheduler.run_pending() == []
+
+    release.set()
+    for thread in scheduler._threads:
+        thread.join(5)
+    now[0] = datetime(2026, 2, 16, 9, 30)
+    assert scheduler.run_pending() == ['slow']
+    for thread in scheduler._threads:
+        thread.join(5)
+    assert len(calls) == 2
@@ -0,0 +1,85 @@
+# coding:utf-8
+"""
+测试全文检索索引（中文二元组切分、增量更新、检索与摘要）
+"""
+
+import json
+
+import pytest
+
+from script.utils import search_index
+
+
+NEWS = {'date': '2026-02-16', 'weekday': '周一', 'items': [
+    {'title': '豆包大模型2.0正式发布', 'url': 'https://a.com/1', 'source': '字节跳动',
+     'content': '字节跳动今日宣布豆包大模型正式进入2.0阶段，发布Seed2.0。'},
+    {'title': 'Meta 发布 Llama 4', 'url': 'https://a.com/2', 'source': 'Meta',
+     'content': 'Meta 发布了 Llama 4 系列模型。'},
+    {'title': '重复条目', 'url': 'https://a.com/3', 'source': 'x', 'content': '豆包', 'duplicate_of': 'https://a.com/1'},
+]}
+
+ANALYSIS = """# GitHub Trending AI 分析报告
+
+## 趋势概览
+今天 AI Agent 项目占据主导。
+
+## 推荐关注
+推荐 nautilus_trader 量化交易框架。
+"""
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    artifacts = {
+        ('ai-news', '2026-02-16', '.json'): json.dumps(NEWS, ensure_ascii=False),
+        ('github-trending', '2026-02-16', '-analysis.md'): ANALYSIS,
+    }
+    monkeypatch.setattr(search_index, 'read_artifact', lambda kind, date, suffix: artifacts.get((kind, date, suffix)))
+    path = str(tmp_path / 'search.sqlite')
+    return path, artifacts
+
+
+def test_tokenize():
+    assert search_index.tokenize('豆包大模型 GPT-5') == '豆包 包大 大模 模型 gpt-5'
+    assert search_index.build_match_query('大模型 agent') == '"大模 模型" "agent"'
+
+
+def test_index_and_search(db):
+    path, _ = db
+    assert search_index.update_index(['2026-02-16'], path) == 5
+
+    results = search_index.search('豆包 大模型', path=path)
+    assert len(results) == 1
+    assert results[0]['url'] == 'https://a.com/1'
+    assert '【豆包】' in results[0]['snippet']
+
+    results = search_index.search('agent', kind='analysis', path=path)
+    assert [r['title'] for r in results] == ['趋势概览 (2026-02-16)']
+
+
+def test_incremental_update(db):
+    path, artifacts = db
+    search_index.update_index(['2026-02-16'], path)
+    # 内容未变化时不重复写入
+    assert search_index.update_index(['2026-02-16'], path) == 0
+
+    news = dict(NEWS, items=NEWS['items'][:1])
+    artifacts[('ai-news', '2026-02-16', '.json')] = json.dumps(news, ensure_ascii=False)
+    assert search_index.update_index(['2026-02-16'], path) == 1
+    assert search_index.search('llama', path=path) == []
+
+
+def test_update_since_indexes_missing_dates(db, monkeypatch):
+    path, artifacts = db
+    artifacts[('ai-news', '2026-02-10', '.json')] = json.dumps(dict(NEWS, date='2026-02-10'), ensure_ascii=False)
+    monkeypatch.setattr(search_index, 'list_dates', lambda kind, suffix: sorted(
+        {d for k, d, s in artifacts if k == kind and s == suffix}))
+    search_index.update_index(['2026-02-16'], path)
+    # 更早但从未索引过的日期会补上
+    assert search_index.update_index(path=path, since='2026-02-15') == 2
+
+    # 已索引的旧日期不再重新读取，近期的仍会检查
+    artifacts[('ai-news', '2026-02-10', '.json')] = json.dumps(dict(NEWS, items=[]), ensure_ascii=False)
+    artifacts[('ai-news', '2026-02-16', '.json')] = json.dumps(dict(NEWS, items=NEWS['items'][:1]), ensure_ascii=False)
+    assert search_index.update_index(path=path, since='2026-02-15') == 1
+    assert [r['date'] for r in search_index.search('llama', path=path)] == ['2026-02-10']
@@ -0,0 +1,84 @@
+# coding:utf-8
+"""
+测试往期热榜相似项目检索
+"""
+
+import json
+
+import numpy as np
+
+from script.utils import similar_repos, storage
+
+
+def _row(name, description, language='Python', topics=None):
+    return {'name': name, 'url': f'https://github.com/{name}', 'description': description,
+            'language': language, 'stars': 1, 'topics': topics or []}
+
+
+HISTORY = [
+    ('2026-09-01', [_row('a/llm-agent', 'Autonomous LLM agent framework for coding tasks'),
+                    _row('b/vector-db', 'Fast vector database written in Rust', 'Rust')]),
+    ('2026-09-02', [_row('c/web-ui', 'A React component library for dashboards', 'TypeScript'),
+                    _row('a/llm-agent', 'Autonomous LLM agent framework for coding tasks')]),
+]
+
+
+def _write(date, rows):
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': rows}, f)
+
+
+def test_vectorize_is_stable_and_language_aware():
+    row = _row('x/y', '大模型推理加速 inference')
+    assert np.array_equal(similar_repos.vectorize(row), similar_repos.vectorize(dict(row)))
+    assert not np.array_equal(similar_repos.vectorize(row), similar_repos.vectorize({**row, 'language': 'Go'}))
+    assert similar_repos.vectorize({'name': '', 'description': ''}).any() is np.False_
+
+
+def test_search_ranks_past_repos_and_excludes_self(tmp_path):
+    index = similar_repos.SimilarIndex(str(tmp_path))
+    for date, rows in HISTORY:
+        index.add(date, rows)
+    assert len(index) == 3
+    assert index.repos['a/llm-agent'] == {'first_seen': '2026-09-01', 'last_seen': '2026-09-02',
+                                          'text': similar_repos.repo_text(HISTORY[0][1][0])}
+
+    today = [_row('d/code-agent', 'LLM coding agent framework'), _row('a/llm-agent', 'Autonomous LLM agent'),
+             _row('e/unrelated', 'Knitting patterns', 'Shell')]
+    matches = index.search(today, before='2026-09-03')
+    assert matches[0][0]['name'] == 'a/llm-agent'
+    assert matches[0][0]['score'] > 0.5
+    assert all(m['name'] != 'a/llm-agent' for m in matches[1])
+    assert matches[2] == []
+
+    # before 之后才首次上榜的仓库不算“往期”
+    assert index.search(today[:1], before='2026-09-02', min_score=0.0)[0][0]['name'] != 'c/web-ui'
+
+
+def test_add_replaces_changed_vector_and_keeps_df(tmp_path):
+    index = similar_repos.SimilarIndex(str(tmp_path))
+    for date, rows in HISTORY:
+        index.add(date, rows)
+    index.add('2026-09-03', [_row('b/vector-db', 'Embedded key value store', 'Rust')])
+    assert len(index) == 3
+    assert np.array_equal(index.df, np.count_nonzero(index.vectors, axis=0))
+    assert index.search([_row('z/kv', 'key value store', 'Rust')], min_score=0.1)[0][0]['name'] == 'b/vector-db'
+
+
+def test_similar_today_indexes_incrementally(sandbox):
+    for date, rows in HISTORY:
+        _write(date, rows)
+    directory = str(sandbox / 'similar')
+    today = [_row('d/code-agent', 'LLM coding agent framework')]
+    matches = similar_repos.similar_today('2026-09-03', today, similar_repos.SimilarIndex(directory))
+    assert matches[0][0]['name'] == 'a/llm-agent'
+
+    index = similar_repos.SimilarIndex(directory)
+    assert index.dates == {'2026-09-01', '2026-09-02', '2026-09-03'}
+    assert 'd/code-agent' in index.repos
+    assert similar_repos.update_index(index, end='2026-09-03') == []
+
+    section = similar_repos.format_similar_section(today, matches)
+    assert section.startswith('\n### 🧭 相似的往期热榜项目')
+    assert '- **d/code-agent** ↔ a/llm-agent（' in section
+    assert similar_repos.format_similar_section(today, [[]]) == ''
@@ -0,0 +1,131 @@
+# coding:utf-8
+"""
+测试数据源插件框架（解析规则、字段校验、合并存储与并发运行）
+"""
+
+import json
+
+import pytest
+
+from script.utils import sources, storage
+from script.utils.sources import Source, coerce_item, discover_sources, parse, run_sources, save_items
+
+
+ATOM = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <entry>
+    <id>http://arxiv.org/abs/2602.00001v1</id>
+    <title>Scaling
+      Laws</title>
+    <summary>We study scaling.</summary>
+    <author><name>Alice</name></author>
+    <author><name>Bob</name></author>
+    <arxiv:primary_category term="cs.CL"/>
+    <published>2026-02-16T00:00:00Z</published>
+  </entry>
+</feed>"""
+
+HTML = """<ul>
+  <li class="item"><a href="https://a.example">标题 A</a><span class="score">1,234 points</span></li>
+  <li class="item"><a href="https://b.example">标题 B</a><span class="score">56 points</span></li>
+  <li class="item"><span class="score">7 points</span></li>
+</ul>"""
+
+
+class HtmlSource(Source):
+    SOURCE_ID = 'demo'
+    URLS = ['https://demo.example/{date}', 'https://demo.example/{date}?page=2']
+    EXTRACT = {'items': 'li.item', 'fields': {'title': 'a', 'url': {'css': 'a', 'attr': 'href'}, 'score': '.score'}}
+    SCHEMA = {'title': str, 'url': str, 'score': int}
+
+
+@pytest.fixture
+def sandbox(sandbox, monkeypatch):
+    monkeypatch.setattr(sources, 'SOURCE_CACHE_DIR', str(sandbox / 'cache'))
+    return sandbox
+
+
+def test_discover_builtin_plugins(monkeypatch):
+    monkeypatch.delenv('SOURCES_ENABLED', raising=False)
+    ids = [s.SOURCE_ID for s in discover_sources()]
+    assert {'hackernews', 'arxiv', 'producthunt'} <= set(ids)
+    monkeypatch.setenv('SOURCES_ENABLED', 'arxiv')
+    assert [s.SOURCE_ID for s in discover_sources()] == ['arxiv']
+
+
+def test_parse_html_with_schema():
+    items = parse(HtmlSource(), HTML)
+    assert items == [{'title': '标题 A', 'url': 'https://a.example', 'score': 1234},
+                     {'title': '标题 B', 'url': 'https://b.example', 'score': 56}]
+
+
+def test_parse_atom_feed():
+    from script.sources.arxiv import ArxivSource
+    [item] = parse(ArxivSource(), ATOM)
+    assert item['title'] == 'Scaling Laws'
+    assert item['url'] == 'http://arxiv.org/abs/2602.00001v1'
+    assert item['authors'] == ['Alice', 'Bob']
+    assert item['category'] == 'cs.CL'
+
+
+def test_parse_json_api():
+    from script.sources.hackernews import HackerNewsSource
+    body = json.dumps({'hits': [
+        {'objectID': '1', 'title': 'Show HN', 'url': 'https://x.example', 'points': 10, 'num_comments': 2},
+        {'objectID': '2', 'title': 'Ask HN', 'url': None, 'points': '5'},
+        {'objectID': '3', 'title': None},
+    ]})
+    items = parse(HackerNewsSource(), body)
+    assert [i['id'] for i in items] == ['1', '2']
+    assert items[1]['url'] == 'https://news.ycombinator.com/item?id=2'
+    assert items[1]['points'] == 5
+
+
+def test_coerce_item_drops_missing_required():
+    assert coerce_item({'title': ' t '}, {'title': str, 'url': str}, ('title', 'url')) is None
+
+
+def test_run_sources_merges_by_key(sandbox):
+    source = HtmlSource()
+    fetched = []
+
+    def fake_fetch(src, url):
+        fetched.append(url)
+        return HTML
+
+    stats = run_sources([source], date='2026-02-16', fetch=fake_fetch)
+    assert sorted(fetched) == ['https://demo.example/2026-02-16', 'https://demo.example/2026-02-16?page=2']
+    assert stats == {'demo': {'items': 4, 'new': 2, 'failed': 0}}
+
+    # 再次运行没有新条目
+    assert run_sources([source], date='2026-02-16', fetch=fake_fetch)['demo']['new'] == 0
+    assert save_items(source, '2026-02-16', [{'title': 'C', 'url': 'https://c.example'}]) == 1
+    path = storage.artifact_path('sources/demo', '2026-02-16', '.json', create=False)
+    with open(path, encoding='utf-8') as f:
+        assert [i['url'] for i in json.load(f)['items']] == ['https://a.example', 'https://b.example', 'https://c.example']
+
+
+def test_fetch_url_keeps_validators_on_bare_304(sandbox, monkeypatch):
+    class Response:
+        def __init__(self, status_code, text='', headers=None):
+            self.status_code, self.text, self.headers, self.encoding = status_code, text, headers or {}, 'utf-8'
+
+        def raise_for_status(self):
+            pass
+
+    source = HtmlSource()
+    source.CACHE_TTL = 0
+    replies = [Response(200, HTML, {'ETag': '"v1"', 'Last-Modified': 'Mon, 16 Feb 2026 00:00:00 GMT'}),
+               Response(304), Response(304)]
+    sent = []
+
+    def fake_get(url, headers=None, timeout=None):
+        sent.append(headers)
+        return replies.pop(0)
+
+    monkeypatch.setattr(sources, 'hedged_get', fake_get)
+    for _ in range(3):
+        assert sources.fetch_url(source, 'https://demo.example/x') == HTML
+    # 第二次的 304 没带校验头，第三次请求仍然是条件请求
+    assert sent[2]['If-None-Match'] == '"v1"'
+    assert sent[2]['If-Modified-Since'] == 'Mon, 16 Feb 2026 00:00:00 GMT'
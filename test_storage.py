@@ -0,0 +1,86 @@
+# coding:utf-8
+"""
+测试输出目录分片布局、错位文件迁移与月归档
+"""
+
+import os
+
+from script.utils import manifest, storage
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_artifact_path_is_sharded_by_month(sandbox):
+    path = storage.artifact_path('ai-news', '2026-02-16', '.json')
+    assert path == str(sandbox / 'output' / 'ai-news' / '2026' / '02' / '2026-02-16.json')
+    assert os.path.isdir(os.path.dirname(path))
+
+
+def test_relocate_misplaced(sandbox):
+    """按类别平铺、按年平铺和根目录年份目录中的文件都会迁移到月分片"""
+    _write(str(sandbox / 'output' / 'ai-news' / '2026-02-15.json'), '{}')
+    _write(str(sandbox / 'output' / 'ai-news' / '2025' / '2025-03-02.html'), '<html/>')
+    _write(str(sandbox / '2026' / '2026-02-15-analysis.md'), '# 分析')
+
+    assert storage.relocate_misplaced() == 3
+    assert storage.find_artifact('ai-news', '2026-02-15', '.json').endswith(os.path.join('2026', '02', '2026-02-15.json'))
+    assert storage.find_artifact('ai-news', '2025-03-02', '.html').endswith(os.path.join('2025', '03', '2025-03-02.html'))
+    assert storage.find_artifact('github-trending', '2026-02-15', '-analysis.md')
+    assert not os.path.exists(sandbox / '2026')
+
+    # 迁移前后的路径都登记到了产物清单，发布时会一并暂存
+    entries = manifest.load_manifest()
+    assert entries['output/ai-news/2026-02-15.json'] is None
+    assert entries['output/ai-news/2026/02/2026-02-15.json']
+
+
+def test_relocate_and_compact_write_manifest_once(sandbox, monkeypatch):
+    """批量迁移/打包时清单只写回一次，条目与逐个登记一致"""
+    for day in range(1, 21):
+        _write(str(sandbox / 'output' / 'ai-news' / f'2026-01-{day:02d}.json'), '{}')
+    saves = []
+    original = manifest._save_manifest
+    monkeypatch.setattr(manifest, '_save_manifest', lambda entries: saves.append(len(entries)) or original(entries))
+
+    assert storage.relocate_misplaced() == 20
+    assert saves == [40]
+    assert storage.compact_month('ai-news', '2026', '01') == 20
+    assert len(saves) == 2
+    entries = manifest.load_manifest()
+    assert entries[os.path.relpath(storage.bundle_path('ai-news', '2026', '01'), sandbox).replace(os.sep, '/')]
+    assert entries['output/ai-news/2026/01/2026-01-05.json'] is None
+
+    # 嵌套时由最外层写回；批量之外仍逐个写回
+    with manifest.batch():
+        with manifest.batch():
+            manifest.record_removal(str(sandbox / 'a.md'))
+        assert len(saves) == 2
+    assert len(saves) == 3 and manifest.load_manifest()['a.md'] is None
+
+
+def test_relocate_keeps_conflicting_files(sandbox):
+    """目标已存在且内容不同时不覆盖"""
+    _write(str(sandbox / 'output' / 'github-trending' / '2026-02-15.md'), 'old')
+    _write(storage.artifact_path('github-trending', '2026-02-15', '.md'), 'new')
+
+    assert storage.relocate_misplaced() == 0
+    assert storage.read_artifact('github-trending', '2026-02-15', '.md') == 'new'
+
+
+def test_compact_and_read_from_bundle(sandbox):
+    """过去月份打包后仍能按日期随机读取，当前月份保持松散"""
+    for day in ('2026-01-30', '2026-01-31', '2026-02-01'):
+        _write(storage.artifact_path('ai-news', day, '.json'), f'{{"date": "{day}"}}')
+
+    assert storage.compact_archives('2026-02-10') == 2
+    assert os.path.exists(storage.bundle_path('ai-news', '2026', '01'))
+    assert not os.path.exists(storage.shard_dir('ai-news', '2026-01-30'))
+
+    assert storage.read_artifact('ai-news', '2026-01-31', '.json') == '{"date": "2026-01-31"}'
+    assert storage.read_artifact('ai-news', '2026-01-29', '.json') is None
+    assert storage.list_dates('ai-news', '.json') == ['2026-01-30', '2026-01-31', '2026-02-01']
+    assert storage.list_dates('ai-news', '.json', start='2026-01-31', end='2026-01-31') == ['2026-01-31']
@@ -0,0 +1,115 @@
+# coding:utf-8
+"""
+测试离线抽取式摘要
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from script.utils import render, storage, summarizer
+
+
+def _row(rank, name, description, language='Python', stars_today=0):
+    return {'rank': rank, 'name': name, 'url': f'https://github.com/{name}', 'description': description,
+            'language': language, 'stars': 1000, 'stars_today': stars_today}
+
+
+def test_split_sentences():
+    text = "第一句话在这里。第二句话也在这里！\nHi. This is English text. 太短"
+    assert summarizer.split_sentences(text) == ['第一句话在这里。', '第二句话也在这里！', 'This is English text.']
+
+
+def test_tfidf_rows_are_normalized():
+    matrix, vocabulary = summarizer.tfidf_matrix(['大模型 推理 加速', '大模型 训练', ''])
+    assert matrix.shape == (3, len(vocabulary))
+    assert np.allclose(np.linalg.norm(matrix[:2], axis=1), 1.0)
+    assert not matrix[2].any()
+
+
+def test_textrank_prefers_central_node():
+    similarity = np.array([[1, .8, .8, 0], [.8, 1, .1, 0], [.8, .1, 1, 0], [0, 0, 0, 1]], dtype=float)
+    scores = summarizer.textrank(similarity)
+    assert scores.sum() == pytest.approx(1.0)
+    assert scores.argmax() == 0
+    assert scores[3] == scores.min()
+
+
+def test_summarize_keeps_order_and_skips_redundant():
+    text = ("PyTorch 发布新版本，编译速度大幅提升。PyTorch 新版本编译速度大幅提升。"
+            "新版本同时改进了分布式训练。今天天气很好。")
+    summary = summarizer.summarize(text, max_sentences=2)
+    assert summary.count('编译速度') == 1
+    assert '天气' not in summary
+    assert len(summarizer.summarize(text, max_sentences=3, max_chars=30)) <= 30
+    assert summarizer.summarize('只有一句', 3) == '只有一句'
+
+
+def test_summarize_trending_is_fast_and_compact():
+    rows = [_row(i + 1, f'owner{i}/agent-{i}', f'An AI agent framework number {i} for coding tasks.',
+                 'TypeScript' if i % 2 else 'Python', stars_today=i * 10) for i in range(25)]
+    started = time.perf_counter()
+    overview = summarizer.summarize_trending(rows, top=5)
+    assert time.perf_counter() - started < 0.5
+
+    assert overview.startswith('# GitHub Trending 今日速览')
+    assert 'Python 13、TypeScript 12' in overview
+    assert 'agent' in overview.split('主题词: ')[1].split('\n')[0]
+    assert overview.count('⭐ +') == 5
+    assert len(overview.encode('utf-8')) < 2048
+
+
+def test_summarize_news_picks_distinct_items_and_keeps_llm_summary():
+    items = [{'title': 'OpenAI 发布 GPT 新模型', 'content': 'OpenAI 今天发布了新的 GPT 模型，推理能力大幅提升。', 'url': '1'},
+             {'title': 'OpenAI 发布 GPT 新模型', 'content': 'OpenAI 今天发布了新的 GPT 模型，推理能力大幅提升。', 'url': '2'},
+             {'title': '宇树机器人量产', 'content': '宇树科技宣布人形机器人进入量产阶段。', 'url': '3',
+              'summary': '模型摘要'},
+             {'title': '重复', 'content': '', 'url': '4', 'duplicate_of': '1'}]
+    picked = summarizer.summarize_news(items, limit=3)
+    assert [item['url'] for item in picked] == ['1', '3']
+    assert picked[0]['summary'].startswith('OpenAI 今天发布了新的 GPT 模型')
+    assert picked[1]['summary'] == '模型摘要'
+
+
+def test_trending_source_falls_back_to_offline_summary(sandbox):
+    date = '2026-09-01'
+    with open(storage.artifact_path('github-trending', date, '.md'), 'w', encoding='utf-8') as f:
+        f.write('# 原始榜单\n')
+    assert render.trending_source(date)[0] == '原始数据'
+
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': [_row(1, 'a/b', 'A fast agent runtime.', stars_today=42)]}, f)
+    label, document, _ = render.trending_source(date)
+    assert label == '离线摘要'
+    assert '[a/b](https://github.com/a/b)** ⭐ +42' in document
+
+    with open(storage.artifact_path('github-trending', date, '-analysis.md'), 'w', encoding='utf-8') as f:
+        f.write('# 分析\n')
+    assert render.trending_source(date)[0] == 'AI分析'
+
+
+def test_trending_cache_hit_skips_offline_summary(sandbox, monkeypatch):
+    date = '2026-09-01'
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': [_row(1, 'a/b', 'A fast agent runtime.', stars_today=42)]}, f)
+    first = render.render_trending_artifact(date)
+
+    def fail(rows, top=5):
+        raise AssertionError('缓存命中时不应重新生成摘要')
+
+    monkeypatch.setattr(render, 'summarize_trending', fail)
+    assert render.render_trending_artifact(date) == first
+
+
+def test_compress_markdown_keeps_structure():
+    long_text = '这个项目提供高性能的推理引擎。' * 10 + '它支持多种硬件后端与量化格式。' * 10
+    markdown = f"### 今日热榜\n\n1. **[a/b](https://github.com/a/b)**\n   > {long_text}\n\n#### a/b\n{long_text}\n短段落\n"
+    compressed = summarizer.compress_markdown(markdown, max_chars=60)
+    lines = compressed.splitlines()
+    assert lines[:3] == ['### 今日热榜', '', '1. **[a/b](https://github.com/a/b)**']
+    assert lines[3].startswith('   > ') and len(lines[3]) <= 65
+    assert lines[5] == '#### a/b' and len(lines[6]) <= 60
+    assert compressed.endswith('\n') and len(compressed) < len(markdown) / 4
+    assert summarizer.compress_markdown('#### x\n短段落\n') == '#### x\n短段落\n'
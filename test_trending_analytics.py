@@ -0,0 +1,83 @@
+# coding:utf-8
+"""
+测试 Trending 历史的向量化统计
+"""
+
+import json
+
+import numpy as np
+
+from script.utils import storage
+from script.utils.record_store import trending_store
+from script.utils.trending_analytics import (TrendingHistory, build_report, daily_median_stars, days_on_list,
+                                             language_share, load_history, period_bounds, retention_curve,
+                                             rolling_mean)
+from datetime import date
+
+
+def _history():
+    d = lambda s: date.fromisoformat(s).toordinal()
+    rows = [
+        # day, repo, language, stars, rank
+        ('2026-02-16', 'a/a', 'Python', 100, 1),
+        ('2026-02-16', 'b/b', 'Rust', 300, 2),
+        ('2026-02-17', 'a/a', 'Python', 120, 1),
+        ('2026-02-17', 'c/c', 'Python', 50, 2),
+        ('2026-02-17', 'b/b', 'Rust', 310, 3),
+        ('2026-02-19', 'a/a', 'Python', 150, 1),
+        ('2026-02-23', 'c/c', 'Go', 60, 1),
+    ]
+    return TrendingHistory([d(r[0]) for r in rows], [r[1] for r in rows], [r[2] for r in rows],
+                           [r[3] for r in rows], [r[4] for r in rows])
+
+
+def test_language_share_by_week():
+    periods, languages, share = language_share(_history(), 'week')
+    assert len(periods) == 2
+    assert languages == ['Go', 'Python', 'Rust']
+    np.testing.assert_allclose(share[0], [0, 4 / 6, 2 / 6])
+    np.testing.assert_allclose(share[1], [1, 0, 0])
+
+
+def test_daily_median_and_rolling():
+    days, medians = daily_median_stars(_history())
+    assert medians.tolist() == [200.0, 120.0, 150.0, 60.0]
+    assert rolling_mean([1, 2, 3, 4], 2).tolist() == [1.0, 1.5, 2.5, 3.5]
+
+
+def test_days_on_list_and_retention():
+    history = _history()
+    total, longest = days_on_list(history)
+    by_repo = dict(zip(history.repos, zip(total.tolist(), longest.tolist())))
+    assert by_repo == {'a/a': (3, 2), 'b/b': (2, 2), 'c/c': (2, 1)}
+    np.testing.assert_allclose(retention_curve(history, max_days=3), [1.0, 1.0, 1 / 3])
+
+
+def test_period_bounds_and_report():
+    assert period_bounds('week', '2026-02-25') == ('2026-02-16', '2026-02-22', '2026-W08')
+    assert period_bounds('month', '2026-03-01') == ('2026-02-01', '2026-02-28', '2026-02')
+
+    report = build_report(_history(), 'week', '2026-02-16', '2026-02-22', '2026-W08')
+    assert '# GitHub Trending 周报 2026-W08' in report
+    assert '| Python | 66.7% |' in report
+    assert '| a/a | 3 | 2 |' in report
+
+
+def test_load_history_fills_dates_missing_from_store(sandbox, tmp_path):
+    def rows(day):
+        return [{'rank': 1, 'name': f'o/{day}', 'url': f'https://github.com/o/{day}', 'description': '',
+                 'language': 'Python', 'stars': 10}]
+
+    days = ['2026-02-16', '2026-02-17', '2026-02-18']
+    for day in days:
+        with open(storage.artifact_path('github-trending', day, '.json'), 'w', encoding='utf-8') as f:
+            json.dump({'date': day, 'items': rows(day)}, f)
+    # 存储里只有最后一天（例如缓存被清理后只追加了当天）
+    records = str(tmp_path / 'records')
+    with trending_store(records) as store:
+        store.append_day('2026-02-18', rows('2026-02-18'))
+
+    history = load_history('2026-02-16', '2026-02-18', directory=records)
+    assert len(history) == 3
+    assert history.repos == ['o/2026-02-16', 'o/2026-02-17', 'o/2026-02-18']
+    assert len(load_history('2026-02-17', '2026-02-17', directory=records)) == 1
@@ -0,0 +1,68 @@
+# coding:utf-8
+"""
+测试热榜逐日对比
+"""
+
+import json
+
+from script.utils import render, storage, trending_diff
+
+
+def _rows(*names):
+    return [{'rank': i + 1, 'name': name, 'url': f'https://github.com/{name}', 'description': '',
+             'language': 'Python', 'stars': 1} for i, name in enumerate(names)]
+
+
+def _write(date, *names):
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': _rows(*names)}, f)
+
+
+def test_compute_diff():
+    history = [('2026-09-02', _rows('a/a', 'b/b', 'c/c', 'd/d')),
+               ('2026-09-01', _rows('a/a', 'e/e', 'b/b')),
+               ('2026-08-31', _rows('a/a'))]
+    diff = trending_diff.compute_diff('2026-09-03', _rows('c/c', 'a/a', 'e/e', 'f/f', 'b/b'), history)
+
+    assert diff['previous'] == '2026-09-02'
+    assert diff['entered'] == [{'name': 'e/e', 'rank': 3, 'returning': True},
+                               {'name': 'f/f', 'rank': 4, 'returning': False}]
+    assert diff['exited'] == [{'name': 'd/d', 'last_rank': 4}]
+    assert diff['moved'] == [{'name': 'b/b', 'rank': 5, 'previous_rank': 2, 'delta': -3},
+                             {'name': 'c/c', 'rank': 1, 'previous_rank': 3, 'delta': 2},
+                             {'name': 'a/a', 'rank': 2, 'previous_rank': 1, 'delta': -1}]
+    assert diff['streaks'] == {'a/a': 4, 'b/b': 3, 'c/c': 2, 'e/e': 1, 'f/f': 1}
+
+
+def test_streak_stops_at_missing_day():
+    history = [('2026-09-02', _rows('a/a')), ('2026-08-30', _rows('a/a'))]
+    diff = trending_diff.compute_diff('2026-09-03', _rows('a/a'), history)
+    assert diff['streaks'] == {'a/a': 2}
+
+
+def test_first_day_has_no_section():
+    diff = trending_diff.compute_diff('2026-09-03', _rows('a/a'), [])
+    assert diff['previous'] is None and diff['entered'][0]['returning'] is False
+    assert trending_diff.format_diff_section(diff) == ''
+
+
+def test_diff_artifact_section_and_wecom(sandbox):
+    _write('2026-09-01', 'a/a', 'b/b')
+    _write('2026-09-02', 'b/b', 'c/c')
+    diff = trending_diff.diff_today('2026-09-02', _rows('b/b', 'c/c'))
+    assert trending_diff.load_diff('2026-09-02') == diff
+
+    section = trending_diff.format_diff_section(diff)
+    assert section.splitlines()[1:] == [
+        '### 📈 榜单变化（对比 2026-09-01）', '',
+        '- 新上榜: c/c #2',
+        '- 跌出榜单: a/a（原 #1）',
+        '- 排名上升: b/b ↑1（#1）',
+        '- 连续在榜: b/b 2 天',
+    ]
+
+    # AI 分析报告推送时补上榜单变化
+    with open(storage.artifact_path('github-trending', '2026-09-02', '-analysis.md'), 'w', encoding='utf-8') as f:
+        f.write('# 分析报告\n')
+    content = render.payload_text(render.render_trending_artifact('2026-09-02'))
+    assert content == '# 分析报告\n' + section
@@ -0,0 +1,67 @@
+# coding:utf-8
+"""
+测试 Trending 快照时间序列与星标增速计算
+"""
+
+import math
+
+import pytest
+
+from script.utils import manifest
+from script.utils.trending_snapshots import (SNAPSHOT_DTYPE, append_snapshot, compute_velocity,
+                                             fastest_rising, format_rising_section, load_snapshots)
+
+
+HOUR = 3600
+T0 = 1771200000  # 2026-02-16
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, 'MANIFEST_FILE', str(tmp_path / '.manifest.json'))
+    return str(tmp_path / 'snapshots')
+
+
+def _rows(a_stars, b_stars):
+    return [{'name': 'owner/a', 'stars': a_stars, 'stars_today': 10, 'rank': 1},
+            {'name': 'owner/b', 'stars': b_stars, 'stars_today': 5, 'rank': 2}]
+
+
+def test_append_and_load(snapshot_dir):
+    append_snapshot(_rows(100, 50), ts=T0, directory=snapshot_dir)
+    append_snapshot(_rows(110, 51), ts=T0 + HOUR, directory=snapshot_dir)
+
+    snapshots = load_snapshots(directory=snapshot_dir)
+    assert snapshots.dtype == SNAPSHOT_DTYPE
+    assert SNAPSHOT_DTYPE.itemsize == 18
+    assert len(snapshots) == 4
+    assert list(snapshots['repo']) == [0, 1, 0, 1]
+    assert len(load_snapshots(since_ts=T0 + HOUR, directory=snapshot_dir)) == 2
+
+
+def test_velocity_and_acceleration(snapshot_dir):
+    append_snapshot(_rows(100, 50), ts=T0, directory=snapshot_dir)
+    append_snapshot(_rows(110, 51), ts=T0 + HOUR, directory=snapshot_dir)
+    append_snapshot(_rows(140, 52), ts=T0 + 2 * HOUR, directory=snapshot_dir)
+    # 只出现一次的仓库没有增速
+    append_snapshot([{'name': 'owner/c', 'stars': 9, 'rank': 3}], ts=T0 + 2 * HOUR, directory=snapshot_dir)
+
+    result = compute_velocity(load_snapshots(directory=snapshot_dir))
+    by_repo = dict(zip(result['repo'].tolist(), zip(result['velocity'], result['acceleration'])))
+    assert by_repo[0] == (30.0, 20.0)
+    assert by_repo[1] == (1.0, 0.0)
+    assert math.isnan(by_repo[2][0])
+
+    rising = fastest_rising(now=T0 + 2 * HOUR, directory=snapshot_dir)
+    assert [r['name'] for r in rising] == ['owner/a', 'owner/b']
+    section = format_rising_section(rising)
+    assert '上升最快' in section and '+30.0 ⭐/小时' in section and '加速' in section
+
+
+def test_dropped_repos_excluded(snapshot_dir):
+    append_snapshot(_rows(100, 50), ts=T0, directory=snapshot_dir)
+    append_snapshot(_rows(200, 60), ts=T0 + HOUR, directory=snapshot_dir)
+    append_snapshot([{'name': 'owner/b', 'stars': 61, 'rank': 1}], ts=T0 + 2 * HOUR, directory=snapshot_dir)
+
+    rising = fastest_rising(now=T0 + 2 * HOUR, directory=snapshot_dir)
+    assert [r['name'] for r in rising] == ['owner/b']
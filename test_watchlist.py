@@ -0,0 +1,83 @@
+# coding:utf-8
+"""
+测试关注列表（Aho-Corasick 多模式匹配）与优先提醒
+"""
+
+import json
+import random
+
+import pytest
+
+from script.utils import storage, watchlist
+
+
+@pytest.fixture
+def sandbox(sandbox, monkeypatch):
+    monkeypatch.setenv('WECOM_WEBHOOK_URL', 'https://example.com/hook')
+    monkeypatch.delenv('WATCHLIST_WEBHOOK_URL', raising=False)
+    return sandbox
+
+
+def test_automaton_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        keywords = list({''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(10)})
+        text = ''.join(rng.choice('abcd') for _ in range(50))
+        matcher = watchlist.AhoCorasick(keywords, word_boundary=False)
+        expected = sorted((i, k) for k in keywords for i in range(len(text)) if text.startswith(k, i))
+        assert sorted(matcher.finditer(text)) == expected
+
+
+def test_word_boundary_and_chinese():
+    matcher = watchlist.AhoCorasick(['AI', 'Qwen', 'GPT-5', '通义千问', 'ollama/ollama'])
+    assert matcher.search('He said nothing about Qwenlike models') == []
+    assert matcher.search('阿里发布通义千问3，Qwen 开源；OpenAI 的 GPT-5 与 AI 助手') == ['通义千问', 'Qwen', 'GPT-5', 'AI']
+    assert matcher.search('ollama/ollama') == ['ollama/ollama']
+
+
+def test_large_watchlist():
+    keywords = [f'kw{i:05d}' for i in range(5000)] + ['DeepSeek']
+    matcher = watchlist.AhoCorasick(keywords)
+    text = ('无关内容 ' * 200) + 'kw04999 与 deepseek 发布'
+    assert matcher.search(text) == ['kw04999', 'DeepSeek']
+
+
+def test_parse_and_reload(tmp_path):
+    path = tmp_path / 'watchlist.txt'
+    path.write_text('# 注释\nOpenAI\n[模型]\nGPT-5\n\n[仓库]\nollama/ollama\n', encoding='utf-8')
+    compiled = watchlist.load_watchlist(str(path))
+    assert compiled.groups == {'OpenAI': '关注', 'GPT-5': '模型', 'ollama/ollama': '仓库'}
+    # 文件未变化时复用已编译的自动机
+    assert watchlist.load_watchlist(str(path)) is compiled
+    path.write_text('Claude\n', encoding='utf-8')
+    assert watchlist.load_watchlist(str(path)).match('Claude 4 发布') == [('Claude', '关注')]
+
+
+def test_alert_today_sends_once(sandbox):
+    date = '2026-09-01'
+    news = {'date': date, 'weekday': '', 'items': [
+        {'title': 'OpenAI 发布新模型', 'content': '', 'url': 'https://example.com/1'},
+        {'title': 'OpenAI 发布新模型', 'content': '', 'url': 'https://example.com/2', 'duplicate_of': 'https://example.com/1'},
+        {'title': '无关新闻', 'content': '内容', 'url': 'https://example.com/3'},
+    ]}
+    with open(storage.artifact_path('ai-news', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump(news, f, ensure_ascii=False)
+    with open(storage.artifact_path('github-trending', date, '.json'), 'w', encoding='utf-8') as f:
+        json.dump({'date': date, 'items': [
+            {'rank': 1, 'name': 'ollama/ollama', 'url': 'https://github.com/ollama/ollama', 'description': ''},
+            {'rank': 2, 'name': 'x/y', 'url': 'https://github.com/x/y', 'description': 'A Qwen fine-tuning kit'},
+        ]}, f)
+
+    compiled = watchlist.Watchlist({'OpenAI': '厂商', 'Qwen': '模型', 'ollama/ollama': '仓库'})
+    sent = []
+    send = lambda url, content: sent.append(content) or True
+    log = watchlist.SentLog(str(sandbox / 'sent.json'))
+
+    hits = watchlist.alert_today(date, compiled, log, send)
+    assert [(h['kind'], h['title']) for h in hits] == [('news', 'OpenAI 发布新模型'), ('trending', 'ollama/ollama'),
+                                                      ('trending', 'x/y')]
+    assert len(sent) == 1 and '🔔 关注提醒' in sent[0] and '命中: <font color="info">Qwen</font>' in sent[0]
+
+    # 已提醒过的条目不再重复推送
+    assert watchlist.alert_today(date, compiled, watchlist.SentLog(str(sandbox / 'sent.json')), send) == []
+    assert len(sent) == 1